@@ -42,10 +42,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'users.metrics.MetricsMiddleware',  # First, so it times the whole stack
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # CORS middleware - must be before CommonMiddleware
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    'users.identity.IdentityMiddleware',  # Sets request.identity from the bearer token
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
@@ -90,6 +92,16 @@ DATABASES = {
     }
 }
 
+# Read replica for reporting/admin endpoints (see users/db_routing.py).
+# Add the replica to DATABASES and name it in DATABASE_REPLICA_ALIAS, e.g.
+#     DATABASES['replica'] = {**DATABASES['default'], 'HOST': 'replica-host'}
+#     DATABASE_REPLICA_ALIAS = 'replica'
+# For local testing a second SQLite file works as the replica.
+# Users read from the primary for REPLICA_STICKY_SECONDS after their own write.
+DATABASE_ROUTERS = ['users.db_routing.ReplicaRouter']
+DATABASE_REPLICA_ALIAS = None
+REPLICA_STICKY_SECONDS = 10
+
 # Previous SQLite3 configuration (backup):
 # DATABASES = {
 #     'default': {
@@ -174,3 +186,79 @@ CORS_ALLOW_HEADERS = [
     'x-csrftoken',
     'x-requested-with',
 ]
+
+# Food search index
+# Seconds before a worker rebuilds its in-memory food search index from the
+# database, so items changed by other workers or scripts show up
+FOOD_SEARCH_INDEX_TTL = 300
+
+# Diet template resolver
+# Seconds before a worker rebuilds its in-memory template index, so templates
+# changed by other workers or scripts show up
+DIET_TEMPLATE_INDEX_TTL = 300
+
+# Workout video catalog
+# Seconds a cached per-goal video list may be served before it is rebuilt
+VIDEO_CATALOG_CACHE_TTL = 300
+
+# Protected video delivery
+# None serves files from Django. 'nginx' sends X-Accel-Redirect to
+# MEDIA_ACCEL_REDIRECT_PREFIX (an `internal` location aliased to MEDIA_ROOT);
+# 'sendfile' sends X-Sendfile with the absolute path (Apache mod_xsendfile)
+MEDIA_ACCEL_BACKEND = None
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+
+# Request metrics (served at /api/metrics)
+# Each worker process publishes its aggregates to a file in METRICS_DIR at
+# most every METRICS_FLUSH_INTERVAL seconds; the endpoint sums the files of
+# running workers and deletes those of exited ones. Use a directory local to
+# the host and shared by its workers.
+METRICS_DIR = os.path.join(BASE_DIR, 'metrics')
+METRICS_FLUSH_INTERVAL = 1.0
+
+# API tokens
+# login_user issues signed tokens valid for API_TOKEN_MAX_AGE seconds; clients
+# send them as 'Authorization: Bearer <token>'. Signed with SECRET_KEY, so
+# rotating it logs everyone out. API_TOKEN_REQUIRED refuses API calls without
+# one outside API_TOKEN_EXEMPT_VIEWS; admin endpoints need an admin token
+# either way.
+API_TOKEN_MAX_AGE = 7 * 24 * 3600
+API_TOKEN_REQUIRED = True
+API_TOKEN_EXEMPT_VIEWS = ['create_user', 'login_user', 'prometheus_metrics', 'stream_workout_video']
+
+# Workout video links
+# get_user_videos hands out signed stream URLs valid for this many seconds;
+# players open them without headers, so stream_workout_video is token exempt.
+VIDEO_STREAM_URL_MAX_AGE = 6 * 3600
+
+# Cache
+# Shared by every worker: login throttling counts attempts here, and a
+# per-process cache would multiply the allowed attempts by the worker count
+# and forget them on restart. RedisCache needs the `redis` package; its
+# add() and incr() are atomic.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://127.0.0.1:6379/1',
+    }
+}
+
+# Password hashing
+# New hashes use the first hasher; on a successful login, hashes made by any
+# other listed hasher, or with fewer iterations than it now uses, are
+# rehashed. Put a stronger or costlier hasher first to migrate members as
+# they log in.
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+# Login throttling and password checks
+# Logins check passwords on PASSWORD_HASH_WORKERS threads per process, with
+# room for PASSWORD_HASH_QUEUE more waiting; beyond that they get a 503.
+# LOGIN_THROTTLE_RATES maps 'email' and 'ip' to (attempts, window seconds).
+# Attempts are counted in the default cache (see CACHES).
+PASSWORD_HASH_WORKERS = 2
+PASSWORD_HASH_QUEUE = 16
+LOGIN_THROTTLE_RATES = {'email': (5, 300), 'ip': (30, 60)}
@@ -14,14 +14,17 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import re
+
 from django.contrib import admin
-from django.urls import path
+from django.urls import path, re_path
+from django.views.static import serve
 from django.conf import settings
-from django.conf.urls.static import static
-from users import views, admin_views, food_views, trainer_food_views, subscription_views, recipe_views
+from users import views, admin_views, food_views, trainer_food_views, subscription_views, recipe_views, media_views, metrics_views
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/metrics', metrics_views.prometheus_metrics, name='prometheus_metrics'),
     path('api/users/create/', views.create_user, name='create_user'),
     path('api/users/login/', views.login_user, name='login_user'),
     path('api/trainers/create/', views.create_trainer, name='create_trainer'),
@@ -32,12 +35,14 @@ urlpatterns = [
     # Trainer APIs
     path('api/trainer/<int:trainer_id>/users/', views.get_trainer_users, name='get_trainer_users'),
     path('api/trainer/<int:trainer_id>/attendance/pending/', views.get_pending_attendance_requests, name='get_pending_attendance_requests'),
+    path('api/trainer/<int:trainer_id>/attendance/bulk/', views.bulk_review_attendance, name='bulk_review_attendance'),
     path('api/trainers/<int:trainer_id>/', views.get_trainer_details, name='get_trainer_details'),
     
     # Attendance APIs
     path('api/attendance/request/', views.request_attendance, name='request_attendance'),
     path('api/attendance/accept/', views.accept_attendance, name='accept_attendance'),
     path('api/attendance/user/<int:user_id>/', views.get_user_attendance, name='get_user_attendance'),
+    path('api/attendance/user/<int:user_id>/calendar/', views.get_user_attendance_calendar, name='get_user_attendance_calendar'),
     
     # Review APIs
     path('api/review/create/', views.create_review, name='create_review'),
@@ -57,6 +62,7 @@ urlpatterns = [
     path('api/videos/trainer/<int:trainer_id>/', views.list_trainer_videos, name='list_trainer_videos'),
     path('api/videos/user/<int:user_id>/', views.get_user_videos, name='get_user_videos'),
     path('api/videos/<int:video_id>/delete/', views.delete_video, name='delete_video'),
+    path('api/videos/<int:video_id>/stream/', media_views.stream_workout_video, name='stream_workout_video'),
     path('api/videos/recommend/', views.recommend_video_to_user, name='recommend_video_to_user'),
     
     # Chat APIs
@@ -68,6 +74,7 @@ urlpatterns = [
     # Food Calorie Tracker APIs
     path('api/food/search/', food_views.search_foods, name='search_foods'),
     path('api/food/categories/', food_views.get_food_categories, name='get_food_categories'),
+    path('api/food/catalog/changes/', food_views.get_catalog_changes, name='get_catalog_changes'),
     path('api/food/entry/add/', food_views.add_food_entry, name='add_food_entry'),
     path('api/food/entries/daily/', food_views.get_daily_food_entries, name='get_daily_food_entries'),
     path('api/food/entries/history/', food_views.get_food_history, name='get_food_history'),
@@ -86,6 +93,7 @@ urlpatterns = [
     path('api/admin/users/all/', admin_views.get_all_users, name='get_all_users'),
     path('api/admin/users/paid/', admin_views.get_paid_users, name='get_paid_users'),
     path('api/admin/users/unpaid/', admin_views.get_unpaid_users, name='get_unpaid_users'),
+    path('api/admin/export/<str:dataset>/', admin_views.export_data, name='export_data'),
     
     # Recipe APIs
     path('api/recipes/add/', recipe_views.add_recipe, name='add_recipe'),
@@ -103,7 +111,14 @@ urlpatterns = [
     path('api/admin/trainers/<str:goal>/', admin_views.get_trainers_by_goal, name='get_trainers_by_goal'),
 ]
 
-# Serve media files in development
+# Serve media files in development. Workout videos are left out: they are
+# only delivered through stream_workout_video, which enforces unlocks
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    urlpatterns += [
+        re_path(
+            r'^%s(?P<path>(?!workout_videos/).*)$' % re.escape(settings.MEDIA_URL.lstrip('/')),
+            serve,
+            {'document_root': settings.MEDIA_ROOT}
+        ),
+    ]
 
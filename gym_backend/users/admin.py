@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import UserLogin, Trainer, WorkoutVideo, ChatMessage, FoodRecipe, FoodItem, FoodEntry
+from .models import UserLogin, Trainer, WorkoutVideo, ChatMessage, FoodRecipe, FoodItem, FoodEntry, FoodAlias
 
 # Register your models here.
 
@@ -155,6 +155,13 @@ class FoodItemAdmin(admin.ModelAdmin):
         }),
     )
 
+@admin.register(FoodAlias)
+class FoodAliasAdmin(admin.ModelAdmin):
+    list_display = ('id', 'alias', 'food', 'created_at')
+    search_fields = ('alias', 'food__name')
+    autocomplete_fields = ('food',)
+    ordering = ('alias',)
+
 @admin.register(FoodEntry)
 class FoodEntryAdmin(admin.ModelAdmin):
     list_display = ('id', 'get_user_name', 'get_food_name', 'quantity', 'quantity_unit', 'meal_type', 'calculated_calories', 'entry_date', 'created_at')
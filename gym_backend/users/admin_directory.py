@@ -0,0 +1,151 @@
+from datetime import datetime, time, timedelta
+
+from django.db.models import DateTimeField, Q, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import UserLogin
+from .pagination import fetch_page, keyset_page, parse_limit, parse_sort
+from .roster import NO_SUBSCRIPTION
+
+# Admin member directory
+#
+# Lists members with their profile and assigned trainer from one joined
+# query. Filters run in the database and pages are keyset-paginated, so a
+# page costs the same however large the gym grows.
+
+MAX_PAGE_SIZE = 500
+
+# Public sort name -> annotated/model field used for ORDER BY and the cursor
+SORT_FIELDS = {
+    'created_at': 'created_at',
+    'name': 'name',
+    'subscription_end_date': 'subscription_sort',
+}
+
+
+def directory_queryset():
+    """Members joined to their profile and the profile's trainer"""
+    return UserLogin.objects.filter(role='user').select_related(
+        'profile', 'profile__assigned_trainer__user'
+    ).annotate(
+        subscription_sort=Coalesce(
+            'profile__subscription_end_date', Value(NO_SUBSCRIPTION), output_field=DateTimeField()
+        ),
+    )
+
+
+def parse_day(value, name):
+    """Start of a YYYY-MM-DD day in the current time zone"""
+    try:
+        day = datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f'Invalid {name}. Use YYYY-MM-DD')
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def get_directory_page(params):
+    """
+    Return (users, next_cursor) for the admin member directory.
+
+    Supported query params:
+        goal            - only members with this goal
+        payment_status  - 'paid' or 'unpaid' (members without a profile are unpaid)
+        trainer_id      - only members of this trainer; 'none' for unassigned members
+        subscription    - 'active' or 'expired'
+        joined_from     - signed up on or after this YYYY-MM-DD day
+        joined_to       - signed up on or before this YYYY-MM-DD day
+        sort            - created_at (default), name or subscription_end_date
+        order           - 'asc' or 'desc' (default)
+        limit           - page size, capped at MAX_PAGE_SIZE; omit for every member
+        cursor          - next_cursor from the previous page
+
+    Raises ValueError for unknown sort/filter values or a malformed cursor.
+    """
+    sort_field, descending = parse_sort(params, SORT_FIELDS, 'created_at')
+
+    queryset = directory_queryset()
+
+    goal = params.get('goal')
+    if goal:
+        queryset = queryset.filter(profile__goal=goal)
+
+    payment_status = params.get('payment_status')
+    if payment_status == 'paid':
+        queryset = queryset.filter(profile__payment_status=True)
+    elif payment_status == 'unpaid':
+        queryset = queryset.filter(Q(profile__payment_status=False) | Q(profile__isnull=True))
+    elif payment_status:
+        raise ValueError("Invalid payment_status filter. Use 'paid' or 'unpaid'")
+
+    trainer_id = params.get('trainer_id')
+    if trainer_id == 'none':
+        queryset = queryset.filter(profile__assigned_trainer__isnull=True)
+    elif trainer_id:
+        if not trainer_id.isdigit():
+            raise ValueError("Invalid trainer_id. Use a trainer id or 'none'")
+        queryset = queryset.filter(profile__assigned_trainer_id=int(trainer_id))
+
+    subscription = params.get('subscription')
+    now = timezone.now()
+    if subscription == 'active':
+        queryset = queryset.filter(profile__subscription_end_date__gt=now)
+    elif subscription == 'expired':
+        queryset = queryset.filter(
+            Q(profile__subscription_end_date__lte=now) | Q(profile__subscription_end_date__isnull=True)
+        )
+    elif subscription:
+        raise ValueError("Invalid subscription filter. Use 'active' or 'expired'")
+
+    # Half-open datetime bounds keep the created_at index usable
+    joined_from = params.get('joined_from')
+    if joined_from:
+        queryset = queryset.filter(created_at__gte=parse_day(joined_from, 'joined_from'))
+    joined_to = params.get('joined_to')
+    if joined_to:
+        queryset = queryset.filter(created_at__lt=parse_day(joined_to, 'joined_to') + timedelta(days=1))
+
+    queryset = keyset_page(queryset, params, sort_field, descending)
+    limit = parse_limit(params.get('limit'), None, MAX_PAGE_SIZE)
+    return fetch_page(queryset, sort_field, limit)
+
+
+def serialize_directory_entry(user):
+    """Directory payload for one member, as consumed by the admin app"""
+    try:
+        profile = user.profile
+    except UserLogin.profile.RelatedObjectDoesNotExist:
+        return {
+            'id': user.id,
+            'name': user.name,
+            'email': user.emailid,
+            'mobile': None,
+            'age': None,
+            'gender': None,
+            'goal': None,
+            'payment_status': False,
+            'payment_amount': 0,
+            'payment_method': None,
+            'assigned_trainer': None,
+            'created_at': user.created_at.strftime('%Y-%m-%d %H:%M:%S')
+        }
+    trainer = profile.assigned_trainer
+    return {
+        'id': user.id,
+        'name': user.name,
+        'email': user.emailid,
+        'mobile': profile.mobile_number,
+        'age': profile.age,
+        'gender': profile.gender,
+        'goal': profile.goal,
+        'payment_status': profile.payment_status,
+        'payment_amount': profile.payment_amount,
+        'payment_method': profile.payment_method,
+        'assigned_trainer': trainer.user.name if trainer else None,
+        'assigned_trainer_id': trainer.id if trainer else None,
+        'subscription_start_date': profile.subscription_start_date.isoformat() if profile.subscription_start_date else None,
+        'subscription_end_date': profile.subscription_end_date.isoformat() if profile.subscription_end_date else None,
+        'subscription_status': 'active' if profile.is_subscription_active() else 'expired',
+        'remaining_days': profile.get_remaining_days() if profile.payment_status else 0,
+        'created_at': user.created_at.strftime('%Y-%m-%d %H:%M:%S')
+    }
@@ -1,65 +1,44 @@
 from django.shortcuts import render
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
+from django.db import router
+from django.db.models import Prefetch
 import json
 from .models import UserLogin, Trainer, UserProfile, SubscriptionRenewal
+from .db_routing import use_replica
+from .admin_directory import get_directory_page, serialize_directory_entry
+from .exports import FORMATS, export_lines
+from .identity import admin_required
 
 # Admin API Views
 
 @csrf_exempt
+@admin_required
+@use_replica
 def get_all_users(request):
-    """Get all registered users with their profile and payment status"""
+    """
+    Get registered users with their profile and payment status
+    GET params: goal, payment_status, trainer_id, subscription, joined_from,
+    joined_to, sort, order, limit, cursor (see admin_directory.get_directory_page)
+    """
     if request.method == 'GET':
         try:
-            users = UserLogin.objects.filter(role='user').order_by('-created_at')
-            user_list = []
+            try:
+                users, next_cursor = get_directory_page(request.GET)
+            except ValueError as e:
+                return JsonResponse({
+                    'success': False,
+                    'message': str(e)
+                }, status=400)
             
-            for user in users:
-                try:
-                    profile = UserProfile.objects.get(user=user)
-                    trainer_name = profile.assigned_trainer.user.name if profile.assigned_trainer else None
-                    remaining_days = profile.get_remaining_days() if profile.payment_status else 0
-                    user_data = {
-                        'id': user.id,
-                        'name': user.name,
-                        'email': user.emailid,
-                        'mobile': profile.mobile_number,
-                        'age': profile.age,
-                        'gender': profile.gender,
-                        'goal': profile.goal,
-                        'payment_status': profile.payment_status,
-                        'payment_amount': profile.payment_amount,
-                        'payment_method': profile.payment_method,
-                        'assigned_trainer': trainer_name,
-                        'subscription_start_date': profile.subscription_start_date.isoformat() if profile.subscription_start_date else None,
-                        'subscription_end_date': profile.subscription_end_date.isoformat() if profile.subscription_end_date else None,
-                        'subscription_status': 'active' if profile.is_subscription_active() else 'expired',
-                        'remaining_days': remaining_days,
-                        'created_at': user.created_at.strftime('%Y-%m-%d %H:%M:%S')
-                    }
-                except UserProfile.DoesNotExist:
-                    user_data = {
-                        'id': user.id,
-                        'name': user.name,
-                        'email': user.emailid,
-                        'mobile': None,
-                        'age': None,
-                        'gender': None,
-                        'goal': None,
-                        'payment_status': False,
-                        'payment_amount': 0,
-                        'payment_method': None,
-                        'assigned_trainer': None,
-                        'created_at': user.created_at.strftime('%Y-%m-%d %H:%M:%S')
-                    }
-                
-                user_list.append(user_data)
+            user_list = [serialize_directory_entry(user) for user in users]
             
             return JsonResponse({
                 'success': True,
                 'users': user_list,
-                'total': len(user_list)
+                'total': len(user_list),
+                'next_cursor': next_cursor
             }, status=200)
             
         except Exception as e:
@@ -75,11 +54,21 @@ def get_all_users(request):
 
 
 @csrf_exempt
+@admin_required
+@use_replica
 def get_paid_users(request):
     """Get all users who have completed payment with full details"""
     if request.method == 'GET':
         try:
-            profiles = UserProfile.objects.filter(payment_status=True).select_related('user', 'assigned_trainer').order_by('-updated_at')
+            # Last 5 renewals of every member in one query instead of one per member
+            recent_renewals = Prefetch(
+                'user__subscription_renewals',
+                queryset=SubscriptionRenewal.objects.order_by('-renewed_at')[:5],
+                to_attr='recent_renewals'
+            )
+            profiles = UserProfile.objects.filter(payment_status=True).select_related(
+                'user', 'assigned_trainer__user'
+            ).prefetch_related(recent_renewals).order_by('-updated_at')
             user_list = []
             
             for profile in profiles:
@@ -129,7 +118,7 @@ def get_paid_users(request):
                     'joined_date': timezone.localtime(user.created_at).strftime('%Y-%m-%d')
                 }
                 # Include recent renewal history
-                renewals = SubscriptionRenewal.objects.filter(user=user).order_by('-renewed_at')[:5]
+                renewals = user.recent_renewals
                 user_data['renewals'] = [
                     {
                         'months': r.months,
@@ -160,6 +149,38 @@ def get_paid_users(request):
 
 
 @csrf_exempt
+@admin_required
+@use_replica
+def export_data(request, dataset):
+    """
+    Stream a full export for finance
+    URL: dataset = members, payments or renewals
+    GET params: format (csv or ndjson, default: csv)
+    """
+    if request.method == 'GET':
+        fmt = request.GET.get('format', 'csv')
+        try:
+            # Rows are read after this view returns, so pick the database now
+            lines = export_lines(dataset, fmt, using=router.db_for_read(UserLogin) or 'default')
+        except ValueError as e:
+            return JsonResponse({
+                'success': False,
+                'message': str(e)
+            }, status=400)
+        
+        response = StreamingHttpResponse(lines, content_type=f'{FORMATS[fmt]}; charset=utf-8')
+        filename = f"{dataset}-{timezone.localdate().strftime('%Y%m%d')}.{fmt}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+    
+    return JsonResponse({
+        'success': False,
+        'message': 'Only GET method is allowed'
+    }, status=405)
+
+
+@csrf_exempt
+@admin_required
 def get_unpaid_users(request):
     """Get all users who have not completed payment"""
     if request.method == 'GET':
@@ -247,6 +268,7 @@ def get_trainers_by_goal(request, goal):
 
 
 @csrf_exempt
+@admin_required
 def get_all_trainers(request):
     """Get all trainers with their assigned goal categories"""
     if request.method == 'GET':
@@ -293,6 +315,7 @@ def get_all_trainers(request):
 
 
 @csrf_exempt
+@admin_required
 def assign_trainer_to_goal(request):
     """Assign a trainer to a goal category (max 2 per category)"""
     if request.method == 'POST':
@@ -352,6 +375,7 @@ def assign_trainer_to_goal(request):
 
 
 @csrf_exempt
+@admin_required
 def create_trainer(request):
     """Admin can create a new trainer account"""
     if request.method == 'POST':
@@ -432,6 +456,7 @@ def create_trainer(request):
 
 
 @csrf_exempt
+@admin_required
 def remove_trainer_from_goal(request):
     """Remove a trainer from their assigned goal category"""
     if request.method == 'POST':
@@ -0,0 +1,42 @@
+"""
+Async View Helpers
+Small utilities for the native async (ASGI) API views
+"""
+
+import asyncio
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+
+
+def async_csrf_exempt(view_func):
+    """csrf_exempt for async views; Django 4.2's decorator wraps views synchronously"""
+    @wraps(view_func)
+    async def wrapper_view(*args, **kwargs):
+        return await view_func(*args, **kwargs)
+
+    wrapper_view.csrf_exempt = True
+    return wrapper_view
+
+
+async def alist(queryset):
+    """Evaluate a queryset with async iteration"""
+    return [obj async for obj in queryset]
+
+
+async def gather(*awaitables):
+    """
+    Run independent lookups together. Unlike asyncio.gather, the first failure
+    in argument order is raised (not the first to happen), so a missing user
+    is reported before anything that depends on it.
+    """
+    results = await asyncio.gather(*awaitables, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
+
+
+def run_sync(func):
+    """Run ORM code that needs transactions or caches on the request's database thread"""
+    return sync_to_async(func, thread_sensitive=True)
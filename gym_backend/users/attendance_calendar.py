@@ -0,0 +1,185 @@
+"""
+Attendance Calendar
+One member's attendance over a bounded date window: window statistics from a
+single conditional aggregate, a per-day status string and the sparse records
+inside the window, so the calendar screen costs the same for a member of one
+week as for a member of five years
+"""
+
+import calendar
+from datetime import date, datetime, timedelta
+
+from django.db.models import Count, Q
+
+from .models import Attendance, AttendanceStats
+
+MAX_WINDOW_DAYS = 366
+
+# One character per day of the window, in date order
+DAY_CODES = {
+    'accepted': 'A',
+    'pending': 'P',
+    'rejected': 'R',
+    'absent': 'X',   # past day on or after joining without a record
+    'open': '.',     # today or a future day without a record
+    'before_join': '-',
+}
+# A day with several records shows the strongest one
+STATUS_RANK = {'rejected': 0, 'pending': 1, 'accepted': 2}
+
+
+def parse_window(params, today):
+    """
+    (start, end) from ?month=YYYY-MM or ?start=YYYY-MM-DD&end=YYYY-MM-DD,
+    defaulting to the current month. Raises ValueError on bad input or a
+    window longer than MAX_WINDOW_DAYS.
+    """
+    month = params.get('month')
+    if month:
+        try:
+            first = datetime.strptime(month, '%Y-%m').date()
+        except ValueError:
+            raise ValueError('month must be YYYY-MM')
+        return first, first.replace(day=calendar.monthrange(first.year, first.month)[1])
+
+    if params.get('start') or params.get('end'):
+        try:
+            start = datetime.strptime(params.get('start', ''), '%Y-%m-%d').date()
+            end = datetime.strptime(params.get('end', ''), '%Y-%m-%d').date()
+        except ValueError:
+            raise ValueError('start and end must both be YYYY-MM-DD')
+        if end < start:
+            raise ValueError('end must not be before start')
+        if (end - start).days + 1 > MAX_WINDOW_DAYS:
+            raise ValueError(f'window must not exceed {MAX_WINDOW_DAYS} days')
+        return start, end
+
+    first = today.replace(day=1)
+    return first, first.replace(day=calendar.monthrange(today.year, today.month)[1])
+
+
+def window_stats(user_id, start, end, joined, today):
+    """
+    Accepted, pending, rejected and absent counts inside [start, end] from one
+    aggregate query. Absent days are past days since joining with no record.
+    """
+    counts = Attendance.objects.filter(user_id=user_id, date__range=(start, end)).aggregate(
+        accepted=Count('id', filter=Q(status='accepted')),
+        pending=Count('id', filter=Q(status='pending')),
+        rejected=Count('id', filter=Q(status='rejected')),
+        recorded_past_days=Count('date', distinct=True, filter=Q(date__gte=joined, date__lt=today)),
+    )
+    first_past = max(start, joined)
+    last_past = min(end, today - timedelta(days=1))
+    past_days = (last_past - first_past).days + 1 if last_past >= first_past else 0
+    recorded = counts.pop('recorded_past_days')
+    counts['absent'] = max(0, past_days - recorded)
+    counts['past_days'] = past_days
+    return counts
+
+
+def window_records(user_id, start, end):
+    """Attendance rows inside [start, end], newest first"""
+    return list(
+        Attendance.objects.filter(user_id=user_id, date__range=(start, end))
+        .order_by('-date', '-id')
+        .values('id', 'date', 'status', 'request_date', 'accepted_date')
+    )
+
+
+def day_string(records, start, end, joined, today):
+    """The window as one DAY_CODES character per day"""
+    by_date = {}
+    for record in records:
+        current = by_date.get(record['date'])
+        if current is None or STATUS_RANK.get(record['status'], 0) > STATUS_RANK.get(current, 0):
+            by_date[record['date']] = record['status']
+    codes = []
+    day = start
+    while day <= end:
+        status = by_date.get(day)
+        if status:
+            codes.append(DAY_CODES.get(status, '?'))
+        elif day < joined:
+            codes.append(DAY_CODES['before_join'])
+        elif day < today:
+            codes.append(DAY_CODES['absent'])
+        else:
+            codes.append(DAY_CODES['open'])
+        day += timedelta(days=1)
+    return ''.join(codes)
+
+
+def serialize_record(record):
+    return {
+        'id': record['id'],
+        'date': record['date'].strftime('%Y-%m-%d'),
+        'status': record['status'],
+        'request_date': record['request_date'].strftime('%Y-%m-%d %H:%M'),
+        'accepted_date': record['accepted_date'].strftime('%Y-%m-%d %H:%M') if record['accepted_date'] else None,
+    }
+
+
+def lifetime_totals(profile, today):
+    """
+    Counters since joining from AttendanceStats, plus absent days (past days
+    without a record) and days enrolled; one indexed count besides the stats
+    """
+    joined = profile.created_at.date()
+    totals = AttendanceStats.totals_for(profile.user_id, today)
+    recorded = totals['accepted'] + totals['pending'] + totals['rejected']
+    recorded_past = recorded - Attendance.objects.filter(user_id=profile.user_id, date__gte=today).count()
+    totals['absent'] = max(0, max(0, (today - joined).days) - recorded_past)
+    totals['days'] = (today - joined).days + 1
+    return totals
+
+
+def history_list(records, start, end, joined, today):
+    """
+    The window in the list form of get_user_attendance: records and past days
+    without one (status 'absent'), newest first
+    """
+    recorded = {record['date'] for record in records}
+    entries = [{**serialize_record(record), 'is_absent': False} for record in records]
+    day = max(start, joined)
+    while day <= end and day < today:
+        if day not in recorded:
+            entries.append({
+                'id': None,
+                'date': day.strftime('%Y-%m-%d'),
+                'status': 'absent',
+                'request_date': None,
+                'accepted_date': None,
+                'is_absent': True
+            })
+        day += timedelta(days=1)
+    entries.sort(key=lambda entry: entry['date'], reverse=True)
+    return entries
+
+
+def get_calendar(profile, params, today=None):
+    """
+    Calendar payload for a member's profile and request params (see
+    parse_window). Raises ValueError on a bad window.
+    """
+    today = today or date.today()
+    start, end = parse_window(params, today)
+    joined = profile.created_at.date()
+    records = window_records(profile.user_id, start, end)
+    totals = lifetime_totals(profile, today)
+    last_attended = totals['last_attended_date']
+    return {
+        'start': start.strftime('%Y-%m-%d'),
+        'end': end.strftime('%Y-%m-%d'),
+        'joined': joined.strftime('%Y-%m-%d'),
+        'days': day_string(records, start, end, joined, today),
+        'legend': {code: name for name, code in DAY_CODES.items()},
+        'stats': window_stats(profile.user_id, start, end, joined, today),
+        'totals': {key: totals[key] for key in ('accepted', 'pending', 'rejected', 'absent', 'days')},
+        'streak': {
+            'current': totals['current_streak'],
+            'longest': totals['longest_streak'],
+            'last_attended_date': last_attended.strftime('%Y-%m-%d') if last_attended else None,
+        },
+        'records': [serialize_record(record) for record in records],
+    }
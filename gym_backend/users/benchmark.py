@@ -0,0 +1,490 @@
+"""
+Endpoint Benchmark Suite
+Seeds a test database, drives every API route through the Django test client
+and reports latency percentiles and SQL query counts per endpoint
+"""
+
+import contextlib
+import io
+import json
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test import Client
+from django.urls import URLPattern, get_resolver, reverse
+from django.utils import timezone
+
+from . import food_search
+from .calorie_targets import recompute_targets
+from .identity import issue_token, sign_stream
+from .metrics import QueryTimer
+from .models import (
+    Attendance, AttendanceStats, ChatConversation, ChatMessage, DailyNutritionSummary, DietPlanTemplate,
+    FoodEntry, FoodItem, FoodRecipe, Review, SubscriptionRenewal, Trainer, UserDietPlan, UserLogin,
+    UserProfile, VideoRecommendation, WorkoutVideo
+)
+
+BENCH_PASSWORD = 'bench-password'
+
+DEFAULT_VOLUMES = {
+    'trainers': 5,
+    'users': 200,
+    'food_days': 14,
+    'entries_per_day': 4,
+    'messages': 20,
+    'attendance_days': 30,
+}
+
+# Routes that are not part of the API
+EXCLUDED_ROUTES = {'admin'}
+
+# Whose bearer token each route is called with; the rest are called by the member
+ROUTE_CALLERS = {
+    'create_user': None, 'login_user': None, 'prometheus_metrics': None, 'stream_workout_video': None,
+    'create_profile': 'spare',
+    **dict.fromkeys([
+        'get_trainer_users', 'get_pending_attendance_requests', 'bulk_review_attendance', 'accept_attendance',
+        'create_user_diet_plan', 'get_trainer_diet_plans', 'upload_video', 'list_trainer_videos', 'delete_video',
+        'recommend_video_to_user', 'get_trainer_chats', 'trainer_get_assigned_users_calories',
+        'trainer_get_user_daily_calories', 'trainer_get_user_calorie_history',
+    ], 'trainer'),
+    **dict.fromkeys([
+        'create_trainer', 'get_all_reviews', 'get_all_chats_admin', 'get_all_users', 'get_paid_users',
+        'get_unpaid_users', 'export_data', 'add_recipe', 'update_recipe', 'delete_recipe', 'admin_create_trainer',
+        'assign_trainer_to_goal', 'remove_trainer_from_goal', 'get_all_trainers',
+    ], 'admin'),
+}
+
+GOALS = ['weight_loss', 'weight_gain', 'muscle_gain', 'others']
+MEALS = ['breakfast', 'lunch', 'dinner', 'snacks']
+FOODS = [
+    ('Chicken Breast', 'meat', 'non_veg', 165),
+    ('Brown Rice', 'grains', 'vegan', 112),
+    ('Oats', 'grains', 'vegan', 389),
+    ('Paneer', 'dairy', 'vegetarian', 265),
+    ('Banana', 'fruits', 'vegan', 89),
+    ('Almonds', 'nuts', 'vegan', 579),
+    ('Boiled Egg', 'eggs', 'vegetarian', 155),
+    ('Spinach', 'vegetables', 'vegan', 23),
+]
+VIDEO_BYTES = b'\0' * 256 * 1024
+
+
+def seed(volumes):
+    """
+    Create a reproducible dataset of the given volumes and return the ids
+    the scenarios need. Rows are bulk inserted; rollups and conversation
+    summaries are built the same way the data migrations build them.
+    """
+    password = make_password(BENCH_PASSWORD)
+    today = date.today()
+    now = timezone.now()
+
+    admin = UserLogin.objects.create(
+        name='Bench Admin', emailid='bench-admin@example.com', password=password, role='admin'
+    )
+    trainers = []
+    for i in range(volumes['trainers']):
+        login = UserLogin.objects.create(
+            name=f'Bench Trainer {i}', emailid=f'bench-trainer-{i}@example.com', password=password, role='trainer'
+        )
+        trainers.append(Trainer.objects.create(
+            user=login, mobile='9000000000', gender='male', experience=5, specialization='Strength',
+            joining_period='1 year', goal_category=GOALS[i % len(GOALS)]
+        ))
+
+    UserLogin.objects.bulk_create([
+        UserLogin(name=f'Bench User {i}', emailid=f'bench-user-{i}@example.com', password=password)
+        for i in range(volumes['users'])
+    ])
+    logins = list(UserLogin.objects.filter(emailid__startswith='bench-user-').order_by('id'))
+    # Keep the last login without a profile so create_profile has someone to onboard
+    spare_login = logins.pop()
+
+    UserProfile.objects.bulk_create([
+        UserProfile(
+            user=login, mobile_number='9000000001', age=25 + i % 20, gender='male' if i % 2 else 'female',
+            current_weight=80, current_height=170, goal=GOALS[i % len(GOALS)],
+            target_weight=70 if i % 3 else 95, target_months=3, workout_time='morning',
+            diet_preference='vegetarian', payment_status=i % 5 != 0, payment_amount=3000,
+            subscription_start_date=now - timedelta(days=30),
+            subscription_end_date=now + timedelta(days=i % 90 - 20),
+            assigned_trainer=trainers[i % len(trainers)]
+        )
+        for i, login in enumerate(logins)
+    ])
+    recompute_targets(UserProfile.objects.filter(user__in=logins))
+    profiles = list(UserProfile.objects.filter(user__in=logins).order_by('id'))
+    SubscriptionRenewal.objects.bulk_create([
+        SubscriptionRenewal(user_id=profile.user_id, months=3, amount=3000, payment_method='upi')
+        for profile in profiles if profile.payment_status
+        for _ in range(3)
+    ], batch_size=1000)
+
+    foods = [
+        FoodItem.objects.create(
+            name=name, food_category=category, diet_type=diet_type, calories=calories, protein=10, carbs=20, fats=5
+        )
+        for name, category, diet_type, calories in FOODS
+    ]
+    FoodEntry.objects.bulk_create([
+        FoodEntry(
+            user_id=profile.user_id, food_item=foods[(day + k) % len(foods)], quantity=100 + k * 10,
+            quantity_unit='g', meal_type=MEALS[k % len(MEALS)], entry_date=today - timedelta(days=day),
+            calculated_calories=float(foods[(day + k) % len(foods)].calories) * (100 + k * 10) / 100
+        )
+        for profile in profiles
+        for day in range(volumes['food_days'])
+        for k in range(volumes['entries_per_day'])
+    ], batch_size=1000)
+    DailyNutritionSummary.rebuild()
+
+    Attendance.objects.bulk_create([
+        Attendance(
+            user_id=profile.user_id, trainer_id=profile.assigned_trainer_id,
+            date=today - timedelta(days=day + 1), status='pending' if day % 7 == 0 else 'accepted'
+        )
+        for profile in profiles
+        for day in range(volumes['attendance_days'])
+    ], batch_size=1000)
+    AttendanceStats.rebuild()
+
+    ChatMessage.objects.bulk_create([
+        ChatMessage(
+            user=profile, trainer_id=profile.assigned_trainer_id, message=f'Message {n}',
+            sender_type='user' if n % 2 else 'trainer', is_read=n < volumes['messages'] - 2
+        )
+        for profile in profiles
+        for n in range(volumes['messages'])
+    ], batch_size=1000)
+    if volumes['messages']:
+        ChatConversation.objects.bulk_create([
+            ChatConversation(
+                user=profile, trainer_id=profile.assigned_trainer_id,
+                last_message=f"Message {volumes['messages'] - 1}",
+                last_sender_type='user' if (volumes['messages'] - 1) % 2 else 'trainer',
+                last_message_at=now, user_unread_count=1, trainer_unread_count=1,
+                total_messages=volumes['messages']
+            )
+            for profile in profiles
+        ], batch_size=1000)
+
+    # The benchmark subject: a paid member whose first video is unlocked
+    member = next(profile for profile in profiles if profile.payment_status and profile.goal == 'weight_loss')
+
+    # Leave the member free to post this month's review
+    Review.objects.bulk_create([
+        Review(user_id=profile.user_id, trainer_id=profile.assigned_trainer_id, rating=4 + i % 2, review_text='Great trainer')
+        for i, profile in enumerate(profiles[-50:]) if profile != member
+    ])
+    FoodRecipe.objects.bulk_create([
+        FoodRecipe(name=f'Recipe {i}', ingredients='oats, milk', instructions='Mix and serve',
+                   food_type=['veg', 'non_veg', 'vegan', 'other'][i % 4])
+        for i in range(40)
+    ])
+
+    meals = {meal: [{'food': foods[0].name, 'quantity': '100g'}] for meal in MEALS}
+    templates = [
+        DietPlanTemplate.objects.create(
+            name=f'{goal} {low}', goal_type=goal, calorie_min=low, calorie_max=low + 300, meals_data=meals
+        )
+        for goal in ['weight_loss', 'weight_gain', 'muscle_building']
+        for low in range(1200, 3300, 300)
+    ]
+    UserDietPlan.objects.bulk_create([
+        UserDietPlan(
+            user_id=profile.user_id, trainer_id=profile.assigned_trainer_id, template=templates[0],
+            plan_name='Bench plan', target_calories=1800, meals_data=meals, start_date=today
+        )
+        for profile in profiles
+    ], batch_size=1000)
+
+    video_name = default_storage.save('workout_videos/bench.mp4', ContentFile(VIDEO_BYTES))
+    videos = []
+    for goal in GOALS:
+        for day in range(1, 31):
+            videos.append(WorkoutVideo(
+                title=f'{goal} day {day}', description='Bench video', video_file=video_name, goal_type=goal,
+                difficulty_level='beginner', uploaded_via='bulk', day_number=day
+            ))
+        for trainer in trainers:
+            videos.append(WorkoutVideo(
+                title=f'{goal} by trainer {trainer.id}', description='Bench video', video_file=video_name,
+                goal_type=goal, difficulty_level='beginner', uploaded_by=trainer, uploaded_via='web'
+            ))
+    WorkoutVideo.objects.bulk_create(videos)
+    videos = list(WorkoutVideo.objects.order_by('id'))
+    VideoRecommendation.objects.bulk_create([
+        VideoRecommendation(video=video, user=profile, recommended_by_id=profile.assigned_trainer_id, note='Try this')
+        for profile in profiles[:len(GOALS) * 5]
+        for video in videos if video.goal_type == profile.goal and video.uploaded_via == 'web'
+    ])
+
+    return {
+        'trainer_id': member.assigned_trainer_id,
+        'trainer_user_id': member.assigned_trainer.user_id,
+        'member_id': member.user_id,
+        'admin_id': admin.id,
+        'spare_user_id': spare_login.id,
+        'video_id': next(video.id for video in videos if video.goal_type == member.goal and video.day_number == 1),
+        'trainer_video_id': next(video.id for video in videos if video.uploaded_by_id == member.assigned_trainer_id),
+        'template_id': templates[0].id,
+        'food_id': foods[0].id,
+        'food_entry_id': FoodEntry.objects.filter(user_id=member.user_id).values_list('id', flat=True).first(),
+        'attendance_id': Attendance.objects.filter(
+            user_id=member.user_id, status='pending'
+        ).values_list('id', flat=True).first(),
+        'recipe_id': FoodRecipe.objects.values_list('id', flat=True).first(),
+        'today': str(today),
+    }
+
+
+def build_scenarios(ids):
+    """
+    One or more requests per named route: (label, route, method, url kwargs,
+    query params, payload). Write requests are rolled back after each run.
+    """
+    member, trainer = ids['member_id'], ids['trainer_id']
+    profile = {
+        'user_id': ids['spare_user_id'], 'mobile_number': '9000000002', 'age': 30, 'gender': 'male',
+        'current_weight': 90, 'current_height': 175, 'goal': 'weight_loss', 'target_weight': 80,
+        'target_months': 3, 'workout_time': 'morning', 'diet_preference': 'vegetarian'
+    }
+    return [
+        ('create_user', 'create_user', 'post', {}, None,
+         {'name': 'New User', 'emailid': 'bench-new@example.com', 'password': BENCH_PASSWORD}),
+        ('login_user', 'login_user', 'post', {}, None,
+         {'emailid': 'bench-user-0@example.com', 'password': BENCH_PASSWORD}),
+        ('create_trainer', 'create_trainer', 'post', {}, None,
+         {'name': 'New Trainer', 'emailid': 'bench-new-trainer@example.com', 'mobile': '9000000003',
+          'gender': 'female', 'experience': 3, 'specialization': 'Yoga', 'joining_period': '6 months',
+          'password': BENCH_PASSWORD}),
+        ('create_profile', 'create_profile', 'post', {}, None, profile),
+        ('get_profile', 'get_profile', 'get', {'user_id': member}, None, None),
+        ('update_payment_status', 'update_payment_status', 'post', {}, None,
+         {'user_id': member, 'payment_status': True, 'payment_method': 'upi'}),
+
+        ('get_trainer_users', 'get_trainer_users', 'get', {'trainer_id': trainer}, None, None),
+        ('get_trainer_users[limit=50]', 'get_trainer_users', 'get', {'trainer_id': trainer}, {'limit': 50}, None),
+        ('get_pending_attendance_requests', 'get_pending_attendance_requests', 'get',
+         {'trainer_id': trainer}, None, None),
+        ('bulk_review_attendance', 'bulk_review_attendance', 'post', {'trainer_id': trainer}, None,
+         {'status': 'accepted', 'date': (date.today() - timedelta(days=1)).isoformat()}),
+        ('get_trainer_details', 'get_trainer_details', 'get', {'trainer_id': trainer}, None, None),
+
+        ('request_attendance', 'request_attendance', 'post', {}, None, {'user_id': member}),
+        ('accept_attendance', 'accept_attendance', 'post', {}, None,
+         {'attendance_id': ids['attendance_id'], 'status': 'accepted'}),
+        ('get_user_attendance', 'get_user_attendance', 'get', {'user_id': member}, None, None),
+        ('get_user_attendance_calendar', 'get_user_attendance_calendar', 'get', {'user_id': member}, None, None),
+
+        ('create_review', 'create_review', 'post', {}, None,
+         {'user_id': member, 'rating': 5, 'review_text': 'Very helpful'}),
+        ('get_trainer_reviews', 'get_trainer_reviews', 'get', {'trainer_id': trainer}, None, None),
+        ('get_all_reviews', 'get_all_reviews', 'get', {}, None, None),
+
+        ('get_food_items', 'get_food_items', 'get', {}, {'user_id': member}, None),
+        ('get_food_items[columnar]', 'get_food_items', 'get', {}, {'format': 'columnar'}, None),
+        ('get_catalog_changes', 'get_catalog_changes', 'get', {}, {'since': 1}, None),
+        ('get_diet_templates', 'get_diet_templates', 'get', {}, {'goal': 'weight_loss'}, None),
+        ('get_diet_templates[target,expand]', 'get_diet_templates', 'get', {}, {'goal': 'weight_loss', 'target_calories': 1800, 'expand': 'meals'}, None),
+        ('calculate_target_calories', 'calculate_target_calories', 'get', {'user_id': member}, None, None),
+        ('create_user_diet_plan', 'create_user_diet_plan', 'post', {}, None,
+         {'user_id': member, 'trainer_id': trainer, 'template_id': ids['template_id'], 'plan_name': 'New plan',
+          'target_calories': 1800, 'meals_data': {'breakfast': []}, 'start_date': ids['today']}),
+        ('get_user_diet_plan', 'get_user_diet_plan', 'get', {'user_id': member}, None, None),
+        ('get_trainer_diet_plans', 'get_trainer_diet_plans', 'get', {'trainer_id': trainer}, None, None),
+
+        ('upload_video', 'upload_video', 'multipart', {}, None,
+         {'trainer_id': trainer, 'title': 'Upload', 'description': 'Bench upload', 'goal_type': 'weight_loss',
+          'difficulty_level': 'beginner'}),
+        ('list_trainer_videos', 'list_trainer_videos', 'get', {'trainer_id': trainer}, None, None),
+        ('get_user_videos', 'get_user_videos', 'get', {'user_id': member}, None, None),
+        ('delete_video', 'delete_video', 'delete', {'video_id': ids['trainer_video_id']}, None, None),
+        ('stream_workout_video', 'stream_workout_video', 'get', {'video_id': ids['video_id']},
+         {'token': sign_stream(ids['video_id'], member)}, None),
+        ('recommend_video_to_user', 'recommend_video_to_user', 'post', {}, None,
+         {'video_id': ids['video_id'], 'user_id': member, 'trainer_id': trainer, 'note': 'Watch this'}),
+
+        ('send_chat_message', 'send_chat_message', 'post', {}, None,
+         {'user_id': member, 'trainer_id': trainer, 'message': 'Hello', 'sender_type': 'user'}),
+        ('get_chat_messages', 'get_chat_messages', 'get', {'user_id': member, 'trainer_id': trainer}, None, None),
+        ('get_trainer_chats', 'get_trainer_chats', 'get', {'trainer_id': trainer}, None, None),
+        ('get_all_chats_admin', 'get_all_chats_admin', 'get', {}, None, None),
+
+        ('search_foods', 'search_foods', 'get', {}, {'query': 'chi'}, None),
+        ('get_food_categories', 'get_food_categories', 'get', {}, None, None),
+        ('add_food_entry', 'add_food_entry', 'post', {}, None,
+         {'user_id': member, 'food_item_id': ids['food_id'], 'quantity': 150, 'meal_type': 'lunch',
+          'entry_date': ids['today']}),
+        ('get_daily_food_entries', 'get_daily_food_entries', 'get', {}, {'user_id': member, 'date': ids['today']}, None),
+        ('get_food_history', 'get_food_history', 'get', {}, {'user_id': member, 'days': 30}, None),
+        ('delete_food_entry', 'delete_food_entry', 'post', {}, None,
+         {'entry_id': ids['food_entry_id'], 'user_id': member}),
+
+        ('trainer_get_assigned_users_calories', 'trainer_get_assigned_users_calories', 'get', {},
+         {'trainer_id': trainer}, None),
+        ('trainer_get_user_daily_calories', 'trainer_get_user_daily_calories', 'get', {},
+         {'trainer_id': trainer, 'user_id': member}, None),
+        ('trainer_get_user_calorie_history', 'trainer_get_user_calorie_history', 'get', {},
+         {'trainer_id': trainer, 'user_id': member}, None),
+
+        ('get_subscription_status', 'get_subscription_status', 'get', {'user_id': member}, None, None),
+        ('renew_subscription', 'renew_subscription', 'post', {}, None,
+         {'user_id': member, 'renewal_months': 3, 'payment_method': 'upi'}),
+
+        ('get_all_users', 'get_all_users', 'get', {}, None, None),
+        ('get_all_users[paid,limit=50]', 'get_all_users', 'get', {}, {'payment_status': 'paid', 'sort': 'name', 'limit': 50}, None),
+        ('get_paid_users', 'get_paid_users', 'get', {}, None, None),
+        ('get_unpaid_users', 'get_unpaid_users', 'get', {}, None, None),
+        ('export_data[members,csv]', 'export_data', 'get', {'dataset': 'members'}, None, None),
+        ('export_data[payments,ndjson]', 'export_data', 'get', {'dataset': 'payments'}, {'format': 'ndjson'}, None),
+        ('export_data[renewals,csv]', 'export_data', 'get', {'dataset': 'renewals'}, None, None),
+
+        ('add_recipe', 'add_recipe', 'post', {}, None,
+         {'name': 'Smoothie', 'ingredients': 'banana, milk', 'instructions': 'Blend', 'food_type': 'veg'}),
+        ('get_recipes', 'get_recipes', 'get', {'user_id': member}, None, None),
+        ('get_all_recipes', 'get_all_recipes', 'get', {}, None, None),
+        ('get_recipe_count', 'get_recipe_count', 'get', {}, None, None),
+        ('update_recipe', 'update_recipe', 'put', {'recipe_id': ids['recipe_id']}, None, {'name': 'Renamed'}),
+        ('delete_recipe', 'delete_recipe', 'delete', {'recipe_id': ids['recipe_id']}, None, None),
+
+        ('admin_create_trainer', 'admin_create_trainer', 'post', {}, None,
+         {'name': 'Admin Trainer', 'emailid': 'bench-admin-trainer@example.com', 'mobile': '9000000004',
+          'gender': 'male', 'experience': 2, 'specialization': 'Cardio'}),
+        ('assign_trainer_to_goal', 'assign_trainer_to_goal', 'post', {}, None,
+         {'trainer_id': trainer, 'goal_category': 'weight_loss'}),
+        ('remove_trainer_from_goal', 'remove_trainer_from_goal', 'post', {}, None, {'trainer_id': trainer}),
+        ('get_all_trainers', 'get_all_trainers', 'get', {}, None, None),
+        ('get_trainers_by_goal', 'get_trainers_by_goal', 'get', {'goal': 'weight_loss'}, None, None),
+
+        ('prometheus_metrics', 'prometheus_metrics', 'get', {}, None, None),
+    ]
+
+
+def api_route_names():
+    """Names of every top-level routed view outside EXCLUDED_ROUTES"""
+    return {
+        pattern.name
+        for pattern in get_resolver().url_patterns
+        # Included URLconfs (the Django admin) and unnamed static routes are skipped
+        if isinstance(pattern, URLPattern) and pattern.name and pattern.name not in EXCLUDED_ROUTES
+    }
+
+
+def missing_routes(scenarios):
+    """API routes that no scenario exercises"""
+    return sorted(api_route_names() - {route for _, route, *_ in scenarios})
+
+
+def caller_tokens(ids):
+    """Bearer tokens for the ROUTE_CALLERS roles, as login_user issues them"""
+    return {
+        'user': issue_token(ids['member_id'], 'user'),
+        'spare': issue_token(ids['spare_user_id'], 'user'),
+        'trainer': issue_token(ids['trainer_user_id'], 'trainer', ids['trainer_id']),
+        'admin': issue_token(ids['admin_id'], 'admin'),
+    }
+
+
+def send(client, method, url, params, payload, token=None):
+    """Issue one request the way the mobile app would"""
+    headers = {'Authorization': f'Bearer {token}'} if token else {}
+    if method == 'get':
+        return client.get(url, params or {}, headers=headers)
+    if method == 'multipart':
+        data = dict(payload, video_file=SimpleUploadedFile('upload.mp4', VIDEO_BYTES[:1024], 'video/mp4'))
+        return client.post(url, data, headers=headers)
+    return getattr(client, method)(url, json.dumps(payload or {}), content_type='application/json', headers=headers)
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def run_scenario(client, scenario, iterations, tokens):
+    """Time one scenario; every iteration runs in a transaction that is rolled back"""
+    label, route, method, kwargs, params, payload = scenario
+    url = reverse(route, kwargs=kwargs)
+    token = tokens.get(ROUTE_CALLERS.get(route, 'user'))
+    timings, queries, statuses = [], [], set()
+    for _ in range(iterations):
+        # Counted with a wrapper: connection.queries is capped and miscounts past its limit
+        timer = QueryTimer()
+        with transaction.atomic():
+            with connection.execute_wrapper(timer), contextlib.redirect_stdout(io.StringIO()):
+                started = time.perf_counter()
+                response = send(client, method, url, params, payload, token)
+                if response.streaming:
+                    b''.join(response.streaming_content)
+                timings.append((time.perf_counter() - started) * 1000)
+            transaction.set_rollback(True)
+        queries.append(timer.queries)
+        statuses.add(response.status_code)
+    return {
+        'route': route,
+        'method': method.upper(),
+        'status': sorted(statuses),
+        # The first (cold cache) run decides the budget, so take the worst case
+        'queries': max(queries),
+        'p50_ms': round(percentile(timings, 50), 2),
+        'p90_ms': round(percentile(timings, 90), 2),
+        'p99_ms': round(percentile(timings, 99), 2),
+    }
+
+
+def run_benchmark(volumes, iterations, progress=None):
+    """Seed the current (test) database and benchmark every scenario"""
+    ids = seed(volumes)
+    scenarios = build_scenarios(ids)
+    missing = missing_routes(scenarios)
+    if missing:
+        raise ValueError(f"No benchmark scenario for: {', '.join(missing)}")
+
+    # Start from cold caches so query counts do not depend on earlier runs
+    cache.clear()
+    food_search._index = None
+
+    client = Client()
+    tokens = caller_tokens(ids)
+    endpoints = {}
+    for scenario in scenarios:
+        endpoints[scenario[0]] = run_scenario(client, scenario, iterations, tokens)
+        if progress:
+            progress(scenario[0], endpoints[scenario[0]])
+    return {
+        'database': connection.vendor,
+        'volumes': volumes,
+        'iterations': iterations,
+        'endpoints': endpoints,
+    }
+
+
+def compare_reports(report, baseline, latency_tolerance=None, min_latency_increase=5.0):
+    """
+    List regressions of report against baseline: any extra query, a changed
+    status code, and, when latency_tolerance is given, a p50 that grew by
+    more than that factor (ignoring increases under min_latency_increase ms).
+    """
+    regressions = []
+    for label, result in report['endpoints'].items():
+        previous = baseline.get('endpoints', {}).get(label)
+        if previous is None:
+            continue
+        if result['queries'] > previous['queries']:
+            regressions.append(f"{label}: {previous['queries']} -> {result['queries']} queries")
+        if result['status'] != previous['status']:
+            regressions.append(f"{label}: status {previous['status']} -> {result['status']}")
+        if latency_tolerance and result['p50_ms'] > previous['p50_ms'] * latency_tolerance \
+                and result['p50_ms'] - previous['p50_ms'] >= min_latency_increase:
+            regressions.append(f"{label}: p50 {previous['p50_ms']}ms -> {result['p50_ms']}ms")
+    return regressions
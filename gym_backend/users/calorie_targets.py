@@ -0,0 +1,166 @@
+"""
+Calorie Target Batches
+The calorie target formula behind UserProfile.calculate_target_calories(),
+vectorised so the stored targets of every profile can be recomputed at once
+"""
+
+from .models import UserProfile
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; profiles are then computed one by one
+    np = None
+
+# Safe weekly weight change (kg) and daily calorie limits (medical recommendations)
+MAX_SAFE_LOSS = -1.0
+MIN_SAFE_LOSS = -0.5
+MAX_SAFE_GAIN = 1.0
+MIN_SAFE_GAIN = 0.5
+MAX_SAFE_CALORIES = 4000
+
+
+def calculate_one(current_weight, target_weight, target_months, gender, goal):
+    """
+    The target for one row in plain Python: calculate_batch() without NumPy,
+    and the reference the vectorised version must match
+    """
+    # Base Metabolic Rate (BMR) - calories needed at rest
+    bmr = current_weight * 24
+    weight_change = target_weight - current_weight
+    weeks = target_months * 4
+    weekly_change = weight_change / weeks if weeks > 0 else 0
+
+    warnings = []
+    adjusted_weekly_change = weekly_change
+    if weight_change < 0:  # Weight loss
+        if weekly_change < MAX_SAFE_LOSS:
+            warnings.append(f"Goal too aggressive! Losing {abs(weekly_change):.2f}kg/week is unsafe. Adjusted to 1kg/week max.")
+            adjusted_weekly_change = MAX_SAFE_LOSS
+        elif weekly_change > MIN_SAFE_LOSS:
+            warnings.append(f"Very slow progress: {abs(weekly_change):.2f}kg/week. Consider shorter timeline.")
+    elif weight_change > 0:  # Weight gain
+        if weekly_change > MAX_SAFE_GAIN:
+            warnings.append(f"Goal too aggressive! Gaining {weekly_change:.2f}kg/week is unhealthy. Adjusted to 1kg/week max.")
+            adjusted_weekly_change = MAX_SAFE_GAIN
+        elif weekly_change < MIN_SAFE_GAIN and goal == 'muscle_gain':
+            warnings.append(f"Very slow progress for muscle gain: {weekly_change:.2f}kg/week.")
+
+    # 1 kg of body weight = approximately 7700 calories
+    daily_adjustment = (adjusted_weekly_change * 7700) / 7
+    target_calories = bmr + daily_adjustment
+
+    # Absolute minimum safe calories (prevent starvation)
+    min_safe_calories = 1200 if gender == 'female' else 1500
+    if target_calories < min_safe_calories:
+        warnings.append(f"Calculated {target_calories:.0f} cal/day is below safe minimum. Set to {min_safe_calories} cal/day.")
+        target_calories = min_safe_calories
+    elif target_calories > MAX_SAFE_CALORIES:
+        warnings.append(f"Calculated {target_calories:.0f} cal/day exceeds safe maximum. Set to {MAX_SAFE_CALORIES} cal/day.")
+        target_calories = MAX_SAFE_CALORIES
+
+    return {
+        'target_calories': round(target_calories),
+        'bmr': round(bmr),
+        'weekly_change': round(adjusted_weekly_change, 2),
+        'daily_adjustment': round(daily_adjustment),
+        'warnings': warnings,
+        'is_safe': not warnings
+    }
+
+
+def calculate_batch(rows):
+    """
+    Targets for (current_weight, target_weight, target_months, gender, goal)
+    rows, in calculate_target_calories() form. The arithmetic runs on whole
+    columns; only the rows that get warnings are visited one by one.
+    """
+    if np is None:
+        return [calculate_one(*row) for row in rows]
+    if not rows:
+        return []
+
+    current, target, months, genders, goals = zip(*rows)
+    current = np.array(current, dtype=float)
+    months = np.array(months, dtype=float)
+    female = np.array(genders) == 'female'
+    muscle_gain = np.array(goals) == 'muscle_gain'
+
+    bmr = current * 24
+    weight_change = np.array(target, dtype=float) - current
+    weeks = months * 4
+    weekly_change = np.divide(weight_change, weeks, out=np.zeros_like(weight_change), where=weeks > 0)
+
+    losing = weight_change < 0
+    gaining = weight_change > 0
+    too_fast_loss = losing & (weekly_change < MAX_SAFE_LOSS)
+    slow_loss = losing & ~too_fast_loss & (weekly_change > MIN_SAFE_LOSS)
+    too_fast_gain = gaining & (weekly_change > MAX_SAFE_GAIN)
+    slow_muscle_gain = gaining & ~too_fast_gain & (weekly_change < MIN_SAFE_GAIN) & muscle_gain
+
+    adjusted = np.where(too_fast_loss, MAX_SAFE_LOSS, np.where(too_fast_gain, MAX_SAFE_GAIN, weekly_change))
+    daily_adjustment = (adjusted * 7700) / 7
+    raw_target = bmr + daily_adjustment
+
+    min_safe = np.where(female, 1200, 1500)
+    below = raw_target < min_safe
+    above = ~below & (raw_target > MAX_SAFE_CALORIES)
+    final_target = np.where(below, min_safe, np.where(above, MAX_SAFE_CALORIES, raw_target))
+
+    flagged = too_fast_loss | slow_loss | too_fast_gain | slow_muscle_gain | below | above
+    results = []
+    for i in range(len(rows)):
+        warnings = []
+        if flagged[i]:
+            weekly = float(weekly_change[i])
+            if too_fast_loss[i]:
+                warnings.append(f"Goal too aggressive! Losing {abs(weekly):.2f}kg/week is unsafe. Adjusted to 1kg/week max.")
+            elif slow_loss[i]:
+                warnings.append(f"Very slow progress: {abs(weekly):.2f}kg/week. Consider shorter timeline.")
+            elif too_fast_gain[i]:
+                warnings.append(f"Goal too aggressive! Gaining {weekly:.2f}kg/week is unhealthy. Adjusted to 1kg/week max.")
+            elif slow_muscle_gain[i]:
+                warnings.append(f"Very slow progress for muscle gain: {weekly:.2f}kg/week.")
+            if below[i]:
+                warnings.append(f"Calculated {float(raw_target[i]):.0f} cal/day is below safe minimum. Set to {int(min_safe[i])} cal/day.")
+            elif above[i]:
+                warnings.append(f"Calculated {float(raw_target[i]):.0f} cal/day exceeds safe maximum. Set to {MAX_SAFE_CALORIES} cal/day.")
+        # Python's round() on the results, so values match calculate_one() exactly
+        results.append({
+            'target_calories': round(float(final_target[i])),
+            'bmr': round(float(bmr[i])),
+            'weekly_change': round(float(adjusted[i]), 2),
+            'daily_adjustment': round(float(daily_adjustment[i])),
+            'warnings': warnings,
+            'is_safe': not warnings
+        })
+    return results
+
+
+def recompute_targets(queryset=None, batch_size=1000, dry_run=False):
+    """
+    Recompute and store the calorie targets of the given profiles (all by
+    default). Returns (profiles checked, profiles whose stored target changed).
+    """
+    queryset = UserProfile.objects.all() if queryset is None else queryset
+    checked = changed = 0
+    last_id = 0
+    while True:
+        batch = list(queryset.filter(id__gt=last_id).order_by('id').values_list(
+            'id', *UserProfile.TARGET_INPUT_FIELDS, *UserProfile.TARGET_FIELDS
+        )[:batch_size])
+        if not batch:
+            break
+        last_id = batch[-1][0]
+        checked += len(batch)
+
+        inputs = [row[1:6] for row in batch]
+        updates = []
+        for row, targets in zip(batch, calculate_batch(inputs)):
+            profile = UserProfile(id=row[0])
+            profile.apply_calorie_targets(targets)
+            if tuple(getattr(profile, field) for field in UserProfile.TARGET_FIELDS) != row[6:]:
+                updates.append(profile)
+        changed += len(updates)
+        if updates and not dry_run:
+            UserProfile.objects.bulk_update(updates, UserProfile.TARGET_FIELDS)
+    return checked, changed
@@ -0,0 +1,96 @@
+"""
+Read Replica Routing
+Sends the reads of @use_replica views to DATABASE_REPLICA_ALIAS, except for
+users who wrote recently (read-your-writes) and after a write in the request
+"""
+
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+# Set while a @use_replica view runs and nothing has pinned it to the primary
+replica_reads = ContextVar('replica_reads', default=False)
+
+
+def replica_alias():
+    """The configured replica alias, or None when reads stay on default"""
+    alias = getattr(settings, 'DATABASE_REPLICA_ALIAS', None)
+    return alias if alias and alias in settings.DATABASES else None
+
+
+def sticky_key(user_id):
+    return f'replica_sticky:{user_id}'
+
+
+def is_sticky(user_id):
+    """Whether user_id wrote within the last REPLICA_STICKY_SECONDS"""
+    return bool(user_id) and cache.get(sticky_key(user_id)) is not None
+
+
+def written_user_id(instance):
+    """UserLogin id a saved/deleted row belongs to, when it has one"""
+    if instance._meta.model_name == 'userlogin':
+        return instance.pk
+    field = next((f for f in instance._meta.concrete_fields if f.name == 'user'), None)
+    if field is not None and field.is_relation and field.related_model._meta.model_name == 'userlogin':
+        return getattr(instance, field.attname)
+    return None
+
+
+@receiver(post_save, dispatch_uid='users.db_routing.saved')
+@receiver(post_delete, dispatch_uid='users.db_routing.deleted')
+def record_write(sender, instance, **kwargs):
+    """Pin the writer's next reads, and the rest of this request, to the primary"""
+    replica_reads.set(False)
+    user_id = written_user_id(instance)
+    if user_id and replica_alias():
+        cache.set(sticky_key(user_id), 1, getattr(settings, 'REPLICA_STICKY_SECONDS', 10))
+
+
+class ReplicaRouter:
+    """Database router: writes go to default, reads of @use_replica views to the replica"""
+
+    def db_for_read(self, model, **hints):
+        if replica_reads.get():
+            return replica_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as default
+        return True
+
+
+def use_replica(view_func):
+    """
+    Mark a read-only view as safe to serve from the replica. The request's
+    user (user_id URL kwarg or GET param) keeps reading from the primary for
+    REPLICA_STICKY_SECONDS after their own write, so they see it at once.
+    """
+    def should_use_replica(request, kwargs):
+        return replica_alias() is not None and not is_sticky(kwargs.get('user_id') or request.GET.get('user_id'))
+
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def wrapper_view(request, *args, **kwargs):
+            token = replica_reads.set(should_use_replica(request, kwargs))
+            try:
+                return await view_func(request, *args, **kwargs)
+            finally:
+                replica_reads.reset(token)
+    else:
+        @wraps(view_func)
+        def wrapper_view(request, *args, **kwargs):
+            token = replica_reads.set(should_use_replica(request, kwargs))
+            try:
+                return view_func(request, *args, **kwargs)
+            finally:
+                replica_reads.reset(token)
+    return wrapper_view
@@ -0,0 +1,173 @@
+"""
+Diet Template Resolver
+Per-goal interval index over DietPlanTemplate calorie ranges, answering
+"best templates for this goal at N kcal" in O(log n) without touching the
+database; meals_data is only loaded for templates a caller expands
+"""
+
+import threading
+import time
+from bisect import bisect_right
+
+from django.conf import settings
+
+from .models import DietPlanTemplate, FoodItem
+
+# Calorie range used for the 'others' (maintenance) goal by body weight:
+# (heaviest weight in kg or None for the rest, calorie_min, calorie_max)
+MAINTENANCE_BUCKETS = (
+    (40, 1200, 1500),
+    (50, 1500, 1800),
+    (60, 1800, 2100),
+    (None, 2100, 2400),  # 61-70kg
+)
+
+# Diet types from least to most permissive; a preference accepts its own
+# level and everything stricter (a vegetarian can follow a vegan plan)
+DIET_LEVELS = {'vegan': 0, 'vegetarian': 1, 'non_veg': 2}
+
+
+def maintenance_range(weight):
+    """Calorie range of the 'others' goal templates for a body weight"""
+    for heaviest, low, high in MAINTENANCE_BUCKETS:
+        if heaviest is None or weight <= heaviest:
+            return low, high
+
+
+def template_diet_type(meals_data, food_diets):
+    """
+    Most permissive diet type among the foods of a template's meals
+    (vegan < vegetarian < non_veg). Foods missing from the catalog are ignored.
+    """
+    level = 0
+    for day_or_meal in (meals_data or {}).values():
+        meals = day_or_meal.values() if isinstance(day_or_meal, dict) else [day_or_meal]
+        for items in meals:
+            for item in items if isinstance(items, list) else []:
+                name = item.get('food') if isinstance(item, dict) else None
+                level = max(level, DIET_LEVELS.get(food_diets.get((name or '').lower()), 0))
+    return next(diet for diet, value in DIET_LEVELS.items() if value == level)
+
+
+class GoalIndex:
+    """
+    Templates of one goal cut into elementary calorie segments. boundaries
+    holds every calorie_min and calorie_max + 1 in order; segment i covers
+    [boundaries[i], boundaries[i + 1]) and lists the templates spanning it,
+    so a lookup is one bisect.
+    """
+
+    def __init__(self, summaries):
+        self.templates = sorted(summaries, key=lambda t: (t['calorie_min'], t['id']))
+        self.boundaries = sorted(
+            {t['calorie_min'] for t in summaries} | {t['calorie_max'] + 1 for t in summaries}
+        )
+        self.segments = [
+            [t for t in self.templates if t['calorie_min'] <= start <= t['calorie_max']]
+            for start in self.boundaries[:-1]
+        ]
+
+    def overlapping(self, low, high):
+        """Templates whose range overlaps [low, high]"""
+        first = max(bisect_right(self.boundaries, low) - 1, 0)
+        last = min(bisect_right(self.boundaries, high) - 1, len(self.segments) - 1)
+        found = {}
+        for segment in self.segments[first:last + 1]:
+            for template in segment:
+                found[template['id']] = template
+        return list(found.values())
+
+
+class DietTemplateIndex:
+    """Summaries of every template grouped per goal, plus the goal indexes"""
+
+    def __init__(self, templates, food_diets):
+        by_goal = {}
+        for template in templates:
+            summary = {
+                'id': template.id,
+                'name': template.name,
+                'goal_type': template.goal_type,
+                'calorie_min': template.calorie_min,
+                'calorie_max': template.calorie_max,
+                'description': template.description,
+                'diet_type': template_diet_type(template.meals_data, food_diets),
+                'daily_nutrition': (template.nutrition_totals or {}).get('daily_average'),
+            }
+            by_goal.setdefault(template.goal_type, []).append(summary)
+        self.goals = {goal: GoalIndex(summaries) for goal, summaries in by_goal.items()}
+        self.built_at = time.monotonic()
+
+    def resolve(self, goal=None, calories=None, calorie_range=None, diet_preference=None):
+        """
+        Template summaries, best fit first. calories keeps templates whose
+        range contains it, ranked by the narrowest range and then by how close
+        its midpoint is; calorie_range keeps templates overlapping (low, high).
+        Without either, every template of the goal(s) in calorie order.
+        """
+        if goal:
+            indexes = [self.goals[goal]] if goal in self.goals else []
+        else:
+            indexes = list(self.goals.values())
+        if calories is not None:
+            found = [t for index in indexes for t in index.overlapping(calories, calories)]
+            found.sort(key=lambda t: (
+                t['calorie_max'] - t['calorie_min'],
+                abs((t['calorie_min'] + t['calorie_max']) / 2 - calories),
+                t['id'],
+            ))
+        elif calorie_range is not None:
+            found = [t for index in indexes for t in index.overlapping(*calorie_range)]
+            found.sort(key=lambda t: (t['goal_type'], t['calorie_min'], t['id']))
+        else:
+            found = [t for index in indexes for t in index.templates]
+        allowed = DIET_LEVELS.get(diet_preference)
+        if allowed is not None:
+            found = [t for t in found if DIET_LEVELS[t['diet_type']] <= allowed]
+        return found
+
+
+_index = None
+_lock = threading.Lock()
+
+
+def get_index():
+    """The process-wide index, rebuilt from the database when missing or stale"""
+    global _index
+    ttl = getattr(settings, 'DIET_TEMPLATE_INDEX_TTL', 300)
+    index = _index
+    if index is None or time.monotonic() - index.built_at > ttl:
+        with _lock:
+            if _index is None or time.monotonic() - _index.built_at > ttl:
+                food_diets = {name.lower(): diet for name, diet in FoodItem.objects.values_list('name', 'diet_type')}
+                _index = DietTemplateIndex(DietPlanTemplate.objects.all(), food_diets)
+            index = _index
+    return index
+
+
+def invalidate():
+    """Drop this process's index; the next lookup rebuilds it"""
+    global _index
+    with _lock:
+        _index = None
+
+
+def resolve_templates(goal=None, calories=None, calorie_range=None, diet_preference=None, expand=False):
+    """
+    Best templates for a goal and calorie target (see DietTemplateIndex.resolve).
+    With expand, meals_data and the per-day nutrition_totals are loaded for
+    the returned templates in one query.
+    """
+    summaries = get_index().resolve(goal, calories, calorie_range, diet_preference)
+    if not expand:
+        return [dict(summary) for summary in summaries]
+    details = {
+        template_id: (meals_data, nutrition_totals)
+        for template_id, meals_data, nutrition_totals in DietPlanTemplate.objects.filter(
+            id__in=[t['id'] for t in summaries]
+        ).values_list('id', 'meals_data', 'nutrition_totals')
+    }
+    return [
+        dict(summary, meals_data=details[summary['id']][0], nutrition_totals=details[summary['id']][1])
+        for summary in summaries if summary['id'] in details
+    ]
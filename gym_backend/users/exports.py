@@ -0,0 +1,151 @@
+"""
+Data Exports
+Members, payments and renewals streamed as CSV or NDJSON in constant memory:
+rows are fetched in id-keyset pages, and renewals are prefetched once per
+page rather than once per member
+"""
+
+import csv
+import json
+
+from django.utils import timezone
+
+from .models import SubscriptionRenewal, UserLogin, UserProfile
+
+DEFAULT_CHUNK_SIZE = 2000
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def local_datetime(value):
+    return timezone.localtime(value).strftime('%Y-%m-%d %H:%M:%S') if value else ''
+
+
+def keyset_batches(queryset, chunk_size):
+    """
+    Yield the rows of queryset in id order, chunk_size at a time. Paging by id
+    keeps memory bounded on MySQL too, where iterator() buffers the whole
+    result set client-side.
+    """
+    last_id = 0
+    while True:
+        batch = list(queryset.filter(id__gt=last_id).order_by('id')[:chunk_size])
+        if not batch:
+            return
+        last_id = batch[-1].id
+        yield from batch
+
+
+def member_rows(using, chunk_size):
+    users = UserLogin.objects.using(using).filter(role='user').select_related(
+        'profile', 'profile__assigned_trainer__user'
+    )
+    for user in keyset_batches(users, chunk_size):
+        profile = getattr(user, 'profile', None)
+        trainer = profile.assigned_trainer if profile else None
+        yield {
+            'id': user.id,
+            'name': user.name,
+            'email': user.emailid,
+            'is_active': user.is_active,
+            'joined_at': local_datetime(user.created_at),
+            'mobile': profile.mobile_number if profile else '',
+            'age': profile.age if profile else '',
+            'gender': profile.gender if profile else '',
+            'goal': profile.goal if profile else '',
+            'payment_status': profile.payment_status if profile else False,
+            'assigned_trainer_id': trainer.id if trainer else '',
+            'assigned_trainer': trainer.user.name if trainer else '',
+            'subscription_end_date': local_datetime(profile.subscription_end_date) if profile else '',
+        }
+
+
+def payment_rows(using, chunk_size):
+    # The renewal prefetch runs once per page
+    profiles = UserProfile.objects.using(using).filter(payment_status=True).select_related(
+        'user'
+    ).prefetch_related('user__subscription_renewals')
+    for profile in keyset_batches(profiles, chunk_size):
+        user = profile.user
+        renewals = user.subscription_renewals.all()  # Newest first (model ordering)
+        yield {
+            'user_id': user.id,
+            'name': user.name,
+            'email': user.emailid,
+            'payment_amount': profile.payment_amount,
+            'payment_method': profile.payment_method or '',
+            'payment_date': local_datetime(profile.payment_date),
+            'subscription_start_date': local_datetime(profile.subscription_start_date),
+            'subscription_end_date': local_datetime(profile.subscription_end_date),
+            'renewal_count': len(renewals),
+            'renewal_total': sum(r.amount for r in renewals),
+            'last_renewed_at': local_datetime(renewals[0].renewed_at) if renewals else '',
+        }
+
+
+def renewal_rows(using, chunk_size):
+    renewals = SubscriptionRenewal.objects.using(using).select_related('user')
+    for renewal in keyset_batches(renewals, chunk_size):
+        yield {
+            'id': renewal.id,
+            'user_id': renewal.user_id,
+            'name': renewal.user.name,
+            'email': renewal.user.emailid,
+            'months': renewal.months,
+            'amount': renewal.amount,
+            'payment_method': renewal.payment_method or '',
+            'renewed_at': local_datetime(renewal.renewed_at),
+        }
+
+
+# Dataset name -> (CSV columns, row generator)
+DATASETS = {
+    'members': (
+        ('id', 'name', 'email', 'is_active', 'joined_at', 'mobile', 'age', 'gender', 'goal',
+         'payment_status', 'assigned_trainer_id', 'assigned_trainer', 'subscription_end_date'),
+        member_rows,
+    ),
+    'payments': (
+        ('user_id', 'name', 'email', 'payment_amount', 'payment_method', 'payment_date',
+         'subscription_start_date', 'subscription_end_date', 'renewal_count', 'renewal_total',
+         'last_renewed_at'),
+        payment_rows,
+    ),
+    'renewals': (
+        ('id', 'user_id', 'name', 'email', 'months', 'amount', 'payment_method', 'renewed_at'),
+        renewal_rows,
+    ),
+}
+
+
+class LineBuffer:
+    """File-like object whose write() hands the line back to the caller"""
+
+    def write(self, value):
+        return value
+
+
+def export_lines(dataset, fmt, using='default', chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yield the export of dataset ('members', 'payments' or 'renewals') as text
+    lines in fmt ('csv' or 'ndjson'). Raises ValueError for unknown names.
+    """
+    if dataset not in DATASETS:
+        raise ValueError(f"Invalid dataset. Choose from: {', '.join(DATASETS)}")
+    if fmt not in FORMATS:
+        raise ValueError(f"Invalid format. Choose from: {', '.join(FORMATS)}")
+    columns, rows = DATASETS[dataset]
+
+    def generate():
+        if fmt == 'csv':
+            writer = csv.writer(LineBuffer())
+            yield writer.writerow(columns)
+            for row in rows(using, chunk_size):
+                yield writer.writerow([row[column] for column in columns])
+        else:
+            for row in rows(using, chunk_size):
+                yield json.dumps(row, separators=(',', ':')) + '\n'
+
+    return generate()
@@ -0,0 +1,160 @@
+"""
+Food Catalog
+Full catalog payloads for the food pickers: validators for conditional GETs,
+rows streamed from value tuples in the classic or a compact columnar shape,
+and versioned deltas for clients that keep a local copy
+"""
+
+import hashlib
+import json
+
+from .models import FoodCatalogVersion, FoodItem, FoodItemTombstone, UserProfile
+
+# Map common allergy terms to food categories
+ALLERGY_CATEGORY_MAP = {
+    'milk': 'dairy',
+    'dairy': 'dairy',
+    'seafood': 'seafood',
+    'fish': 'seafood',
+    'nuts': 'nuts',
+    'eggs': 'eggs',
+    'egg': 'eggs'
+}
+
+FORMATS = ('full', 'columnar')
+CHUNK_SIZE = 500
+
+# Columns of the catalog rows, in values_list() order
+FIELDS = ('id', 'name', 'food_category', 'diet_type', 'calories', 'protein', 'carbs', 'fats', 'serving_size')
+# Columnar mode sends these as indexes into a per-response list of distinct values
+DICTIONARY_COLUMNS = {'food_category': 'category', 'diet_type': 'diet_type', 'serving_size': 'serving_size'}
+
+
+def catalog_queryset(user_id=None, exclude_allergies=False):
+    """
+    Food items, optionally restricted to what the user's diet preference and
+    allergies allow. An unknown user gets the whole catalog.
+    """
+    foods = FoodItem.objects.all()
+    if not (user_id and exclude_allergies):
+        return foods
+    try:
+        profile = UserProfile.objects.get(user_id=user_id)
+    except (UserProfile.DoesNotExist, ValueError):
+        return foods
+
+    # vegan: only vegan foods
+    # vegetarian: vegan + vegetarian foods (no meat/seafood)
+    # non_veg: all foods
+    if profile.diet_preference == 'vegan':
+        foods = foods.filter(diet_type='vegan')
+    elif profile.diet_preference == 'vegetarian':
+        foods = foods.filter(diet_type__in=['vegan', 'vegetarian'])
+
+    if profile.food_allergies:
+        allergies = [a.strip().lower() for a in profile.food_allergies.split(',')]
+        excluded_categories = sorted({ALLERGY_CATEGORY_MAP[a] for a in allergies if a in ALLERGY_CATEGORY_MAP})
+        if excluded_categories:
+            foods = foods.exclude(food_category__in=excluded_categories)
+    return foods
+
+
+def catalog_validators(foods, fmt):
+    """
+    (etag, last_modified) for a catalog queryset from the catalog version,
+    which every FoodItem save and delete advances. The ETag also covers the
+    filter and the format.
+    """
+    version, last_modified = FoodCatalogVersion.current()
+    key = f'{fmt}|{foods.query}|{version}'
+    etag = '"%s"' % hashlib.sha1(key.encode()).hexdigest()
+    return etag, last_modified
+
+
+def catalog_rows(foods):
+    """Catalog rows as value tuples in FIELDS order, without building model instances"""
+    return foods.values_list(*FIELDS).iterator(chunk_size=CHUNK_SIZE)
+
+
+def serialize_row(row):
+    """Catalog payload for one values_list() row"""
+    food_id, name, category, diet_type, calories, protein, carbs, fats, serving_size = row
+    return {
+        'id': food_id,
+        'name': name,
+        'category': category,
+        'diet_type': diet_type,
+        'calories': float(calories),
+        'protein': float(protein),
+        'carbs': float(carbs),
+        'fats': float(fats),
+        'serving_size': serving_size
+    }
+
+
+def stream_full(foods):
+    """The classic {'success', 'foods': [...], 'total'} payload, one row at a time"""
+    yield '{"success":true,"foods":['
+    total = 0
+    for row in catalog_rows(foods):
+        yield (',' if total else '') + json.dumps(serialize_row(row), separators=(',', ':'))
+        total += 1
+    yield '],"total":%d}' % total
+
+
+def catalog_changes(since):
+    """
+    Return (version, changed rows, removed ids) since a catalog version, for
+    clients keeping a local copy. since=0 returns the whole catalog. Raises
+    ValueError when since is negative or newer than the catalog.
+    """
+    # Read the version first: anything committed afterwards is at least
+    # resent by the next sync, never skipped
+    version, _ = FoodCatalogVersion.current()
+    if since < 0 or since > version:
+        raise ValueError(f'since must be between 0 and the current version ({version})')
+    foods = FoodItem.objects.order_by('id')
+    if not since:
+        return version, [serialize_row(row) for row in catalog_rows(foods)], []
+    changed = [serialize_row(row) for row in catalog_rows(foods.filter(version__gt=since))]
+    changed_ids = {row['id'] for row in changed}
+    removed = [
+        food_id
+        for food_id in FoodItemTombstone.objects.filter(version__gt=since).order_by('food_id').values_list('food_id', flat=True)
+        if food_id not in changed_ids
+    ]
+    return version, changed, removed
+
+
+def compact_number(value):
+    """Decimal as the shortest JSON number: 52.00 -> 52, 0.30 -> 0.3"""
+    number = float(value)
+    return int(number) if number.is_integer() else number
+
+
+def build_columnar(foods):
+    """
+    Parallel arrays, one per field, in a single payload. Repeated strings
+    (category, diet type, serving size) are sent once each and referenced
+    by index.
+    """
+    columns = {name: [] for name in ('id', 'name', 'calories', 'protein', 'carbs', 'fats')}
+    dictionaries = {name: {} for name in DICTIONARY_COLUMNS.values()}
+    indexes = {name: [] for name in DICTIONARY_COLUMNS.values()}
+    for row in catalog_rows(foods):
+        for field, value in zip(FIELDS, row):
+            if field in DICTIONARY_COLUMNS:
+                name = DICTIONARY_COLUMNS[field]
+                indexes[name].append(dictionaries[name].setdefault(value, len(dictionaries[name])))
+            elif field in ('id', 'name'):
+                columns[field].append(value)
+            else:
+                columns[field].append(compact_number(value))
+    columns.update(indexes)
+    return json.dumps({
+        'success': True,
+        'format': 'columnar',
+        'total': len(columns['id']),
+        'columns': columns,
+        'dictionaries': {name: list(values) for name, values in dictionaries.items()},
+    }, separators=(',', ':'))
@@ -0,0 +1,194 @@
+"""
+Food Search Index
+In-memory trigram + prefix index over FoodItem names for search-as-you-type
+"""
+
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+
+from .models import FoodItem
+
+# Rank of each match kind; fuzzy matches score below these by trigram similarity
+EXACT_SCORE = 4.0
+PREFIX_SCORE = 3.0
+WORD_PREFIX_SCORE = 2.0
+SUBSTRING_SCORE = 1.5
+
+# Minimum share of the query's trigrams a name must contain for a fuzzy match
+FUZZY_THRESHOLD = 0.5
+
+
+def normalize(text):
+    """Lowercase and collapse whitespace so 'Brown  Rice' matches 'brown rice'"""
+    return ' '.join(text.lower().split())
+
+
+def trigrams(text):
+    """Trigrams of a normalized string, padded so word starts/ends weigh in"""
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def serialize_food(food):
+    """Search result payload for one food item"""
+    return {
+        'id': food.id,
+        'name': food.name,
+        'category': food.food_category,
+        'diet_type': food.diet_type,
+        'calories_per_100g': float(food.calories),
+        'protein': float(food.protein),
+        'carbs': float(food.carbs),
+        'fats': float(food.fats),
+        'serving_size': food.serving_size
+    }
+
+
+class FoodSearchIndex:
+    """
+    Trigram, word-prefix and category/diet indexes over the food catalog.
+    Lookups only touch the index; the database is read when the index is
+    built and each time it goes stale (see FOOD_SEARCH_INDEX_TTL).
+    """
+
+    def __init__(self, foods=()):
+        self.items = {}          # id -> (normalized name, trigrams, payload)
+        self.trigram_index = {}  # trigram -> set of ids
+        self.words = []          # sorted (word, id) pairs for prefix lookups
+        self.by_category = {}    # food_category -> set of ids
+        self.by_diet_type = {}   # diet_type -> set of ids
+        self.built_at = time.monotonic()
+        for food in foods:
+            self._add(food)
+        self.words.sort()
+
+    def _add(self, food):
+        name = normalize(food.name)
+        grams = trigrams(name)
+        self.items[food.id] = (name, grams, serialize_food(food))
+        for gram in grams:
+            self.trigram_index.setdefault(gram, set()).add(food.id)
+        self.by_category.setdefault(food.food_category, set()).add(food.id)
+        self.by_diet_type.setdefault(food.diet_type, set()).add(food.id)
+        return [(word, food.id) for word in set(name.split())]
+
+    def add(self, food):
+        """Index a new or changed food item"""
+        self.remove(food.id)
+        for pair in self._add(food):
+            self.words.insert(bisect_left(self.words, pair), pair)
+
+    def remove(self, food_id):
+        """Drop a food item from every index"""
+        entry = self.items.pop(food_id, None)
+        if entry is None:
+            return
+        name, grams, payload = entry
+        for gram in grams:
+            ids = self.trigram_index.get(gram)
+            if ids:
+                ids.discard(food_id)
+        self.by_category.get(payload['category'], set()).discard(food_id)
+        self.by_diet_type.get(payload['diet_type'], set()).discard(food_id)
+        for word in set(name.split()):
+            pos = bisect_left(self.words, (word, food_id))
+            if pos < len(self.words) and self.words[pos] == (word, food_id):
+                del self.words[pos]
+
+    def _word_prefix_matches(self, prefix):
+        """Ids of items with a word starting with prefix"""
+        ids = set()
+        pos = bisect_left(self.words, (prefix, -1))
+        while pos < len(self.words) and self.words[pos][0].startswith(prefix):
+            ids.add(self.words[pos][1])
+            pos += 1
+        return ids
+
+    def search(self, query, category='', diet_type='', limit=50):
+        """Ranked payloads of items matching query, best match first"""
+        query = normalize(query)
+        if not query:
+            return []
+
+        allowed = None
+        if category:
+            allowed = self.by_category.get(category, set())
+        if diet_type:
+            diet_ids = self.by_diet_type.get(diet_type, set())
+            allowed = diet_ids if allowed is None else allowed & diet_ids
+
+        query_grams = trigrams(query)
+        candidates = set()
+        for word in query.split():
+            candidates |= self._word_prefix_matches(word)
+        if len(query) >= 3:
+            for gram in query_grams:
+                candidates |= self.trigram_index.get(gram, set())
+        else:
+            # Too short for trigrams: fall back to a substring scan
+            candidates |= {food_id for food_id, (name, _, _) in self.items.items() if query in name}
+        if allowed is not None:
+            candidates &= allowed
+
+        scored = []
+        for food_id in candidates:
+            name, grams, payload = self.items[food_id]
+            if name == query:
+                score = EXACT_SCORE
+            elif name.startswith(query):
+                score = PREFIX_SCORE
+            elif any(word.startswith(query) for word in name.split()):
+                score = WORD_PREFIX_SCORE
+            elif query in name:
+                score = SUBSTRING_SCORE
+            else:
+                # Measured against the query only, so long names are not penalised
+                score = len(query_grams & grams) / len(query_grams)
+                if score < FUZZY_THRESHOLD:
+                    continue
+            scored.append((-score, len(name), name, payload))
+
+        scored.sort(key=lambda item: item[:3])
+        return [payload for _, _, _, payload in scored[:limit]]
+
+
+_index = None
+_lock = threading.RLock()
+
+
+def get_index():
+    """The process-wide index, rebuilt from the database when missing or stale"""
+    global _index
+    ttl = getattr(settings, 'FOOD_SEARCH_INDEX_TTL', 300)
+    index = _index
+    if index is None or time.monotonic() - index.built_at > ttl:
+        with _lock:
+            if _index is None or time.monotonic() - _index.built_at > ttl:
+                _index = FoodSearchIndex(FoodItem.objects.all())
+            index = _index
+    return index
+
+
+def search_foods(query, category='', diet_type='', limit=50):
+    """Search the food catalog through the in-memory index"""
+    index = get_index()
+    # Incremental updates mutate the index in place, so reads take the lock too
+    with _lock:
+        return index.search(query, category, diet_type, limit)
+
+
+def food_saved(food):
+    """Refresh a saved food item in this process's index, if it is built"""
+    if _index is not None:
+        with _lock:
+            _index.add(food)
+
+
+def food_deleted(food_id):
+    """Remove a deleted food item from this process's index, if it is built"""
+    if _index is not None:
+        with _lock:
+            _index.remove(food_id)
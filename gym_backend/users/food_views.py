@@ -7,13 +7,19 @@ from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 import json
 from datetime import datetime, timedelta, date
-from .models import UserLogin, UserProfile, FoodItem, FoodEntry
+from .models import UserLogin, UserProfile, FoodItem, FoodEntry, DailyNutritionSummary
+from .async_utils import alist, async_csrf_exempt, gather
+from .db_routing import use_replica
+from . import food_search
+from .food_catalog import catalog_changes
+from .identity import aidentity_denied, identity_denied
 
 
 @csrf_exempt
 def search_foods(request):
     """
-    Search for food items by name, category, or diet type
+    Search for food items by name, category, or diet type.
+    Served from the in-memory index and ranked exact > prefix > word prefix > substring > fuzzy.
     GET params: query, category (optional), diet_type (optional), limit (default: 50)
     """
     if request.method == 'GET':
@@ -29,30 +35,7 @@ def search_foods(request):
                     'message': 'Query parameter is required'
                 }, status=400)
             
-            # Build query
-            foods = FoodItem.objects.filter(name__icontains=query)
-            
-            if category:
-                foods = foods.filter(food_category=category)
-            
-            if diet_type:
-                foods = foods.filter(diet_type=diet_type)
-            
-            foods = foods[:limit]
-            
-            foods_data = []
-            for food in foods:
-                foods_data.append({
-                    'id': food.id,
-                    'name': food.name,
-                    'category': food.food_category,
-                    'diet_type': food.diet_type,
-                    'calories_per_100g': float(food.calories),
-                    'protein': float(food.protein),
-                    'carbs': float(food.carbs),
-                    'fats': float(food.fats),
-                    'serving_size': food.serving_size
-                })
+            foods_data = food_search.search_foods(query, category, diet_type, limit)
             
             return JsonResponse({
                 'success': True,
@@ -72,6 +55,51 @@ def search_foods(request):
     }, status=405)
 
 
+@csrf_exempt
+def get_catalog_changes(request):
+    """
+    Food catalog changes for clients that keep a local copy
+    GET params: since (catalog version from the previous sync; 0 or omitted for everything)
+    Returns: the current version, changed/added items and removed item ids
+    """
+    if request.method == 'GET':
+        try:
+            try:
+                since = int(request.GET.get('since') or 0)
+            except ValueError:
+                return JsonResponse({
+                    'success': False,
+                    'message': 'since must be an integer'
+                }, status=400)
+            try:
+                version, changed, removed = catalog_changes(since)
+            except ValueError as e:
+                return JsonResponse({
+                    'success': False,
+                    'message': str(e)
+                }, status=400)
+            
+            return JsonResponse({
+                'success': True,
+                'version': version,
+                'since': since,
+                'full': since == 0,
+                'changed': changed,
+                'removed': removed
+            }, status=200)
+            
+        except Exception as e:
+            return JsonResponse({
+                'success': False,
+                'message': str(e)
+            }, status=500)
+    
+    return JsonResponse({
+        'success': False,
+        'message': 'Only GET method is allowed'
+    }, status=405)
+
+
 @csrf_exempt
 def get_food_categories(request):
     """Get all food categories"""
@@ -135,6 +163,10 @@ def add_food_entry(request):
                     'message': 'user_id, quantity, meal_type, and entry_date are required'
                 }, status=400)
             
+            denied = identity_denied(request, user_id=user_id)
+            if denied:
+                return denied
+            
             # Parse entry date
             try:
                 entry_date = datetime.strptime(entry_date_str, '%Y-%m-%d').date()
@@ -232,8 +264,8 @@ def add_food_entry(request):
     }, status=405)
 
 
-@csrf_exempt
-def get_daily_food_entries(request):
+@async_csrf_exempt
+async def get_daily_food_entries(request):
     """
     Get all food entries for a specific date
     GET params: user_id, date (YYYY-MM-DD)
@@ -249,6 +281,10 @@ def get_daily_food_entries(request):
                     'message': 'user_id and date parameters are required'
                 }, status=400)
             
+            denied = await aidentity_denied(request, user_id=user_id)
+            if denied:
+                return denied
+            
             # Parse date
             try:
                 entry_date = datetime.strptime(date_str, '%Y-%m-%d').date()
@@ -258,18 +294,24 @@ def get_daily_food_entries(request):
                     'message': 'Invalid date format. Use YYYY-MM-DD'
                 }, status=400)
             
-            # Check if user exists
+            # Check the user exists while fetching the day's entries, the rollup
+            # holding the daily breakdown and total, and the profile together
             try:
-                user = UserLogin.objects.get(id=user_id)
+                user, entries, summary, profile = await gather(
+                    UserLogin.objects.aget(id=user_id),
+                    alist(FoodEntry.objects.filter(
+                        user_id=user_id,
+                        entry_date=entry_date
+                    ).select_related('food_item').order_by('meal_type', '-created_at')),
+                    DailyNutritionSummary.for_range(user_id, entry_date, entry_date).afirst(),
+                    UserProfile.objects.filter(user_id=user_id).afirst()
+                )
             except UserLogin.DoesNotExist:
                 return JsonResponse({
                     'success': False,
                     'message': 'User not found'
                 }, status=404)
             
-            # Get daily entries
-            entries = FoodEntry.objects.filter(user=user, entry_date=entry_date).order_by('meal_type', '-created_at')
-            
             entries_data = []
             for entry in entries:
                 entries_data.append({
@@ -283,15 +325,17 @@ def get_daily_food_entries(request):
                     'created_at': entry.created_at.strftime('%Y-%m-%d %H:%M:%S')
                 })
             
-            # Get daily breakdown and total
-            daily_total = FoodEntry.get_daily_total(user, entry_date)
-            daily_breakdown = FoodEntry.get_daily_breakdown(user, entry_date)
+            if summary:
+                daily_total = summary.total_calories
+                daily_breakdown = summary.get_breakdown()
+            else:
+                daily_total = 0
+                daily_breakdown = DailyNutritionSummary.empty_breakdown()
             
             # Get user's calorie target from profile
             user_calorie_target = 0
             try:
-                profile = UserProfile.objects.get(user=user)
-                calorie_data = profile.calculate_target_calories()
+                calorie_data = profile.get_calorie_targets()
                 user_calorie_target = calorie_data['target_calories']
             except:
                 pass
@@ -321,10 +365,12 @@ def get_daily_food_entries(request):
 
 
 @csrf_exempt
+@use_replica
 def get_food_history(request):
     """
     Get food entries history for a date range
-    GET params: user_id, start_date (optional, YYYY-MM-DD), end_date (optional, YYYY-MM-DD), days (default: 30)
+    GET params: user_id, start_date (optional, YYYY-MM-DD), end_date (optional, YYYY-MM-DD), days (default: 30),
+                include_entries (default: true; 'false' returns daily totals only)
     """
     if request.method == 'GET':
         try:
@@ -339,6 +385,10 @@ def get_food_history(request):
                     'message': 'user_id parameter is required'
                 }, status=400)
             
+            denied = identity_denied(request, user_id=user_id)
+            if denied:
+                return denied
+            
             # Check if user exists
             try:
                 user = UserLogin.objects.get(id=user_id)
@@ -371,43 +421,40 @@ def get_food_history(request):
             else:
                 start_date = end_date - timedelta(days=days)
             
-            # Get entries in date range
-            entries = FoodEntry.objects.filter(
-                user=user,
-                entry_date__gte=start_date,
-                entry_date__lte=end_date
-            ).order_by('-entry_date', 'meal_type')
-            
-            # Group by date
+            # Daily totals and breakdowns come from the rollup, newest first
             daily_data = {}
-            for entry in entries:
-                date_key = entry.entry_date.strftime('%Y-%m-%d')
-                if date_key not in daily_data:
-                    daily_data[date_key] = {
-                        'date': date_key,
-                        'total_calories': 0,
-                        'entries': [],
-                        'breakdown': {}
-                    }
-                
-                daily_data[date_key]['entries'].append({
-                    'id': entry.id,
-                    'food_name': entry.food_item.name,
-                    'meal_type': entry.meal_type,
-                    'quantity': entry.quantity,
-                    'quantity_unit': entry.quantity_unit,
-                    'calories': float(entry.calculated_calories)
-                })
-                daily_data[date_key]['total_calories'] += float(entry.calculated_calories)
-            
-            # Calculate breakdown for each day
-            for date_key in daily_data:
-                entry_date_obj = datetime.strptime(date_key, '%Y-%m-%d').date()
-                breakdown = FoodEntry.get_daily_breakdown(user, entry_date_obj)
-                daily_data[date_key]['breakdown'] = breakdown
+            for summary in DailyNutritionSummary.for_range(user, start_date, end_date):
+                date_key = summary.date.strftime('%Y-%m-%d')
+                daily_data[date_key] = {
+                    'date': date_key,
+                    'total_calories': float(summary.total_calories),
+                    'entries': [],
+                    'breakdown': summary.get_breakdown()
+                }
             
-            # Convert to list and sort by date
-            history_list = sorted(daily_data.values(), key=lambda x: x['date'], reverse=True)
+            # Attach the individual entries unless only totals were asked for
+            include_entries = request.GET.get('include_entries', 'true').lower() != 'false'
+            if include_entries and daily_data:
+                entries = FoodEntry.objects.filter(
+                    user=user,
+                    entry_date__gte=start_date,
+                    entry_date__lte=end_date
+                ).select_related('food_item').order_by('-entry_date', 'meal_type')
+                
+                for entry in entries:
+                    date_key = entry.entry_date.strftime('%Y-%m-%d')
+                    if date_key not in daily_data:
+                        continue
+                    daily_data[date_key]['entries'].append({
+                        'id': entry.id,
+                        'food_name': entry.food_item.name,
+                        'meal_type': entry.meal_type,
+                        'quantity': entry.quantity,
+                        'quantity_unit': entry.quantity_unit,
+                        'calories': float(entry.calculated_calories)
+                    })
+            
+            history_list = list(daily_data.values())
             
             # Calculate statistics
             total_days = len(history_list)
@@ -420,7 +467,7 @@ def get_food_history(request):
             user_calorie_target = 0
             try:
                 profile = UserProfile.objects.get(user=user)
-                calorie_data = profile.calculate_target_calories()
+                calorie_data = profile.get_calorie_targets()
                 user_calorie_target = calorie_data['target_calories']
             except:
                 pass
@@ -468,6 +515,10 @@ def delete_food_entry(request):
                     'message': 'entry_id and user_id are required'
                 }, status=400)
             
+            denied = identity_denied(request, user_id=user_id)
+            if denied:
+                return denied
+            
             try:
                 entry = FoodEntry.objects.get(id=entry_id, user_id=user_id)
                 entry.delete()
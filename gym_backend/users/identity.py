@@ -0,0 +1,199 @@
+"""
+API Identity
+Signed, expiring bearer tokens issued at login that carry the caller's user
+id, role and trainer id. IdentityMiddleware verifies them without a database
+hit and exposes the result as request.identity
+"""
+
+from collections import namedtuple
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core import signing
+from django.http import JsonResponse
+from django.urls import Resolver404, resolve
+
+from .models import UserProfile
+
+TOKEN_SALT = 'users.identity'
+STREAM_SALT = 'users.video-stream'
+
+Identity = namedtuple('Identity', ['user_id', 'role', 'trainer_id'])
+
+
+def token_max_age():
+    return getattr(settings, 'API_TOKEN_MAX_AGE', 7 * 24 * 3600)
+
+
+def issue_token(user_id, role, trainer_id=None):
+    """A signed token for the caller; it expires API_TOKEN_MAX_AGE seconds after issue"""
+    return signing.dumps([user_id, role, trainer_id], salt=TOKEN_SALT, compress=True)
+
+
+def read_token(token):
+    """The Identity in a token. Raises signing.BadSignature (or SignatureExpired)."""
+    user_id, role, trainer_id = signing.loads(token, salt=TOKEN_SALT, max_age=token_max_age())
+    return Identity(user_id, role, trainer_id)
+
+
+def sign_stream(video_id, user_id, role='user'):
+    """
+    Signed query token letting user_id play video_id until
+    VIDEO_STREAM_URL_MAX_AGE passes. Links for trainers and admins skip the
+    member unlock check.
+    """
+    return signing.dumps([video_id, user_id, role], salt=STREAM_SALT, compress=True)
+
+
+def read_stream_token(token, video_id):
+    """
+    (user_id, role) of the caller a stream token was issued to. Raises
+    signing.BadSignature (or SignatureExpired), also when it was issued for
+    another video.
+    """
+    signed_video_id, user_id, role = signing.loads(
+        token, salt=STREAM_SALT, max_age=getattr(settings, 'VIDEO_STREAM_URL_MAX_AGE', 6 * 3600)
+    )
+    if signed_video_id != video_id:
+        raise signing.BadSignature('Token was issued for another video')
+    return user_id, role
+
+
+def bearer_token(request):
+    """The token of an 'Authorization: Bearer <token>' header, or None"""
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() != 'bearer':
+        return None
+    return token.strip() or None
+
+
+def denial(identity, user_id, trainer_id):
+    """'user' or 'trainer' when the identity may not name them, before any member lookup"""
+    if identity is None or identity.role == 'admin':
+        return None
+    if identity.role == 'trainer':
+        return 'trainer' if trainer_id is not None and str(trainer_id) != str(identity.trainer_id) else None
+    if user_id is not None:
+        return 'user' if str(user_id) != str(identity.user_id) else None
+    return 'trainer' if trainer_id is not None else None
+
+
+def assigned_members(identity, user_id):
+    """
+    For a trainer naming a member, the profiles that must exist for the member
+    to be assigned to them (one indexed lookup); None when no check is needed
+    """
+    if identity is None or identity.role != 'trainer' or user_id is None:
+        return None
+    try:
+        user_id = int(user_id)
+    except (TypeError, ValueError):
+        return UserProfile.objects.none()
+    return UserProfile.objects.filter(user_id=user_id, assigned_trainer_id=identity.trainer_id)
+
+
+def forbidden(denied):
+    return JsonResponse({
+        'success': False,
+        'message': f'Token does not belong to this {denied}'
+    }, status=403)
+
+
+def identity_denied(request, user_id=None, trainer_id=None):
+    """
+    A 403 response when the verified caller may not act for the member or
+    trainer a request names, otherwise None. Members may only name
+    themselves, trainers their own trainer id and the members assigned to
+    them, and admins anyone. Requests without a token are left to the view
+    while API_TOKEN_REQUIRED is off.
+    """
+    identity = getattr(request, 'identity', None)
+    denied = denial(identity, user_id, trainer_id)
+    members = assigned_members(identity, user_id)
+    if denied is None and members is not None and not members.exists():
+        denied = 'user'
+    return forbidden(denied) if denied else None
+
+
+async def aidentity_denied(request, user_id=None, trainer_id=None):
+    """identity_denied for async views"""
+    identity = getattr(request, 'identity', None)
+    denied = denial(identity, user_id, trainer_id)
+    members = assigned_members(identity, user_id)
+    if denied is None and members is not None and not await members.aexists():
+        denied = 'user'
+    return forbidden(denied) if denied else None
+
+
+def unauthorized(message):
+    return JsonResponse({'success': False, 'message': message}, status=401)
+
+
+def admin_denied(request):
+    """A 401/403 response unless the caller holds an admin token, otherwise None"""
+    identity = getattr(request, 'identity', None)
+    if identity is None:
+        return unauthorized('Authentication token required')
+    if identity.role != 'admin':
+        return JsonResponse({
+            'success': False,
+            'message': 'Admin access required'
+        }, status=403)
+    return None
+
+
+def admin_required(view):
+    """
+    Refuse the view to anyone but an admin, also while API_TOKEN_REQUIRED is
+    off, since it exposes every member
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        return admin_denied(request) or view(request, *args, **kwargs)
+    return wrapper
+
+
+class IdentityMiddleware:
+    """
+    Set request.identity from the bearer token (None without one). A bad or
+    expired token gets a 401. With API_TOKEN_REQUIRED, API calls without a
+    token do too, except the views in API_TOKEN_EXEMPT_VIEWS.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.authenticate(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        return self.authenticate(request) or await self.get_response(request)
+
+    def authenticate(self, request):
+        """Set request.identity; return a 401 response when the request is refused"""
+        request.identity = None
+        token = bearer_token(request)
+        if token:
+            try:
+                request.identity = read_token(token)
+            except signing.SignatureExpired:
+                return unauthorized('Token expired. Please log in again.')
+            except (signing.BadSignature, ValueError, TypeError):
+                return unauthorized('Invalid token')
+            return None
+        if getattr(settings, 'API_TOKEN_REQUIRED', False) and request.path_info.startswith('/api/'):
+            try:
+                url_name = resolve(request.path_info).url_name
+            except Resolver404:
+                return None
+            if url_name not in getattr(settings, 'API_TOKEN_EXEMPT_VIEWS', ()):
+                return unauthorized('Authentication token required')
+        return None
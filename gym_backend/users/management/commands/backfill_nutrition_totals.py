@@ -0,0 +1,49 @@
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+
+from users.meal_nutrition import compute_totals, get_lookup
+from users.models import DietPlanTemplate, UserDietPlan
+
+MODELS = {
+    'templates': DietPlanTemplate,
+    'plans': UserDietPlan,
+}
+
+
+class Command(BaseCommand):
+    help = 'Compute the stored nutrition totals of diet templates and user diet plans (e.g. after running a create_*_templates.py script)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', choices=list(MODELS), help='Only templates or only plans (default: both)')
+        parser.add_argument('--batch-size', type=int, default=200, help='Rows per batch (default: 200)')
+
+    def handle(self, *args, **options):
+        lookup = get_lookup()
+        unmatched = Counter()
+        for label, model in MODELS.items():
+            if options['only'] and options['only'] != label:
+                continue
+            updated = 0
+            last_id = 0
+            while True:
+                batch = list(
+                    model.objects.filter(id__gt=last_id).order_by('id').only('id', 'meals_data')[:options['batch_size']]
+                )
+                if not batch:
+                    break
+                last_id = batch[-1].id
+                for row in batch:
+                    row.nutrition_totals = compute_totals(row.meals_data, lookup)
+                    unmatched.update(row.nutrition_totals['unmatched'])
+                # bulk_update skips save(), so the totals are written exactly as computed here
+                model.objects.bulk_update(batch, ['nutrition_totals'])
+                updated += len(batch)
+            self.stdout.write(self.style.SUCCESS(f'Updated {updated} {label}'))
+
+        if unmatched:
+            self.stdout.write(self.style.WARNING(
+                'Foods not found in the catalog (add FoodItems or FoodAlias rows, then re-run):'
+            ))
+            for name, count in unmatched.most_common():
+                self.stdout.write(f'  {name}: {count} plan(s)')
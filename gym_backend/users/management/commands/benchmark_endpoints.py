@@ -0,0 +1,77 @@
+import json
+import os
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from users.benchmark import DEFAULT_VOLUMES, compare_reports, run_benchmark
+
+
+class Command(BaseCommand):
+    help = 'Benchmark every API route against a seeded test database and report latency and query counts'
+
+    def add_arguments(self, parser):
+        for name, default in DEFAULT_VOLUMES.items():
+            parser.add_argument(
+                f"--{name.replace('_', '-')}", type=int, default=default, dest=name,
+                help=f'Seeded {name.replace("_", " ")} (default: {default})'
+            )
+        parser.add_argument('--iterations', type=int, default=20, help='Requests per endpoint (default: 20)')
+        parser.add_argument('--output', help='Write the JSON report to this file (default: stdout)')
+        parser.add_argument('--baseline', help='Fail when the report regresses against this JSON report')
+        parser.add_argument(
+            '--latency-tolerance', type=float,
+            help='Also fail when a p50 latency exceeds the baseline by this factor (e.g. 1.5)'
+        )
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1:
+            raise CommandError('--iterations must be at least 1')
+        if options['users'] < 2 or options['trainers'] < 1:
+            raise CommandError('At least 2 users and 1 trainer are needed')
+        volumes = {name: options[name] for name in DEFAULT_VOLUMES}
+
+        baseline = None
+        if options['baseline']:
+            try:
+                with open(options['baseline']) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'Could not read baseline: {e}')
+            # Query counts of list endpoints scale with the data, so only like-for-like runs compare
+            if baseline.get('volumes') != volumes:
+                raise CommandError(f"Baseline was recorded with volumes {baseline.get('volumes')}; rerun with those")
+
+        # Never touch the real database, media or metrics folders
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with tempfile.TemporaryDirectory() as scratch, \
+                    override_settings(
+                        MEDIA_ROOT=scratch, METRICS_DIR=os.path.join(scratch, 'metrics'), DATABASE_REPLICA_ALIAS=None
+                    ):
+                report = run_benchmark(volumes, options['iterations'], self.progress)
+        except ValueError as e:
+            raise CommandError(str(e))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+            self.stderr.write(f"Report written to {options['output']}")
+        else:
+            self.stdout.write(output)
+
+        if baseline is not None:
+            regressions = compare_reports(report, baseline, options['latency_tolerance'])
+            if regressions:
+                raise CommandError('Regressions against baseline:\n  ' + '\n  '.join(regressions))
+            self.stderr.write(self.style.SUCCESS('No regressions against baseline'))
+
+    def progress(self, label, result):
+        self.stderr.write(f"  {label:<40} {result['queries']:>4} queries  p50 {result['p50_ms']:>8.2f}ms")
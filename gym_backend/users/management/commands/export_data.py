@@ -0,0 +1,34 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users.exports import DATASETS, DEFAULT_CHUNK_SIZE, FORMATS, export_lines
+
+
+class Command(BaseCommand):
+    help = 'Export members, payments or renewals as CSV or NDJSON without loading them into memory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=list(DATASETS))
+        parser.add_argument('--format', choices=list(FORMATS), default='csv', help='Output format (default: csv)')
+        parser.add_argument('--output', help='File to write (default: stdout)')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help=f'Rows fetched per database round trip (default: {DEFAULT_CHUNK_SIZE})')
+        parser.add_argument('--database', default='default', help='Database alias to read from (default: default)')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be a positive integer')
+        lines = export_lines(options['dataset'], options['format'], options['database'], options['chunk_size'])
+
+        if not options['output']:
+            sys.stdout.writelines(lines)
+            return
+        count = 0
+        with open(options['output'], 'w', newline='', encoding='utf-8') as f:
+            for line in lines:
+                f.write(line)
+                count += 1
+        if options['format'] == 'csv':
+            count -= 1  # Header
+        self.stderr.write(self.style.SUCCESS(f"Wrote {count} {options['dataset']} rows to {options['output']}"))
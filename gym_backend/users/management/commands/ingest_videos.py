@@ -0,0 +1,267 @@
+import csv
+import hashlib
+import json
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+
+from users.models import Trainer, WorkoutVideo
+from users.video_catalog import invalidate_catalog
+
+UPLOAD_DIR = 'workout_videos'
+CHUNK_SIZE = 1024 * 1024
+
+GOAL_TYPES = [goal for goal, _ in WorkoutVideo.GOAL_TYPE_CHOICES]
+DIFFICULTY_LEVELS = [level for level, _ in WorkoutVideo.DIFFICULTY_LEVEL_CHOICES]
+
+# Weight difference ranges used by the bulk upload scripts
+WEIGHT_RANGES = {
+    'beginner': (0, 10),
+    'advanced': (11, 30),
+}
+
+
+class Journal:
+    """
+    Append-only JSON lines log of finished work, so an interrupted import
+    can resume without re-hashing, re-copying or re-creating anything.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.copied = {}     # source key -> {'sha256', 'stored_name'}
+        self.committed = set()
+        self.lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    record = json.loads(line)
+                    if record['event'] == 'copied':
+                        self.copied[record['source']] = record
+                    elif record['event'] == 'committed':
+                        self.committed.add(record['sha256'])
+
+    def write(self, record):
+        with self.lock:
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+
+def source_key(path):
+    """Identify a source file by path, size and mtime so edits invalidate the journal"""
+    stat = os.stat(path)
+    return f'{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}'
+
+
+def load_manifest(path):
+    """Rows from a CSV (with header) or JSON (list of objects) manifest"""
+    if path.lower().endswith('.json'):
+        with open(path) as f:
+            rows = json.load(f)
+        if not isinstance(rows, list):
+            raise CommandError('JSON manifest must be a list of objects')
+        return rows
+    with open(path, newline='') as f:
+        return list(csv.DictReader(f))
+
+
+class Command(BaseCommand):
+    help = 'Ingest workout videos listed in a CSV/JSON manifest (parallel, resumable, de-duplicated)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('manifest', help='CSV or JSON manifest of videos to ingest')
+        parser.add_argument('--source-dir', help='Folder holding the files (default: the manifest folder)')
+        parser.add_argument('--workers', type=int, default=4, help='Parallel copy/hash threads (default: 4)')
+        parser.add_argument('--journal', help='Progress journal path (default: <manifest>.journal)')
+        parser.add_argument('--trainer', type=int, help='Trainer id recorded as uploader (default: none, admin managed)')
+        parser.add_argument('--batch-size', type=int, default=100, help='Rows per bulk_create (default: 100)')
+
+    def handle(self, *args, **options):
+        manifest_path = options['manifest']
+        if not os.path.exists(manifest_path):
+            raise CommandError(f'Manifest not found: {manifest_path}')
+        source_dir = options['source_dir'] or os.path.dirname(os.path.abspath(manifest_path))
+        self.lock = threading.Lock()
+        self.reserved_names = set()
+        self.claimed_hashes = set()
+        journal = Journal(options['journal'] or f'{manifest_path}.journal')
+
+        trainer = None
+        if options['trainer']:
+            try:
+                trainer = Trainer.objects.get(id=options['trainer'])
+            except Trainer.DoesNotExist:
+                raise CommandError(f"Trainer with ID {options['trainer']} not found")
+
+        rows = [self.clean_row(row, index, source_dir) for index, row in enumerate(load_manifest(manifest_path), 1)]
+        known_hashes = set(
+            WorkoutVideo.objects.exclude(content_hash='').values_list('content_hash', flat=True)
+        )
+
+        self.stdout.write(f'Ingesting {len(rows)} videos with {options["workers"]} workers...')
+        results = [None] * len(rows)
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            futures = {
+                pool.submit(self.copy_and_hash, row, journal, known_hashes): index
+                for index, row in enumerate(rows)
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                index = futures[future]
+                try:
+                    results[index] = future.result()
+                except OSError as e:
+                    self.stderr.write(f"  ✗ {rows[index]['filename']}: {e}")
+                    continue
+                self.stdout.write(f"  [{done}/{len(rows)}] {rows[index]['filename']}")
+
+        # Keep manifest order, and drop duplicates within the manifest itself
+        to_create = []
+        seen = set()
+        skipped = 0
+        for row, result in zip(rows, results):
+            if result is None:
+                continue
+            if not result['stored_name'] or result['sha256'] in known_hashes \
+                    or result['sha256'] in journal.committed or result['sha256'] in seen:
+                skipped += 1
+                continue
+            seen.add(result['sha256'])
+            to_create.append((row, result))
+
+        created = self.create_videos(to_create, trainer, journal, options['batch_size'])
+        failed = sum(1 for result in results if result is None)
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {created} videos, skipped {skipped} already ingested, {failed} failed'
+        ))
+
+    def clean_row(self, row, index, source_dir):
+        """Validate one manifest row and fill in defaults"""
+        filename = (row.get('filename') or '').strip()
+        if not filename:
+            raise CommandError(f'Row {index}: filename is required')
+        goal_type = (row.get('goal_type') or '').strip()
+        if goal_type not in GOAL_TYPES:
+            raise CommandError(f"Row {index}: goal_type must be one of {', '.join(GOAL_TYPES)}")
+        difficulty = (row.get('difficulty_level') or 'beginner').strip()
+        if difficulty not in DIFFICULTY_LEVELS:
+            raise CommandError(f"Row {index}: difficulty_level must be one of {', '.join(DIFFICULTY_LEVELS)}")
+        min_weight, max_weight = WEIGHT_RANGES[difficulty]
+        return {
+            'filename': filename,
+            'path': os.path.join(source_dir, filename),
+            'title': (row.get('title') or os.path.splitext(filename)[0]).strip(),
+            'description': (row.get('description') or '').strip(),
+            'goal_type': goal_type,
+            'difficulty_level': difficulty,
+            'min_weight_difference': self.int_column(row, index, 'min_weight', min_weight),
+            'max_weight_difference': self.int_column(row, index, 'max_weight', max_weight),
+            'duration': self.int_column(row, index, 'duration'),
+            'day_number': self.int_column(row, index, 'day_number'),
+        }
+
+    def int_column(self, row, index, column, default=None):
+        """A whole-number column of a manifest row, or default when it is blank"""
+        value = row.get(column)
+        if value in (None, ''):
+            return default
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise CommandError(f'Row {index}: {column} must be a whole number, got {value!r}')
+
+    def copy_and_hash(self, row, journal, known_hashes):
+        """
+        Hash a source file and copy it into MEDIA_ROOT unless the same
+        content was already ingested. Runs in a worker thread.
+        """
+        key = source_key(row['path'])
+        if key in journal.copied:
+            return journal.copied[key]
+
+        sha256 = hashlib.sha256()
+        with open(row['path'], 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                sha256.update(chunk)
+        digest = sha256.hexdigest()
+        # Only the first worker to see a given content copies it
+        with self.lock:
+            if digest in known_hashes or digest in self.claimed_hashes:
+                return {'sha256': digest, 'stored_name': None}
+            self.claimed_hashes.add(digest)
+
+        # Copy to a temporary name first so a crash never leaves a partial video
+        stored_name = self.reserve_name(row['filename'])
+        target = default_storage.path(stored_name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        partial = f'{target}.{uuid.uuid4().hex}.part'
+        with open(row['path'], 'rb') as src, open(partial, 'wb') as dst:
+            for chunk in iter(lambda: src.read(CHUNK_SIZE), b''):
+                dst.write(chunk)
+        os.replace(partial, target)
+
+        record = {'event': 'copied', 'source': key, 'sha256': digest, 'stored_name': stored_name}
+        journal.write(record)
+        return record
+
+    def reserve_name(self, filename):
+        """Pick a free storage name that no other worker thread is about to use"""
+        with self.lock:
+            name = default_storage.get_available_name(f'{UPLOAD_DIR}/{filename}')
+            while name in self.reserved_names:
+                name = default_storage.get_available_name(f'{UPLOAD_DIR}/{uuid.uuid4().hex[:7]}_{filename}')
+            self.reserved_names.add(name)
+            return name
+
+    def create_videos(self, to_create, trainer, journal, batch_size):
+        """Create WorkoutVideo rows, numbering days per goal after the existing ones"""
+        next_day = {
+            row['goal_type']: (row['last_day'] or 0) + 1
+            for row in WorkoutVideo.objects.filter(uploaded_via='bulk').values('goal_type').annotate(
+                last_day=Max('day_number')
+            ).order_by()
+        }
+
+        videos = []
+        for row, result in to_create:
+            day_number = row['day_number']
+            if day_number is None:
+                day_number = next_day.get(row['goal_type'], 1)
+            next_day[row['goal_type']] = max(next_day.get(row['goal_type'], 1), day_number + 1)
+            videos.append(WorkoutVideo(
+                title=row['title'],
+                description=row['description'],
+                video_file=result['stored_name'],
+                goal_type=row['goal_type'],
+                difficulty_level=row['difficulty_level'],
+                min_weight_difference=row['min_weight_difference'],
+                max_weight_difference=row['max_weight_difference'],
+                duration=row['duration'],
+                day_number=day_number,
+                uploaded_by=trainer,
+                uploaded_via='bulk',
+                content_hash=result['sha256'],
+                is_active=True
+            ))
+
+        for start in range(0, len(videos), batch_size):
+            batch = videos[start:start + batch_size]
+            with transaction.atomic():
+                WorkoutVideo.objects.bulk_create(batch)
+            for video in batch:
+                journal.write({'event': 'committed', 'sha256': video.content_hash})
+
+        if videos:
+            # bulk_create skips save(), so drop cached video lists explicitly
+            invalidate_catalog()
+        return len(videos)
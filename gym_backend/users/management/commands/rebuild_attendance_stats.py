@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from users.models import AttendanceStats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild AttendanceStats counters and streaks from Attendance rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids',
+                            help='Only rebuild this user id (repeatable)')
+
+    def handle(self, *args, **options):
+        written = AttendanceStats.rebuild(user_ids=options['user_ids'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} attendance stats'))
@@ -0,0 +1,34 @@
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users.models import DailyNutritionSummary
+
+
+class Command(BaseCommand):
+    help = 'Rebuild DailyNutritionSummary rollups from FoodEntry rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids',
+                            help='Only rebuild this user id (repeatable)')
+        parser.add_argument('--start-date', help='First day to rebuild (YYYY-MM-DD)')
+        parser.add_argument('--end-date', help='Last day to rebuild (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        start_date = self.parse_date(options['start_date'], '--start-date')
+        end_date = self.parse_date(options['end_date'], '--end-date')
+
+        written = DailyNutritionSummary.rebuild(
+            user_ids=options['user_ids'],
+            start_date=start_date,
+            end_date=end_date
+        )
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} daily nutrition summaries'))
+
+    def parse_date(self, value, option):
+        if not value:
+            return None
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            raise CommandError(f'Invalid {option} format. Use YYYY-MM-DD')
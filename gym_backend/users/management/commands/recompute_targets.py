@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from users.calorie_targets import np, recompute_targets
+from users.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = 'Recompute the stored calorie targets of user profiles (run after changing the formula)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids',
+                            help='Only this user id (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Profiles per batch (default: 1000)')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many targets are out of date')
+
+    def handle(self, *args, **options):
+        profiles = UserProfile.objects.all()
+        if options['user_ids']:
+            profiles = profiles.filter(user_id__in=options['user_ids'])
+
+        if np is None:
+            self.stderr.write('NumPy is not installed; computing profiles one by one')
+        checked, changed = recompute_targets(profiles, options['batch_size'], options['dry_run'])
+
+        verb = 'would change' if options['dry_run'] else 'updated'
+        self.stdout.write(self.style.SUCCESS(f'Checked {checked} profiles, {verb} {changed}'))
@@ -0,0 +1,223 @@
+"""
+Meal Plan Nutrition
+Resolves free-text meal plan items such as {"food": "Oats", "quantity": "60g"}
+or {"food": "Banana", "quantity": "1 medium"} against the food catalog and
+totals calories and macros per meal and per day
+"""
+
+import re
+import threading
+import time
+
+from django.conf import settings
+
+from .food_search import normalize
+from .models import FoodAlias, FoodCatalogVersion, FoodItem
+
+NUTRIENTS = ('calories', 'protein', 'carbs', 'fats')
+
+# Plan names whose catalog entry is worded differently; tried in order after
+# exact names and FoodAlias rows. Catalog names are per 100g.
+DEFAULT_ALIASES = {
+    'chicken breast': ('chicken (breast)',),
+    'chicken thigh': ('chicken (thigh)',),
+    'chicken curry': ('chicken curry (kerala)', 'chicken curry'),
+    'rice (brown, cooked)': ('brown rice',),
+    'rice (white, cooked)': ('white rice', 'basmati rice'),
+    'lentils (cooked)': ('lentils (red)', 'moong dal'),
+    'olive oil': ('oil (olive)',),
+    'dates': ('date', 'dried dates'),
+    'mixed vegetables': ('vegetable jalfrezi',),
+}
+
+# Grams per unit; ml counts as grams (water density) for milk, oils and the like
+UNIT_GRAMS = {
+    'g': 1, 'kg': 1000, 'ml': 1, 'l': 1000,
+    'cup': 240, 'bowl': 200, 'tbsp': 15, 'tsp': 5, 'scoop': 30,
+    'piece': 50, 'slice': 30, 'small': 90, 'medium': 120, 'large': 150,
+}
+UNIT_SPELLINGS = {
+    'gm': 'g', 'gms': 'g', 'gram': 'g', 'grams': 'g', 'litre': 'l', 'liter': 'l',
+    'pieces': 'piece', 'pcs': 'piece', 'pc': 'piece', 'slices': 'slice', 'cups': 'cup',
+    'bowls': 'bowl', 'scoops': 'scoop', 'tablespoon': 'tbsp', 'teaspoon': 'tsp',
+}
+# Per-food weights of counted units, matched by a word in the food name
+FOOD_UNIT_GRAMS = (
+    ('banana', {'small': 101, 'medium': 118, 'large': 136}),
+    ('apple', {'small': 149, 'medium': 182, 'large': 223}),
+    ('orange', {'small': 96, 'medium': 131, 'large': 184}),
+    ('egg', {'piece': 50}),
+    ('roti', {'piece': 40}),
+    ('bread', {'slice': 30}),
+)
+
+QUANTITY_RE = re.compile(r'^\s*(\d+(?:\.\d+)?)(?:\s*/\s*(\d+))?\s*([a-z]*)', re.IGNORECASE)
+QUALIFIER_RE = re.compile(r'\s*\([^)]*\)\s*$')
+
+
+def parse_quantity(text):
+    """'60g' -> (60.0, 'g'), '1 medium' -> (1.0, 'medium'), '1/2 cup' -> (0.5, 'cup'); None if unreadable"""
+    match = QUANTITY_RE.match(str(text or ''))
+    if not match:
+        return None
+    whole, denominator, unit = match.groups()
+    amount = float(whole) / float(denominator) if denominator else float(whole)
+    unit = unit.lower() or 'piece'
+    unit = UNIT_SPELLINGS.get(unit, unit)
+    return (amount, unit) if unit in UNIT_GRAMS else None
+
+
+def quantity_grams(food_name, quantity):
+    """Weight in grams of a plan item, or None when the quantity is unreadable"""
+    parsed = parse_quantity(quantity)
+    if parsed is None:
+        return None
+    amount, unit = parsed
+    words = set(re.findall(r'[a-z]+', food_name.lower()))
+    for keyword, weights in FOOD_UNIT_GRAMS:
+        if unit in weights and (keyword in words or f'{keyword}s' in words):
+            return amount * weights[unit]
+    return amount * UNIT_GRAMS[unit]
+
+
+class NutritionLookup:
+    """Normalized catalog names and aliases -> nutrients per 100g"""
+
+    def __init__(self, foods, aliases, version=0):
+        self.by_name = {}
+        by_id = {}
+        for food_id, name, *nutrients in foods:
+            values = tuple(float(value) for value in nutrients)
+            by_id[food_id] = values
+            self.by_name.setdefault(normalize(name), values)
+        self.by_alias = {normalize(alias): by_id[food_id] for alias, food_id in aliases if food_id in by_id}
+        self.version = version
+        self.built_at = time.monotonic()
+
+    def resolve(self, name):
+        """
+        Nutrients per 100g for a plan food name: exact catalog name, FoodAlias,
+        DEFAULT_ALIASES, the name without its '(...)' qualifier, then the
+        singular of its first word. None when nothing matches.
+        """
+        key = normalize(name or '')
+        if not key:
+            return None
+        candidates = [key, *DEFAULT_ALIASES.get(key, ())]
+        bare = QUALIFIER_RE.sub('', key)
+        if bare != key:
+            candidates.append(bare)
+        first, _, rest = key.partition(' ')
+        if first.endswith('s') and not first.endswith('ss'):
+            candidates.append(f'{first[:-1]} {rest}'.strip())
+        for candidate in candidates:
+            values = self.by_alias.get(candidate) or self.by_name.get(candidate)
+            if values:
+                return values
+        return None
+
+
+_lookup = None
+_lock = threading.Lock()
+
+
+def get_lookup():
+    """The process-wide lookup, rebuilt when the catalog version moved or the TTL ran out"""
+    global _lookup
+    version, _ = FoodCatalogVersion.current()
+    ttl = getattr(settings, 'FOOD_SEARCH_INDEX_TTL', 300)
+    lookup = _lookup
+    if lookup is None or lookup.version != version or time.monotonic() - lookup.built_at > ttl:
+        with _lock:
+            _lookup = NutritionLookup(
+                FoodItem.objects.values_list('id', 'name', *NUTRIENTS).order_by('id'),
+                FoodAlias.objects.values_list('alias', 'food_id'),
+                version,
+            )
+            lookup = _lookup
+    return lookup
+
+
+def invalidate():
+    """Drop this process's lookup; the next totals computation rebuilds it"""
+    global _lookup
+    with _lock:
+        _lookup = None
+
+
+def empty_totals():
+    return dict.fromkeys(NUTRIENTS, 0.0)
+
+
+def add_totals(total, values):
+    for nutrient in NUTRIENTS:
+        total[nutrient] += values[nutrient]
+
+
+def rounded(totals):
+    return {nutrient: round(value, 1) for nutrient, value in totals.items()}
+
+
+def compute_totals(meals_data, lookup=None):
+    """
+    Totals of a meals_data document, either {day: {meal: [items]}} or
+    {meal: [items]} (reported as day 'daily'):
+
+        {'days': {day: {'meals': {meal: totals}, 'total': totals}},
+         'daily_average': totals, 'matched_items': n, 'total_items': n,
+         'unmatched': [food names that could not be resolved or weighed]}
+    """
+    lookup = lookup or get_lookup()
+    meals_data = meals_data if isinstance(meals_data, dict) else {}
+    if meals_data and all(isinstance(value, dict) for value in meals_data.values()):
+        days = meals_data
+    else:
+        days = {'daily': meals_data}
+
+    result_days = {}
+    average = empty_totals()
+    matched = total_items = 0
+    unmatched = set()
+    for day, meals in days.items():
+        day_total = empty_totals()
+        meal_totals = {}
+        for meal, items in meals.items():
+            meal_total = empty_totals()
+            for item in items if isinstance(items, list) else []:
+                if not isinstance(item, dict):
+                    continue
+                total_items += 1
+                name = str(item.get('food') or '')
+                per_100g = lookup.resolve(name)
+                grams = quantity_grams(name, item.get('quantity')) if per_100g else None
+                if grams is None:
+                    unmatched.add(name)
+                    continue
+                matched += 1
+                add_totals(meal_total, dict(zip(NUTRIENTS, (value * grams / 100 for value in per_100g))))
+            meal_totals[meal] = rounded(meal_total)
+            add_totals(day_total, meal_total)
+        result_days[day] = {'meals': meal_totals, 'total': rounded(day_total)}
+        add_totals(average, day_total)
+
+    count = len(result_days) or 1
+    return {
+        'days': result_days,
+        'daily_average': rounded({nutrient: value / count for nutrient, value in average.items()}),
+        'matched_items': matched,
+        'total_items': total_items,
+        'unmatched': sorted(unmatched),
+    }
+
+
+def refresh_nutrition_totals(instance, save_kwargs):
+    """
+    Recompute instance.nutrition_totals from its meals_data ahead of save(),
+    unless the save is limited to update_fields that leave meals_data alone
+    """
+    update_fields = save_kwargs.get('update_fields')
+    if update_fields is not None:
+        if 'meals_data' not in update_fields:
+            return
+        save_kwargs['update_fields'] = {*update_fields, 'nutrition_totals'}
+    instance.nutrition_totals = compute_totals(instance.meals_data)
@@ -0,0 +1,201 @@
+"""
+Protected Media Views
+Range-capable delivery of workout video files with unlock enforcement.
+Callers are identified by the signed link get_user_videos issues or by their
+bearer token, never by an id they pass in
+"""
+
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.core import signing
+from django.http import FileResponse, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.csrf import csrf_exempt
+
+from .identity import read_stream_token
+from .models import UserProfile, WorkoutVideo
+from .video_catalog import can_watch
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+
+
+def parse_range(header, size):
+    """
+    Parse a single-range 'bytes=start-end' header into an inclusive
+    (start, end) pair. Returns None when the header should be ignored and
+    raises ValueError when the range cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None  # Multi-range or malformed: serve the whole file
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        # Suffix range: the last N bytes
+        length = int(end)
+        if length == 0:
+            raise ValueError('Unsatisfiable range')
+        return max(0, size - length), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        raise ValueError('Unsatisfiable range')
+    return start, end
+
+
+def iter_file_range(path, start, end):
+    """Yield the bytes of path from start to end (inclusive) in chunks"""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def offload_response(video, path, content_type):
+    """
+    Hand the transfer to the front web server when MEDIA_ACCEL_BACKEND is
+    configured. The web server then handles Range requests itself.
+    """
+    backend = getattr(settings, 'MEDIA_ACCEL_BACKEND', None)
+    if backend == 'nginx':
+        prefix = getattr(settings, 'MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + video.video_file.name
+        return response
+    if backend == 'sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = path
+        return response
+    return None
+
+
+@csrf_exempt
+def stream_workout_video(request, video_id):
+    """
+    Stream a workout video file to a user who has unlocked it
+    GET params: token (the signed link from get_user_videos or
+    list_trainer_videos); without it the
+    bearer token identifies the caller, and trainers and admins may play any video
+    Supports Range/If-Range, ETag/If-None-Match and Last-Modified/If-Modified-Since
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return JsonResponse({
+            'success': False,
+            'message': 'Only GET method is allowed'
+        }, status=405)
+
+    token = request.GET.get('token')
+    identity = request.identity
+    if token:
+        try:
+            user_id, role = read_stream_token(token, video_id)
+        except signing.SignatureExpired:
+            return JsonResponse({
+                'success': False,
+                'message': 'Video link expired. Reload the video list.'
+            }, status=403)
+        except (signing.BadSignature, ValueError, TypeError):
+            return JsonResponse({
+                'success': False,
+                'message': 'Invalid video link'
+            }, status=403)
+    elif identity is not None:
+        user_id, role = identity.user_id, identity.role
+    else:
+        return JsonResponse({
+            'success': False,
+            'message': 'A signed video link or an authentication token is required'
+        }, status=401)
+
+    staff = role in ('trainer', 'admin')
+    try:
+        video = WorkoutVideo.objects.get(id=video_id)
+        user_profile = None if staff else UserProfile.objects.get(user_id=user_id)
+    except WorkoutVideo.DoesNotExist:
+        return JsonResponse({
+            'success': False,
+            'message': 'Video not found'
+        }, status=404)
+    except UserProfile.DoesNotExist:
+        return JsonResponse({
+            'success': False,
+            'message': 'User profile not found'
+        }, status=404)
+
+    if not staff and not can_watch(user_profile, video):
+        return JsonResponse({
+            'success': False,
+            'message': 'This video is locked for this user'
+        }, status=403)
+
+    if not video.video_file:
+        return JsonResponse({
+            'success': False,
+            'message': 'Video file not found'
+        }, status=404)
+    try:
+        path = video.video_file.path
+        stat = os.stat(path)
+    except (NotImplementedError, OSError):
+        return JsonResponse({
+            'success': False,
+            'message': 'Video file not found'
+        }, status=404)
+
+    size = stat.st_size
+    etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+    last_modified = http_date(stat.st_mtime)
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+    # Conditional GET: ETag wins over the date when both are sent
+    if_none_match = request.headers.get('If-None-Match')
+    if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    if (if_none_match and etag in [tag.strip() for tag in if_none_match.split(',')]) or \
+            (not if_none_match and if_modified_since and int(stat.st_mtime) <= if_modified_since):
+        response = HttpResponse(status=304)
+        response['ETag'] = etag
+        response['Last-Modified'] = last_modified
+        return response
+
+    response = offload_response(video, path, content_type)
+    if response is None:
+        byte_range = None
+        range_header = request.headers.get('Range')
+        if_range = request.headers.get('If-Range')
+        # A stale If-Range means the client's partial copy is outdated: send it all
+        if range_header and (not if_range or if_range in (etag, last_modified)):
+            try:
+                byte_range = parse_range(range_header, size)
+            except ValueError:
+                response = HttpResponse(status=416)
+                response['Content-Range'] = f'bytes */{size}'
+                return response
+
+        if byte_range:
+            start, end = byte_range
+            body = iter_file_range(path, start, end) if request.method == 'GET' else []
+            response = StreamingHttpResponse(body, status=206, content_type=content_type)
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Length'] = str(end - start + 1)
+        elif request.method == 'GET':
+            response = FileResponse(open(path, 'rb'), content_type=content_type)
+        else:
+            response = HttpResponse(content_type=content_type)
+            response['Content-Length'] = str(size)
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = last_modified
+    # Unlock rules are per user, so shared caches must not reuse the response
+    response['Cache-Control'] = 'private, max-age=3600'
+    return response
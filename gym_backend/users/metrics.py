@@ -0,0 +1,265 @@
+"""
+Request Metrics
+Per-route latency, SQL query count and SQL time aggregates, shared between
+worker processes through one JSON file per process, rendered for Prometheus
+"""
+
+import glob
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+# Upper bounds of the histogram buckets; +Inf is implied
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# Metric name -> (help text, buckets)
+HISTOGRAMS = {
+    'gym_http_request_duration_seconds': ('Request latency by route', LATENCY_BUCKETS),
+    'gym_db_queries_per_request': ('SQL queries issued per request by route', QUERY_BUCKETS),
+    'gym_db_time_per_request_seconds': ('Time spent in SQL per request by route', LATENCY_BUCKETS),
+}
+REQUESTS_TOTAL = 'gym_http_requests_total'
+
+STORE_FILE_RE = re.compile(r'metrics-(\d+)\.json')
+
+
+def metrics_dir():
+    return getattr(settings, 'METRICS_DIR', None) or os.path.join(tempfile.gettempdir(), 'gym_metrics')
+
+
+class MetricsStore:
+    """
+    Aggregates of one process. The totals across workers are the sums of the
+    files of live processes; collect() removes those of exited workers, which
+    Prometheus then sees as a counter reset.
+    """
+
+    def __init__(self, directory, flush_interval):
+        self.pid = os.getpid()
+        self.path = os.path.join(directory, f'metrics-{self.pid}.json')
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.requests = {}    # (view, method, status) -> count
+        self.histograms = {}  # (metric, view) -> [bucket counts..., +Inf count, sum]
+        self.flushed_at = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    def _observe(self, metric, view, value):
+        buckets = HISTOGRAMS[metric][1]
+        series = self.histograms.get((metric, view))
+        if series is None:
+            series = self.histograms[(metric, view)] = [0] * (len(buckets) + 2)
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += 1
+        series[-1] += value
+
+    def observe(self, view, method, status, duration, queries, sql_time):
+        """Record one finished request"""
+        with self.lock:
+            key = (view, method, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self._observe('gym_http_request_duration_seconds', view, duration)
+            self._observe('gym_db_queries_per_request', view, queries)
+            self._observe('gym_db_time_per_request_seconds', view, sql_time)
+        if time.monotonic() - self.flushed_at >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Atomically publish this process's aggregates for the other workers"""
+        with self.lock:
+            data = {
+                'requests': [[list(key), count] for key, count in self.requests.items()],
+                'histograms': [[list(key), series] for key, series in self.histograms.items()],
+            }
+            self.flushed_at = time.monotonic()
+        partial = f'{self.path}.tmp'
+        with open(partial, 'w') as f:
+            json.dump(data, f)
+        os.replace(partial, self.path)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """This process's store; recreated after a fork so workers never share one"""
+    global _store
+    if _store is None or _store.pid != os.getpid():
+        with _store_lock:
+            if _store is None or _store.pid != os.getpid():
+                _store = MetricsStore(metrics_dir(), getattr(settings, 'METRICS_FLUSH_INTERVAL', 1.0))
+    return _store
+
+
+def pid_alive(pid):
+    """Whether a process with this id is running on this host"""
+    if os.name == 'nt':
+        return True  # os.kill(pid, 0) sends CTRL_C_EVENT on Windows
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Alive, owned by another user
+    return True
+
+
+def collect():
+    """Sum the aggregates of every live worker process, deleting the files of exited ones"""
+    get_store().flush()
+    requests, histograms = {}, {}
+    for path in glob.glob(os.path.join(metrics_dir(), 'metrics-*.json*')):
+        match = STORE_FILE_RE.match(os.path.basename(path))
+        if not match or not pid_alive(int(match.group(1))):
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # Another worker's collect() got there first
+            continue
+        if path.endswith('.tmp'):
+            continue
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue  # A worker exiting mid-write; its next flush replaces the file
+        for key, count in data['requests']:
+            key = tuple(key)
+            requests[key] = requests.get(key, 0) + count
+        for key, series in data['histograms']:
+            key = tuple(key)
+            total = histograms.get(key)
+            histograms[key] = series if total is None else [a + b for a, b in zip(total, series)]
+    return requests, histograms
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render(requests, histograms):
+    """Prometheus text exposition format (version 0.0.4)"""
+    lines = [
+        f'# HELP {REQUESTS_TOTAL} Requests by route, method and status',
+        f'# TYPE {REQUESTS_TOTAL} counter',
+    ]
+    for (view, method, status), count in sorted(requests.items()):
+        lines.append(
+            f'{REQUESTS_TOTAL}{{view="{escape(view)}",method="{escape(method)}",status="{status}"}} {count}'
+        )
+    for metric, (help_text, buckets) in HISTOGRAMS.items():
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} histogram')
+        for (name, view), series in sorted(histograms.items()):
+            if name != metric:
+                continue
+            label = f'view="{escape(view)}"'
+            for bound, count in zip(buckets, series):
+                lines.append(f'{metric}_bucket{{{label},le="{bound}"}} {count}')
+            lines.append(f'{metric}_bucket{{{label},le="+Inf"}} {series[-2]}')
+            lines.append(f'{metric}_sum{{{label}}} {series[-1]:.6f}')
+            lines.append(f'{metric}_count{{{label}}} {series[-2]}')
+    return '\n'.join(lines) + '\n'
+
+
+class QueryTimer:
+    """Cursor execute wrapper counting queries and the time they take"""
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.queries += 1
+
+
+# The timer of the request being served; context variables follow the
+# request into the threads the async ORM runs its queries on
+current_timer = ContextVar('metrics_query_timer', default=None)
+
+
+def count_query(execute, sql, params, many, context):
+    """Execute wrapper feeding the current request's timer"""
+    timer = current_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    return timer(execute, sql, params, many, context)
+
+
+def push_wrappers(stack):
+    """
+    Install count_query on this thread's connections for the life of stack,
+    through connection.execute_wrapper() so nesting stays LIFO
+    """
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(count_query))
+
+
+class MetricsMiddleware:
+    """
+    Time every request and the SQL it runs, labelled by URL name. Place it
+    first in MIDDLEWARE so the whole stack is measured. Works under WSGI and
+    ASGI, so async views are not forced back onto a worker thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timer = QueryTimer()
+        token = current_timer.set(timer)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                push_wrappers(stack)
+                response = self.get_response(request)
+        finally:
+            current_timer.reset(token)
+        self.record(request, response, time.perf_counter() - started, timer)
+        return response
+
+    async def __acall__(self, request):
+        timer = QueryTimer()
+        token = current_timer.set(timer)
+        started = time.perf_counter()
+        # The async ORM runs queries on the request's thread-sensitive worker,
+        # whose connections are not this thread's, so wrap them there
+        stack = ExitStack()
+        try:
+            await sync_to_async(push_wrappers, thread_sensitive=True)(stack)
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close, thread_sensitive=True)()
+            current_timer.reset(token)
+        self.record(request, response, time.perf_counter() - started, timer)
+        return response
+
+    def record(self, request, response, duration, timer):
+        match = getattr(request, 'resolver_match', None)
+        view = (match.url_name or match.view_name) if match else 'unmatched'
+        get_store().observe(view, request.method, response.status_code, duration, timer.queries, timer.seconds)
@@ -0,0 +1,23 @@
+"""
+Metrics Views
+Prometheus scrape endpoint for the request metrics middleware
+"""
+
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+
+from .metrics import collect, render
+
+
+@csrf_exempt
+def prometheus_metrics(request):
+    """
+    Request latency, SQL count and SQL time per route, summed over all workers
+    """
+    if request.method != 'GET':
+        return JsonResponse({
+            'success': False,
+            'message': 'Only GET method is allowed'
+        }, status=405)
+
+    return HttpResponse(render(*collect()), content_type='text/plain; version=0.0.4; charset=utf-8')
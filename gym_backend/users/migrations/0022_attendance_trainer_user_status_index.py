@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-17 07:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0021_foodrecipe"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="attendance",
+            index=models.Index(
+                fields=["trainer", "user", "status"],
+                name="attendance_trainer_96dcf5_idx",
+            ),
+        ),
+    ]
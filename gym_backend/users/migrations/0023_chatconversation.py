@@ -0,0 +1,94 @@
+# Generated by Django 4.2.7 on 2026-10-17 07:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0022_attendance_trainer_user_status_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ChatConversation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "last_message",
+                    models.TextField(
+                        blank=True, default="", verbose_name="Last Message"
+                    ),
+                ),
+                (
+                    "last_sender_type",
+                    models.CharField(
+                        blank=True,
+                        choices=[("user", "User"), ("trainer", "Trainer")],
+                        default="",
+                        max_length=10,
+                        verbose_name="Last Sender Type",
+                    ),
+                ),
+                (
+                    "last_message_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Last Message At"
+                    ),
+                ),
+                (
+                    "user_unread_count",
+                    models.IntegerField(default=0, verbose_name="Unread by User"),
+                ),
+                (
+                    "trainer_unread_count",
+                    models.IntegerField(default=0, verbose_name="Unread by Trainer"),
+                ),
+                (
+                    "total_messages",
+                    models.IntegerField(default=0, verbose_name="Total Messages"),
+                ),
+                (
+                    "trainer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="chat_conversations",
+                        to="users.trainer",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="chat_conversations",
+                        to="users.userprofile",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Chat Conversation",
+                "verbose_name_plural": "Chat Conversations",
+                "db_table": "chat_conversation",
+                "indexes": [
+                    models.Index(
+                        fields=["trainer", "last_message_at"],
+                        name="chat_conver_trainer_3c2afe_idx",
+                    ),
+                    models.Index(
+                        fields=["last_message_at"],
+                        name="chat_conver_last_me_f07e7c_idx",
+                    ),
+                ],
+                "unique_together": {("user", "trainer")},
+            },
+        ),
+    ]
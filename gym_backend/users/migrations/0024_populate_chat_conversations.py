@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-17 08:05
+
+from django.db import migrations
+from django.db.models import Count, Max, Q
+
+
+def populate_chat_conversations(apps, schema_editor):
+    """Build conversation summaries for chats that existed before ChatConversation"""
+    ChatMessage = apps.get_model('users', 'ChatMessage')
+    ChatConversation = apps.get_model('users', 'ChatConversation')
+    
+    pairs = ChatMessage.objects.values('user_id', 'trainer_id').annotate(
+        total=Count('id'),
+        last_at=Max('created_at'),
+        user_unread=Count('id', filter=Q(sender_type='trainer', is_read=False)),
+        trainer_unread=Count('id', filter=Q(sender_type='user', is_read=False)),
+    ).order_by()
+    
+    conversations = []
+    for pair in pairs:
+        last_message = ChatMessage.objects.filter(
+            user_id=pair['user_id'],
+            trainer_id=pair['trainer_id']
+        ).order_by('-created_at', '-id').first()
+        conversations.append(ChatConversation(
+            user_id=pair['user_id'],
+            trainer_id=pair['trainer_id'],
+            last_message=last_message.message,
+            last_sender_type=last_message.sender_type,
+            last_message_at=pair['last_at'],
+            user_unread_count=pair['user_unread'],
+            trainer_unread_count=pair['trainer_unread'],
+            total_messages=pair['total'],
+        ))
+    ChatConversation.objects.bulk_create(conversations, batch_size=500)
+
+
+def reverse_populate(apps, schema_editor):
+    """Reverse: drop all conversation summaries"""
+    ChatConversation = apps.get_model('users', 'ChatConversation')
+    ChatConversation.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0023_chatconversation"),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_chat_conversations, reverse_populate),
+    ]
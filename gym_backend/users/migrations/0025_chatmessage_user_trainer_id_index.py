@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-17 07:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0024_populate_chat_conversations"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="chatmessage",
+            index=models.Index(
+                fields=["user", "trainer", "id"], name="chat_messag_user_id_1f0175_idx"
+            ),
+        ),
+    ]
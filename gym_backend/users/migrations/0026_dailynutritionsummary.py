@@ -0,0 +1,117 @@
+# Generated by Django 4.2.7 on 2026-10-17 07:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0025_chatmessage_user_trainer_id_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyNutritionSummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="Date")),
+                (
+                    "total_calories",
+                    models.FloatField(default=0, verbose_name="Total Calories"),
+                ),
+                (
+                    "entry_count",
+                    models.IntegerField(default=0, verbose_name="Entry Count"),
+                ),
+                (
+                    "breakfast_calories",
+                    models.FloatField(default=0, verbose_name="Breakfast Calories"),
+                ),
+                (
+                    "breakfast_count",
+                    models.IntegerField(default=0, verbose_name="Breakfast Entries"),
+                ),
+                (
+                    "lunch_calories",
+                    models.FloatField(default=0, verbose_name="Lunch Calories"),
+                ),
+                (
+                    "lunch_count",
+                    models.IntegerField(default=0, verbose_name="Lunch Entries"),
+                ),
+                (
+                    "dinner_calories",
+                    models.FloatField(default=0, verbose_name="Dinner Calories"),
+                ),
+                (
+                    "dinner_count",
+                    models.IntegerField(default=0, verbose_name="Dinner Entries"),
+                ),
+                (
+                    "snacks_calories",
+                    models.FloatField(default=0, verbose_name="Snacks Calories"),
+                ),
+                (
+                    "snacks_count",
+                    models.IntegerField(default=0, verbose_name="Snacks Entries"),
+                ),
+                (
+                    "fruits_calories",
+                    models.FloatField(default=0, verbose_name="Fruits Calories"),
+                ),
+                (
+                    "fruits_count",
+                    models.IntegerField(default=0, verbose_name="Fruits Entries"),
+                ),
+                (
+                    "nuts_calories",
+                    models.FloatField(default=0, verbose_name="Nuts Calories"),
+                ),
+                (
+                    "nuts_count",
+                    models.IntegerField(default=0, verbose_name="Nuts Entries"),
+                ),
+                (
+                    "milks_calories",
+                    models.FloatField(default=0, verbose_name="Milks Calories"),
+                ),
+                (
+                    "milks_count",
+                    models.IntegerField(default=0, verbose_name="Milks Entries"),
+                ),
+                (
+                    "other_calories",
+                    models.FloatField(default=0, verbose_name="Other Calories"),
+                ),
+                (
+                    "other_count",
+                    models.IntegerField(default=0, verbose_name="Other Entries"),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_nutrition",
+                        to="users.userlogin",
+                        verbose_name="User",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Daily Nutrition Summary",
+                "verbose_name_plural": "Daily Nutrition Summaries",
+                "db_table": "daily_nutrition_summary",
+                "ordering": ["-date"],
+                "unique_together": {("user", "date")},
+            },
+        ),
+    ]
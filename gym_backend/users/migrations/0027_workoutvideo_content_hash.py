@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-17 07:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0026_dailynutritionsummary"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="workoutvideo",
+            name="content_hash",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                default="",
+                max_length=64,
+                verbose_name="Content SHA-256",
+            ),
+        ),
+    ]
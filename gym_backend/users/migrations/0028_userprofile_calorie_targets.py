@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-17 08:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0027_workoutvideo_content_hash"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userprofile",
+            name="bmr",
+            field=models.IntegerField(blank=True, null=True, verbose_name="BMR"),
+        ),
+        migrations.AddField(
+            model_name="userprofile",
+            name="calorie_warnings",
+            field=models.JSONField(
+                blank=True, default=list, verbose_name="Calorie Target Warnings"
+            ),
+        ),
+        migrations.AddField(
+            model_name="userprofile",
+            name="daily_adjustment",
+            field=models.IntegerField(
+                blank=True, null=True, verbose_name="Daily Calorie Adjustment"
+            ),
+        ),
+        migrations.AddField(
+            model_name="userprofile",
+            name="target_calories",
+            field=models.IntegerField(
+                blank=True, null=True, verbose_name="Target Daily Calories"
+            ),
+        ),
+        migrations.AddField(
+            model_name="userprofile",
+            name="weekly_change",
+            field=models.FloatField(
+                blank=True, null=True, verbose_name="Weekly Weight Change (kg)"
+            ),
+        ),
+    ]
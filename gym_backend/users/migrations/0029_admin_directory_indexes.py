@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-17 08:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0028_userprofile_calorie_targets"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="userlogin",
+            index=models.Index(
+                fields=["role", "created_at"], name="userlogin_role_bdfb4d_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="userlogin",
+            index=models.Index(
+                fields=["role", "name"], name="userlogin_role_302759_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="userprofile",
+            index=models.Index(
+                fields=["goal", "payment_status"], name="user_profil_goal_d11550_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="userprofile",
+            index=models.Index(
+                fields=["payment_status", "subscription_end_date"],
+                name="user_profil_payment_cc8178_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="userprofile",
+            index=models.Index(
+                fields=["subscription_end_date"], name="user_profil_subscri_aceb6d_idx"
+            ),
+        ),
+    ]
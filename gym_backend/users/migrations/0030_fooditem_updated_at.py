@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-17 08:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0029_admin_directory_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="fooditem",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, verbose_name="Updated At"),
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 4.2.7 on 2026-10-17 08:12
+
+from django.db import migrations, models
+
+
+def create_catalog_version(apps, schema_editor):
+    """The version row writers lock; existing items stay at version 0"""
+    FoodCatalogVersion = apps.get_model("users", "FoodCatalogVersion")
+    FoodCatalogVersion.objects.get_or_create(id=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0030_fooditem_updated_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FoodCatalogVersion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "version",
+                    models.BigIntegerField(default=0, verbose_name="Catalog Version"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Updated At"),
+                ),
+            ],
+            options={
+                "verbose_name": "Food Catalog Version",
+                "verbose_name_plural": "Food Catalog Version",
+                "db_table": "food_catalog_version",
+            },
+        ),
+        migrations.CreateModel(
+            name="FoodItemTombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "food_id",
+                    models.BigIntegerField(unique=True, verbose_name="Food Item ID"),
+                ),
+                (
+                    "version",
+                    models.BigIntegerField(
+                        db_index=True, verbose_name="Catalog Version"
+                    ),
+                ),
+                (
+                    "deleted_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Deleted At"),
+                ),
+            ],
+            options={
+                "verbose_name": "Food Item Tombstone",
+                "verbose_name_plural": "Food Item Tombstones",
+                "db_table": "food_item_tombstone",
+            },
+        ),
+        migrations.AddField(
+            model_name="fooditem",
+            name="version",
+            field=models.BigIntegerField(
+                db_index=True, default=0, verbose_name="Catalog Version"
+            ),
+        ),
+        migrations.RunPython(create_catalog_version, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 4.2.7 on 2026-10-17 08:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0031_food_catalog_versioning"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dietplantemplate",
+            name="nutrition_totals",
+            field=models.JSONField(
+                blank=True, default=dict, verbose_name="Nutrition Totals"
+            ),
+        ),
+        migrations.AddField(
+            model_name="userdietplan",
+            name="nutrition_totals",
+            field=models.JSONField(
+                blank=True, default=dict, verbose_name="Nutrition Totals"
+            ),
+        ),
+        migrations.CreateModel(
+            name="FoodAlias",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "alias",
+                    models.CharField(max_length=100, unique=True, verbose_name="Alias"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="Created At"),
+                ),
+                (
+                    "food",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="aliases",
+                        to="users.fooditem",
+                        verbose_name="Food Item",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Food Alias",
+                "verbose_name_plural": "Food Aliases",
+                "db_table": "food_alias",
+                "ordering": ["alias"],
+            },
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-17 08:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0032_meal_nutrition_totals"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="attendance",
+            index=models.Index(
+                fields=["user", "date"], name="attendance_user_id_d716c4_idx"
+            ),
+        ),
+    ]
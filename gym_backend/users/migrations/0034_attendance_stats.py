@@ -0,0 +1,84 @@
+# Generated by Django 4.2.7 on 2026-10-17 08:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0033_attendance_user_date_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AttendanceStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "accepted_count",
+                    models.IntegerField(default=0, verbose_name="Accepted"),
+                ),
+                (
+                    "pending_count",
+                    models.IntegerField(default=0, verbose_name="Pending"),
+                ),
+                (
+                    "rejected_count",
+                    models.IntegerField(default=0, verbose_name="Rejected"),
+                ),
+                (
+                    "current_streak",
+                    models.IntegerField(
+                        default=0, verbose_name="Streak Ending At Last Attended Date"
+                    ),
+                ),
+                (
+                    "longest_streak",
+                    models.IntegerField(default=0, verbose_name="Longest Streak"),
+                ),
+                (
+                    "last_attended_date",
+                    models.DateField(
+                        blank=True, null=True, verbose_name="Last Attended Date"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Updated At"),
+                ),
+                (
+                    "trainer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="member_attendance_stats",
+                        to="users.trainer",
+                        verbose_name="Trainer",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="attendance_stats",
+                        to="users.userlogin",
+                        verbose_name="User",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Attendance Stats",
+                "verbose_name_plural": "Attendance Stats",
+                "db_table": "attendance_stats",
+                "unique_together": {("user", "trainer")},
+            },
+        ),
+    ]
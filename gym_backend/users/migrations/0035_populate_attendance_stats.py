@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-17 09:10
+
+from django.db import migrations
+
+from users.models import rebuild_attendance_stats
+
+
+def populate_attendance_stats(apps, schema_editor):
+    """Build stats for attendance recorded before AttendanceStats existed"""
+    rebuild_attendance_stats(
+        apps.get_model('users', 'Attendance'),
+        apps.get_model('users', 'AttendanceStats'),
+    )
+
+
+def reverse_populate(apps, schema_editor):
+    """Reverse: drop all attendance stats"""
+    AttendanceStats = apps.get_model('users', 'AttendanceStats')
+    AttendanceStats.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0034_attendance_stats"),
+    ]
+
+    operations = [
+        migrations.RunPython(populate_attendance_stats, reverse_populate),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.7 on 2026-10-17 09:03
+
+from django.db import migrations, models
+
+
+def create_catalog_version(apps, schema_editor):
+    """The row every worker keys its cached video lists by"""
+    VideoCatalogVersion = apps.get_model("users", "VideoCatalogVersion")
+    VideoCatalogVersion.objects.get_or_create(id=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0035_populate_attendance_stats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VideoCatalogVersion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "version",
+                    models.BigIntegerField(default=0, verbose_name="Catalog Version"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Updated At"),
+                ),
+            ],
+            options={
+                "verbose_name": "Video Catalog Version",
+                "verbose_name_plural": "Video Catalog Version",
+                "db_table": "video_catalog_version",
+            },
+        ),
+        migrations.RunPython(create_catalog_version, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,7 @@
-from django.db import models
-from django.contrib.auth.hashers import make_password, check_password
+from django.db import models, transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.contrib.auth.hashers import check_password, identify_hasher, make_password
 
 # Create your models here.
 
@@ -20,14 +22,22 @@ class UserLogin(models.Model):
         verbose_name = 'User Login'
         verbose_name_plural = 'User Logins'
         ordering = ['-created_at']
+        indexes = [
+            # Admin directory: role filter with its created_at / name orderings
+            models.Index(fields=['role', 'created_at']),
+            models.Index(fields=['role', 'name']),
+        ]
     
     def __str__(self):
         return f"{self.name} ({self.emailid})"
     
     def save(self, *args, **kwargs):
-        # Hash password before saving if it's not already hashed
-        if self.password and not self.password.startswith('pbkdf2_'):
-            self.password = make_password(self.password)
+        # Hash password before saving if it's not already hashed (by any configured hasher)
+        if self.password:
+            try:
+                identify_hasher(self.password)
+            except ValueError:
+                self.password = make_password(self.password)
         super().save(*args, **kwargs)
     
     def check_password(self, raw_password):
@@ -125,17 +135,66 @@ class UserProfile(models.Model):
     subscription_start_date = models.DateTimeField(null=True, blank=True, verbose_name="Subscription Start Date")
     subscription_end_date = models.DateTimeField(null=True, blank=True, verbose_name="Subscription End Date")
     assigned_trainer = models.ForeignKey('Trainer', on_delete=models.SET_NULL, null=True, blank=True, related_name='assigned_users', verbose_name="Assigned Trainer")
+    # Stored result of calculate_target_calories(), refreshed by save() and recompute_targets
+    target_calories = models.IntegerField(null=True, blank=True, verbose_name="Target Daily Calories")
+    bmr = models.IntegerField(null=True, blank=True, verbose_name="BMR")
+    weekly_change = models.FloatField(null=True, blank=True, verbose_name="Weekly Weight Change (kg)")
+    daily_adjustment = models.IntegerField(null=True, blank=True, verbose_name="Daily Calorie Adjustment")
+    calorie_warnings = models.JSONField(default=list, blank=True, verbose_name="Calorie Target Warnings")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created At")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Updated At")
     
+    # Fields calculate_target_calories() reads, and the fields it fills in
+    TARGET_INPUT_FIELDS = ('current_weight', 'target_weight', 'target_months', 'gender', 'goal')
+    TARGET_FIELDS = ('target_calories', 'bmr', 'weekly_change', 'daily_adjustment', 'calorie_warnings')
+    
     class Meta:
         db_table = 'user_profile'
         verbose_name = 'User Profile'
         verbose_name_plural = 'User Profiles'
+        indexes = [
+            # Admin directory filters
+            models.Index(fields=['goal', 'payment_status']),
+            models.Index(fields=['payment_status', 'subscription_end_date']),
+            models.Index(fields=['subscription_end_date']),
+        ]
     
     def __str__(self):
         return f"Profile: {self.user.name}"
     
+    def save(self, *args, **kwargs):
+        # Keep the stored calorie target in step with the fields it depends on
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or set(update_fields) & set(self.TARGET_INPUT_FIELDS):
+            self.apply_calorie_targets(self.calculate_target_calories())
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | set(self.TARGET_FIELDS)
+        super().save(*args, **kwargs)
+    
+    def apply_calorie_targets(self, targets):
+        """Copy a calculate_target_calories() result onto the stored fields"""
+        self.target_calories = targets['target_calories']
+        self.bmr = targets['bmr']
+        self.weekly_change = targets['weekly_change']
+        self.daily_adjustment = targets['daily_adjustment']
+        self.calorie_warnings = targets['warnings']
+    
+    def get_calorie_targets(self):
+        """
+        The stored calorie target in calculate_target_calories() form, falling
+        back to calculating it for rows written before it was stored
+        """
+        if self.target_calories is None:
+            return self.calculate_target_calories()
+        return {
+            'target_calories': self.target_calories,
+            'bmr': self.bmr,
+            'weekly_change': self.weekly_change,
+            'daily_adjustment': self.daily_adjustment,
+            'warnings': self.calorie_warnings,
+            'is_safe': len(self.calorie_warnings) == 0
+        }
+    
     def calculate_payment_amount(self):
         """Calculate payment amount based on target months"""
         payment_map = {
@@ -172,70 +231,9 @@ class UserProfile(models.Model):
         
         Returns: dict with target_calories and warnings
         """
-        # Base Metabolic Rate (BMR) - calories needed at rest
-        bmr = self.current_weight * 24
-        
-        # Calculate weight change needed
-        weight_change = self.target_weight - self.current_weight
-        
-        # Calculate weeks available
-        weeks = self.target_months * 4
-        
-        # Calculate weekly weight change rate
-        weekly_change = weight_change / weeks if weeks > 0 else 0
-        
-        # Safety limits (medical recommendations)
-        # Weight loss: max 0.5-1kg per week
-        # Weight gain: max 0.5-1kg per week
-        # Muscle gain: max 0.5kg per week
-        max_safe_loss = -1.0  # kg per week
-        min_safe_loss = -0.5  # kg per week
-        max_safe_gain = 1.0   # kg per week
-        min_safe_gain = 0.5   # kg per week
-        
-        warnings = []
-        adjusted_weekly_change = weekly_change
-        
-        # Check if goals are realistic
-        if weight_change < 0:  # Weight loss
-            if weekly_change < max_safe_loss:
-                warnings.append(f"Goal too aggressive! Losing {abs(weekly_change):.2f}kg/week is unsafe. Adjusted to 1kg/week max.")
-                adjusted_weekly_change = max_safe_loss
-            elif weekly_change > min_safe_loss:
-                warnings.append(f"Very slow progress: {abs(weekly_change):.2f}kg/week. Consider shorter timeline.")
-        elif weight_change > 0:  # Weight gain
-            if weekly_change > max_safe_gain:
-                warnings.append(f"Goal too aggressive! Gaining {weekly_change:.2f}kg/week is unhealthy. Adjusted to 1kg/week max.")
-                adjusted_weekly_change = max_safe_gain
-            elif weekly_change < min_safe_gain and self.goal == 'muscle_gain':
-                warnings.append(f"Very slow progress for muscle gain: {weekly_change:.2f}kg/week.")
-        
-        # 1 kg of body weight = approximately 7700 calories
-        # Daily calorie adjustment = (weekly_change × 7700) / 7
-        daily_adjustment = (adjusted_weekly_change * 7700) / 7
-        
-        # Calculate target calories
-        target_calories = bmr + daily_adjustment
-        
-        # Absolute minimum safe calories (prevent starvation)
-        min_safe_calories = 1200 if self.gender == 'female' else 1500
-        max_safe_calories = 4000  # Upper limit for safety
-        
-        if target_calories < min_safe_calories:
-            warnings.append(f"Calculated {target_calories:.0f} cal/day is below safe minimum. Set to {min_safe_calories} cal/day.")
-            target_calories = min_safe_calories
-        elif target_calories > max_safe_calories:
-            warnings.append(f"Calculated {target_calories:.0f} cal/day exceeds safe maximum. Set to {max_safe_calories} cal/day.")
-            target_calories = max_safe_calories
-        
-        return {
-            'target_calories': round(target_calories),
-            'bmr': round(bmr),
-            'weekly_change': round(adjusted_weekly_change, 2),
-            'daily_adjustment': round(daily_adjustment),
-            'warnings': warnings,
-            'is_safe': len(warnings) == 0
-        }
+        # One implementation for single profiles and recompute_targets batches
+        from .calorie_targets import calculate_batch
+        return calculate_batch([tuple(getattr(self, field) for field in self.TARGET_INPUT_FIELDS)])[0]
 
 
 class Attendance(models.Model):
@@ -259,6 +257,277 @@ class Attendance(models.Model):
         db_table = 'attendance'
         verbose_name = 'Attendance'
         verbose_name_plural = 'Attendances'
+        indexes = [
+            models.Index(fields=['trainer', 'user', 'status']),
+            models.Index(fields=['user', 'date']),
+        ]
+    
+    def save(self, *args, **kwargs):
+        """Save the record and keep the member's AttendanceStats in step"""
+        with transaction.atomic():
+            previous = None
+            if self.pk:
+                previous = Attendance.objects.filter(pk=self.pk).values(
+                    'user_id', 'trainer_id', 'date', 'status'
+                ).first()
+            super().save(*args, **kwargs)
+            if previous and (previous['user_id'], previous['trainer_id']) == (self.user_id, self.trainer_id):
+                if previous['status'] == self.status and previous['date'] == self.date:
+                    return
+                counts = {previous['status']: -1}
+                counts[self.status] = counts.get(self.status, 0) + 1
+                AttendanceStats.apply(
+                    self.user_id, self.trainer_id, counts,
+                    accepted_days=[self.date] if self.status == 'accepted' else (),
+                    recount_streaks=previous['status'] == 'accepted'
+                )
+                return
+            if previous:
+                AttendanceStats.apply(
+                    previous['user_id'], previous['trainer_id'], {previous['status']: -1},
+                    recount_streaks=previous['status'] == 'accepted'
+                )
+            AttendanceStats.apply(
+                self.user_id, self.trainer_id, {self.status: 1},
+                accepted_days=[self.date] if self.status == 'accepted' else ()
+            )
+    
+    def delete(self, *args, **kwargs):
+        """Remove the record and take it out of the member's AttendanceStats"""
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            AttendanceStats.apply(
+                self.user_id, self.trainer_id, {self.status: -1},
+                recount_streaks=self.status == 'accepted'
+            )
+        return result
+    
+    @classmethod
+    def review_pending(cls, trainer_id, status, attendance_ids=None, on_date=None):
+        """
+        Accept or reject a trainer's pending requests, either the given ids or
+        every pending request for on_date, with one set-based UPDATE. Ids that
+        are not this trainer's or no longer pending are returned as skipped.
+        Returns (updated ids, skipped ids).
+        """
+        from django.utils import timezone
+        pending = cls.objects.filter(trainer_id=trainer_id, status='pending')
+        if attendance_ids is not None:
+            pending = pending.filter(id__in=attendance_ids)
+        if on_date is not None:
+            pending = pending.filter(date=on_date)
+        changes = {'status': status}
+        if status == 'accepted':
+            changes['accepted_date'] = timezone.now()
+        with transaction.atomic():
+            rows = list(pending.select_for_update().order_by('id').values_list('id', 'user_id', 'date'))
+            updated = [attendance_id for attendance_id, _, _ in rows]
+            if updated:
+                cls.objects.filter(id__in=updated).update(**changes)
+            # The UPDATE bypasses save(), so fold the change into the members' stats
+            days_by_user = {}
+            for _, user_id, day in rows:
+                days_by_user.setdefault(user_id, []).append(day)
+            if days_by_user:
+                AttendanceStats.apply_for_trainer(
+                    trainer_id, {'pending': -1, status: 1}, days_by_user, status == 'accepted'
+                )
+        found = set(updated)
+        skipped = sorted(set(attendance_ids or ()) - found)
+        return updated, skipped
+
+
+def attendance_streaks(days):
+    """
+    (streak ending at the last day, longest streak, last day) for attended
+    dates in ascending order; a streak is a run of consecutive days
+    """
+    current = longest = 0
+    last = None
+    for day in days:
+        if last is not None and day == last:
+            continue
+        current = current + 1 if last is not None and (day - last).days == 1 else 1
+        longest = max(longest, current)
+        last = day
+    return current, longest, last
+
+
+STATS_FIELDS = ['accepted_count', 'pending_count', 'rejected_count',
+                'current_streak', 'longest_streak', 'last_attended_date']
+
+
+def rebuild_attendance_stats(attendance_model, stats_model, user_ids=None):
+    """
+    AttendanceStats.rebuild for the given models, so migrations can run it on
+    historical models. Writers lock a member's stats row in the transaction
+    that changes their attendance, so the rows are locked before Attendance is
+    read and updated in place: changes committed earlier are counted, later
+    ones wait and apply their deltas on top.
+    """
+    attendances = attendance_model.objects.all()
+    stats = stats_model.objects.all()
+    if user_ids:
+        attendances = attendances.filter(user_id__in=user_ids)
+        stats = stats.filter(user_id__in=user_ids)
+    
+    with transaction.atomic():
+        existing = {(row.user_id, row.trainer_id): row for row in stats.select_for_update()}
+        
+        rebuilt = {}
+        counts = attendances.values('user_id', 'trainer_id', 'status').annotate(total=models.Count('id'))
+        for row in counts.order_by():
+            key = (row['user_id'], row['trainer_id'])
+            summary = rebuilt.setdefault(key, {field: 0 for field in STATS_FIELDS})
+            if f"{row['status']}_count" in summary:
+                summary[f"{row['status']}_count"] = row['total']
+        
+        accepted = attendances.filter(status='accepted').order_by('user_id', 'trainer_id', 'date')
+        days_by_member = {}
+        for user_id, trainer_id, day in accepted.values_list('user_id', 'trainer_id', 'date').iterator(chunk_size=2000):
+            days_by_member.setdefault((user_id, trainer_id), []).append(day)
+        for key, summary in rebuilt.items():
+            summary['current_streak'], summary['longest_streak'], summary['last_attended_date'] = \
+                attendance_streaks(days_by_member.get(key, ()))
+        
+        updated, created = [], []
+        for key, summary in rebuilt.items():
+            row = existing.pop(key, None) or stats_model(user_id=key[0], trainer_id=key[1])
+            for field, value in summary.items():
+                setattr(row, field, value)
+            (updated if row.pk else created).append(row)
+        stats_model.objects.bulk_update(updated, STATS_FIELDS, batch_size=500)
+        stats_model.objects.bulk_create(created, batch_size=500)
+        stats_model.objects.filter(pk__in=[row.pk for row in existing.values()]).delete()
+    return len(rebuilt)
+
+
+class AttendanceStats(models.Model):
+    """
+    AttendanceStats holds a member's attendance counters and streaks with one
+    trainer. Attendance.save()/delete() and Attendance.review_pending keep it
+    up to date, migration 0035 backfilled it; run `manage.py
+    rebuild_attendance_stats` to repair it (queryset updates and deletes
+    bypass it).
+    """
+    STATUSES = [status for status, _ in Attendance.STATUS_CHOICES]
+    
+    user = models.ForeignKey(UserLogin, on_delete=models.CASCADE, related_name='attendance_stats', verbose_name="User")
+    trainer = models.ForeignKey(Trainer, on_delete=models.CASCADE, related_name='member_attendance_stats', verbose_name="Trainer")
+    accepted_count = models.IntegerField(default=0, verbose_name="Accepted")
+    pending_count = models.IntegerField(default=0, verbose_name="Pending")
+    rejected_count = models.IntegerField(default=0, verbose_name="Rejected")
+    current_streak = models.IntegerField(default=0, verbose_name="Streak Ending At Last Attended Date")
+    longest_streak = models.IntegerField(default=0, verbose_name="Longest Streak")
+    last_attended_date = models.DateField(blank=True, null=True, verbose_name="Last Attended Date")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Updated At")
+    
+    class Meta:
+        db_table = 'attendance_stats'
+        verbose_name = 'Attendance Stats'
+        verbose_name_plural = 'Attendance Stats'
+        unique_together = ['user', 'trainer']
+    
+    def __str__(self):
+        return f"{self.user.name} - {self.trainer.user.name}: {self.accepted_count} attended"
+    
+    @classmethod
+    def apply(cls, user_id, trainer_id, counts, accepted_days=(), recount_streaks=False):
+        """
+        Add counts ({status: delta}) to a member's stats and extend the streak
+        with newly accepted days. Days before the last attended date, or
+        recount_streaks after an accepted record went away, recompute the
+        streaks from the accepted records. Call inside the transaction that
+        changes the Attendance rows.
+        """
+        stats, _ = cls.objects.select_for_update().get_or_create(user_id=user_id, trainer_id=trainer_id)
+        stats.fold(counts, accepted_days, recount_streaks)
+        stats.save()
+        return stats
+    
+    @classmethod
+    def apply_for_trainer(cls, trainer_id, counts, days_by_user, accepted):
+        """
+        apply() for many members of one trainer with the same counts per
+        accepted or rejected day, locking and writing the stats rows in bulk
+        """
+        existing = set(cls.objects.filter(trainer_id=trainer_id, user_id__in=days_by_user).values_list('user_id', flat=True))
+        cls.objects.bulk_create(
+            [cls(user_id=user_id, trainer_id=trainer_id) for user_id in days_by_user if user_id not in existing],
+            ignore_conflicts=True
+        )
+        rows = list(cls.objects.select_for_update().filter(trainer_id=trainer_id, user_id__in=days_by_user))
+        for stats in rows:
+            days = days_by_user[stats.user_id]
+            stats.fold(
+                {status: delta * len(days) for status, delta in counts.items()},
+                days if accepted else ()
+            )
+        cls.objects.bulk_update(rows, [
+            'accepted_count', 'pending_count', 'rejected_count',
+            'current_streak', 'longest_streak', 'last_attended_date', 'updated_at'
+        ], batch_size=500)
+    
+    def fold(self, counts, accepted_days=(), recount_streaks=False):
+        """Apply counts and accepted days to this (locked) row without saving it"""
+        from django.utils import timezone
+        for status, delta in counts.items():
+            if status in self.STATUSES and delta:
+                field = f'{status}_count'
+                setattr(self, field, max(0, getattr(self, field) + delta))
+        for day in sorted(accepted_days):
+            last = self.last_attended_date
+            if last is None or day > last:
+                self.current_streak = self.current_streak + 1 if last and (day - last).days == 1 else 1
+                self.longest_streak = max(self.longest_streak, self.current_streak)
+                self.last_attended_date = day
+            elif day < last:
+                recount_streaks = True
+        if recount_streaks:
+            days = Attendance.objects.filter(
+                user_id=self.user_id, trainer_id=self.trainer_id, status='accepted'
+            ).order_by('date').values_list('date', flat=True)
+            self.current_streak, self.longest_streak, self.last_attended_date = attendance_streaks(days)
+        # bulk_update() skips auto_now
+        self.updated_at = timezone.now()
+    
+    @classmethod
+    def rebuild(cls, user_ids=None):
+        """
+        Recompute stats from Attendance for the given users (everyone by
+        default). Returns the number of stats rows written.
+        """
+        return rebuild_attendance_stats(Attendance, cls, user_ids)
+    
+    @classmethod
+    def totals_for(cls, user_id, today):
+        """
+        A member's counters summed over their trainers, with the streak of the
+        most recent trainer as of today (0 once a day has been missed)
+        """
+        totals = {'accepted': 0, 'pending': 0, 'rejected': 0, 'current_streak': 0,
+                  'longest_streak': 0, 'last_attended_date': None}
+        for stats in cls.objects.filter(user_id=user_id):
+            for status in cls.STATUSES:
+                totals[status] += getattr(stats, f'{status}_count')
+            totals['longest_streak'] = max(totals['longest_streak'], stats.longest_streak)
+            if stats.last_attended_date and (
+                totals['last_attended_date'] is None or stats.last_attended_date > totals['last_attended_date']
+            ):
+                totals['last_attended_date'] = stats.last_attended_date
+                totals['current_streak'] = stats.streak_as_of(today)
+        return totals
+    
+    def streak_as_of(self, today):
+        """The current streak, or 0 when neither today nor yesterday was attended"""
+        return current_streak_as_of(self.current_streak, self.last_attended_date, today)
+
+
+def current_streak_as_of(streak, last_attended_date, today):
+    """A stored streak still counts while its last day is today or yesterday"""
+    if last_attended_date is None or (today - last_attended_date).days > 1:
+        return 0
+    return streak
 
 
 class SubscriptionRenewal(models.Model):
@@ -358,6 +627,9 @@ class FoodItem(models.Model):
     fats = models.DecimalField(max_digits=5, decimal_places=2, verbose_name="Fats (g)")
     serving_size = models.CharField(max_length=50, default="100g", verbose_name="Serving Size")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created At")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Updated At")
+    # Catalog version of the last save (see FoodCatalogVersion); 0 for rows older than versioning
+    version = models.BigIntegerField(default=0, db_index=True, verbose_name="Catalog Version")
     
     class Meta:
         db_table = 'food_item'
@@ -367,6 +639,102 @@ class FoodItem(models.Model):
     
     def __str__(self):
         return f"{self.name} ({self.food_category})"
+    
+    def save(self, *args, **kwargs):
+        """Save under a new catalog version and refresh the item in the in-memory search index"""
+        from .food_search import food_saved
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'version', 'updated_at'}
+        with transaction.atomic():
+            self.version = FoodCatalogVersion.bump()
+            super().save(*args, **kwargs)
+        food_saved(self)
+    
+    def delete(self, *args, **kwargs):
+        """Delete and drop the item from the in-memory search index"""
+        from .food_search import food_deleted
+        food_id = self.id
+        result = super().delete(*args, **kwargs)
+        food_deleted(food_id)
+        return result
+
+
+@receiver(post_delete, sender=FoodItem, dispatch_uid='users.models.food_item_deleted')
+def food_item_deleted(sender, instance, **kwargs):
+    """Leave a tombstone so synced clients drop the item; also runs for queryset deletes"""
+    FoodItemTombstone.objects.update_or_create(
+        food_id=instance.id, defaults={'version': FoodCatalogVersion.bump()}
+    )
+
+
+class FoodCatalogVersion(models.Model):
+    """
+    Single row holding the food catalog version. Every FoodItem save and
+    delete takes the next version while holding this row locked, so versions
+    become visible in order and clients can sync from the last one they saw.
+    """
+    version = models.BigIntegerField(default=0, verbose_name="Catalog Version")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Updated At")
+    
+    class Meta:
+        db_table = 'food_catalog_version'
+        verbose_name = 'Food Catalog Version'
+        verbose_name_plural = 'Food Catalog Version'
+    
+    def __str__(self):
+        return f"Food catalog v{self.version}"
+    
+    @classmethod
+    def bump(cls):
+        """Take the next version; call inside the transaction of the write"""
+        state, _ = cls.objects.select_for_update().get_or_create(id=1)
+        state.version += 1
+        state.save(update_fields=['version', 'updated_at'])
+        return state.version
+    
+    @classmethod
+    def current(cls):
+        """(version, time of the last catalog write); (0, None) before any write"""
+        state = cls.objects.filter(id=1).first()
+        return (state.version, state.updated_at) if state else (0, None)
+
+
+class FoodItemTombstone(models.Model):
+    """A deleted food item, kept so delta syncs can report the removal"""
+    food_id = models.BigIntegerField(unique=True, verbose_name="Food Item ID")
+    version = models.BigIntegerField(db_index=True, verbose_name="Catalog Version")
+    deleted_at = models.DateTimeField(auto_now=True, verbose_name="Deleted At")
+    
+    class Meta:
+        db_table = 'food_item_tombstone'
+        verbose_name = 'Food Item Tombstone'
+        verbose_name_plural = 'Food Item Tombstones'
+    
+    def __str__(self):
+        return f"Deleted food {self.food_id} (v{self.version})"
+
+
+class FoodAlias(models.Model):
+    """Another name for a food item, used to match meal plan items to the catalog"""
+    alias = models.CharField(max_length=100, unique=True, verbose_name="Alias")
+    food = models.ForeignKey(FoodItem, on_delete=models.CASCADE, related_name='aliases', verbose_name="Food Item")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created At")
+    
+    class Meta:
+        db_table = 'food_alias'
+        verbose_name = 'Food Alias'
+        verbose_name_plural = 'Food Aliases'
+        ordering = ['alias']
+    
+    def __str__(self):
+        return f"{self.alias} -> {self.food.name}"
+    
+    def save(self, *args, **kwargs):
+        """Save and drop this process's meal nutrition lookup table"""
+        from .meal_nutrition import invalidate
+        super().save(*args, **kwargs)
+        invalidate()
 
 
 class DietPlanTemplate(models.Model):
@@ -385,6 +753,8 @@ class DietPlanTemplate(models.Model):
     calorie_max = models.IntegerField(verbose_name="Maximum Calories")
     description = models.TextField(blank=True, verbose_name="Description")
     meals_data = models.JSONField(verbose_name="Meals Data")  # {"breakfast": [...], "lunch": [...], "dinner": [...], "snacks": [...]}
+    # Per-day, per-meal calories and macros of meals_data, refreshed on save (see meal_nutrition.py)
+    nutrition_totals = models.JSONField(default=dict, blank=True, verbose_name="Nutrition Totals")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created At")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Updated At")
     
@@ -396,6 +766,21 @@ class DietPlanTemplate(models.Model):
     
     def __str__(self):
         return f"{self.name} ({self.calorie_min}-{self.calorie_max} cal)"
+    
+    def save(self, *args, **kwargs):
+        """Save with fresh nutrition totals and drop this process's template index"""
+        from .diet_templates import invalidate
+        from .meal_nutrition import refresh_nutrition_totals
+        refresh_nutrition_totals(self, kwargs)
+        super().save(*args, **kwargs)
+        invalidate()
+    
+    def delete(self, *args, **kwargs):
+        """Delete and drop this process's template index"""
+        from .diet_templates import invalidate
+        result = super().delete(*args, **kwargs)
+        invalidate()
+        return result
 
 
 class UserDietPlan(models.Model):
@@ -408,6 +793,8 @@ class UserDietPlan(models.Model):
     plan_name = models.CharField(max_length=100, verbose_name="Plan Name")
     target_calories = models.IntegerField(verbose_name="Target Daily Calories")
     meals_data = models.JSONField(verbose_name="Customized Meals")  # Trainer can modify template
+    # Per-day, per-meal calories and macros of meals_data, refreshed on save (see meal_nutrition.py)
+    nutrition_totals = models.JSONField(default=dict, blank=True, verbose_name="Nutrition Totals")
     notes = models.TextField(blank=True, verbose_name="Trainer Notes")
     start_date = models.DateField(verbose_name="Start Date")
     end_date = models.DateField(null=True, blank=True, verbose_name="End Date")
@@ -423,6 +810,12 @@ class UserDietPlan(models.Model):
     
     def __str__(self):
         return f"{self.user.name} - {self.plan_name}"
+    
+    def save(self, *args, **kwargs):
+        """Save with fresh nutrition totals for the meals"""
+        from .meal_nutrition import refresh_nutrition_totals
+        refresh_nutrition_totals(self, kwargs)
+        super().save(*args, **kwargs)
 
 
 class WorkoutVideo(models.Model):
@@ -459,6 +852,7 @@ class WorkoutVideo(models.Model):
     uploaded_by = models.ForeignKey(Trainer, on_delete=models.CASCADE, related_name='uploaded_videos', null=True, blank=True)
     uploaded_via = models.CharField(max_length=10, choices=UPLOAD_TYPE_CHOICES, default='web', verbose_name="Upload Type")
     day_number = models.IntegerField(null=True, blank=True, verbose_name="Day Number (for daily progression)")
+    content_hash = models.CharField(max_length=64, blank=True, default='', db_index=True, verbose_name="Content SHA-256")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created At")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Updated At")
     is_active = models.BooleanField(default=True, verbose_name="Is Active")
@@ -471,6 +865,48 @@ class WorkoutVideo(models.Model):
     
     def __str__(self):
         return f"{self.title} - {self.goal_type} ({self.difficulty_level})"
+    
+    def save(self, *args, **kwargs):
+        """Save and invalidate the cached video catalog"""
+        from .video_catalog import invalidate_catalog
+        super().save(*args, **kwargs)
+        invalidate_catalog()
+    
+    def delete(self, *args, **kwargs):
+        """Delete and invalidate the cached video catalog"""
+        from .video_catalog import invalidate_catalog
+        result = super().delete(*args, **kwargs)
+        invalidate_catalog()
+        return result
+
+
+class VideoCatalogVersion(models.Model):
+    """
+    Single row holding the workout video catalog version. Cached video lists
+    are keyed by it, so bumping it in the database drops them for every worker.
+    """
+    version = models.BigIntegerField(default=0, verbose_name="Catalog Version")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Updated At")
+    
+    class Meta:
+        db_table = 'video_catalog_version'
+        verbose_name = 'Video Catalog Version'
+        verbose_name_plural = 'Video Catalog Version'
+    
+    def __str__(self):
+        return f"Video catalog v{self.version}"
+    
+    @classmethod
+    def bump(cls):
+        """Move to the next version with one atomic UPDATE"""
+        from django.utils import timezone
+        if not cls.objects.filter(id=1).update(version=models.F('version') + 1, updated_at=timezone.now()):
+            cls.objects.get_or_create(id=1, defaults={'version': 1})
+    
+    @classmethod
+    def current(cls):
+        """The current version; 0 before any video write"""
+        return cls.objects.filter(id=1).values_list('version', flat=True).first() or 0
 
 
 class VideoRecommendation(models.Model):
@@ -515,11 +951,132 @@ class ChatMessage(models.Model):
         verbose_name = 'Chat Message'
         verbose_name_plural = 'Chat Messages'
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['user', 'trainer', 'id']),
+        ]
     
     def __str__(self):
         return f"{self.sender_type}: {self.message[:50]}"
 
 
+class ChatConversation(models.Model):
+    """
+    ChatConversation keeps one summary row per user-trainer chat so inboxes
+    can be listed without scanning ChatMessage. It is updated whenever a
+    message is sent or a thread is read.
+    """
+    user = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='chat_conversations')
+    trainer = models.ForeignKey(Trainer, on_delete=models.CASCADE, related_name='chat_conversations')
+    last_message = models.TextField(blank=True, default='', verbose_name="Last Message")
+    last_sender_type = models.CharField(max_length=10, choices=ChatMessage.SENDER_CHOICES, blank=True, default='', verbose_name="Last Sender Type")
+    last_message_at = models.DateTimeField(null=True, blank=True, verbose_name="Last Message At")
+    user_unread_count = models.IntegerField(default=0, verbose_name="Unread by User")
+    trainer_unread_count = models.IntegerField(default=0, verbose_name="Unread by Trainer")
+    total_messages = models.IntegerField(default=0, verbose_name="Total Messages")
+    
+    class Meta:
+        db_table = 'chat_conversation'
+        verbose_name = 'Chat Conversation'
+        verbose_name_plural = 'Chat Conversations'
+        unique_together = ['user', 'trainer']
+        indexes = [
+            models.Index(fields=['trainer', 'last_message_at']),
+            models.Index(fields=['last_message_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.user.name} <-> {self.trainer.user.name} ({self.total_messages} messages)"
+    
+    @staticmethod
+    def unread_field_for(reader_type):
+        """Counter holding the messages the given side has not read yet"""
+        return 'user_unread_count' if reader_type == 'user' else 'trainer_unread_count'
+    
+    @classmethod
+    def record_message(cls, chat_message):
+        """
+        Fold a newly created ChatMessage into its conversation summary.
+        Call inside the transaction that created the message.
+        """
+        conversation, _ = cls.objects.select_for_update().get_or_create(
+            user_id=chat_message.user_id,
+            trainer_id=chat_message.trainer_id
+        )
+        # The message is unread for the side that did not send it
+        reader_type = 'trainer' if chat_message.sender_type == 'user' else 'user'
+        unread_field = cls.unread_field_for(reader_type)
+        cls.objects.filter(pk=conversation.pk).update(
+            last_message=chat_message.message,
+            last_sender_type=chat_message.sender_type,
+            last_message_at=chat_message.created_at,
+            total_messages=models.F('total_messages') + 1,
+            **{unread_field: models.F(unread_field) + 1}
+        )
+    
+    @classmethod
+    def mark_read(cls, user_profile, trainer, reader_type):
+        """
+        Mark the thread as read for one side. The summary counter is checked
+        first so polling an already-read thread never touches ChatMessage.
+        """
+        unread_field = cls.unread_field_for(reader_type)
+        had_unread = cls.objects.filter(
+            user=user_profile,
+            trainer=trainer,
+            **{f'{unread_field}__gt': 0}
+        ).update(**{unread_field: 0})
+        if had_unread:
+            ChatMessage.objects.filter(
+                user=user_profile,
+                trainer=trainer,
+                is_read=False
+            ).exclude(sender_type=reader_type).update(is_read=True)
+
+
+class FoodEntryQuerySet(models.QuerySet):
+    """
+    Aggregation helpers for FoodEntry that compute per-day, per-meal totals
+    for any set of entries with a single GROUP BY query.
+    """
+    
+    def for_range(self, user, start_date, end_date):
+        """Entries of a user between start_date and end_date (inclusive)"""
+        return self.filter(user=user, entry_date__gte=start_date, entry_date__lte=end_date)
+    
+    def meal_totals(self):
+        """Rows of user_id, entry_date, meal_type, total_calories and entries"""
+        return self.values('user_id', 'entry_date', 'meal_type').annotate(
+            total_calories=models.Sum('calculated_calories'),
+            entries=models.Count('id')
+        ).order_by('user_id', 'entry_date', 'meal_type')
+    
+    def daily_breakdowns(self):
+        """
+        Map (user_id, entry_date) to that day's total_calories, entry_count
+        and a breakdown of every meal type, from one aggregated query.
+        """
+        meal_types = [meal_type for meal_type, _ in FoodEntry.MEAL_TYPE_CHOICES]
+        days = {}
+        for row in self.meal_totals():
+            key = (row['user_id'], row['entry_date'])
+            if key not in days:
+                days[key] = {
+                    'total_calories': 0,
+                    'entry_count': 0,
+                    'breakdown': {meal_type: {'total_calories': 0, 'entries': 0} for meal_type in meal_types}
+                }
+            day = days[key]
+            day['total_calories'] += row['total_calories']
+            day['entry_count'] += row['entries']
+            # Unknown meal types still count towards the day total
+            if row['meal_type'] in day['breakdown']:
+                day['breakdown'][row['meal_type']] = {
+                    'total_calories': row['total_calories'],
+                    'entries': row['entries']
+                }
+        return days
+
+
 class FoodEntry(models.Model):
     """
     FoodEntry model to track user's daily food consumption with quantities
@@ -546,6 +1103,8 @@ class FoodEntry(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created At")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Updated At")
     
+    objects = FoodEntryQuerySet.as_manager()
+    
     class Meta:
         db_table = 'food_entry'
         verbose_name = 'Food Entry'
@@ -578,26 +1137,171 @@ class FoodEntry(models.Model):
                 # Example: 200g rice = (130 cal / 100) * 200 = 260 cal
                 self.calculated_calories = (self.food_item.calories / 100) * self.quantity
         
-        super().save(*args, **kwargs)
+        # Keep the daily rollup in step with the entry in the same transaction
+        with transaction.atomic():
+            previous = None
+            if self.pk:
+                previous = FoodEntry.objects.filter(pk=self.pk).values(
+                    'user_id', 'entry_date', 'meal_type', 'calculated_calories'
+                ).first()
+            super().save(*args, **kwargs)
+            if previous:
+                DailyNutritionSummary.apply(
+                    previous['user_id'], previous['entry_date'], previous['meal_type'],
+                    -previous['calculated_calories'], -1
+                )
+            DailyNutritionSummary.apply(
+                self.user_id, self.entry_date, self.meal_type, self.calculated_calories, 1
+            )
+    
+    def delete(self, *args, **kwargs):
+        """Remove the entry and take it out of the daily rollup"""
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            DailyNutritionSummary.apply(
+                self.user_id, self.entry_date, self.meal_type, -self.calculated_calories, -1
+            )
+        return result
     
     @classmethod
     def get_daily_total(cls, user, entry_date):
         """Get total calories for a specific date"""
-        entries = cls.objects.filter(user=user, entry_date=entry_date)
-        total = sum([entry.calculated_calories for entry in entries])
-        return total
+        days = cls.objects.for_range(user, entry_date, entry_date).daily_breakdowns()
+        day = days.get((user.id, entry_date))
+        return day['total_calories'] if day else 0
     
     @classmethod
     def get_daily_breakdown(cls, user, entry_date):
         """Get calorie breakdown by meal type for a specific date"""
-        entries = cls.objects.filter(user=user, entry_date=entry_date)
-        breakdown = {}
-        for meal_type in dict(cls.MEAL_TYPE_CHOICES).keys():
-            meal_entries = entries.filter(meal_type=meal_type)
-            meal_total = sum([entry.calculated_calories for entry in meal_entries])
-            breakdown[meal_type] = {
-                'total_calories': meal_total,
-                'entries': meal_entries.count()
-            }
-        return breakdown
+        days = cls.objects.for_range(user, entry_date, entry_date).daily_breakdowns()
+        day = days.get((user.id, entry_date))
+        return day['breakdown'] if day else DailyNutritionSummary.empty_breakdown()
+
 
+class DailyNutritionSummary(models.Model):
+    """
+    DailyNutritionSummary holds each user's calorie totals per day and meal
+    type. FoodEntry.save()/delete() keep it up to date; run
+    `manage.py rebuild_nutrition_summaries` to backfill or repair it.
+    """
+    MEAL_TYPES = [meal_type for meal_type, _ in FoodEntry.MEAL_TYPE_CHOICES]
+    
+    user = models.ForeignKey(UserLogin, on_delete=models.CASCADE, related_name='daily_nutrition', verbose_name="User")
+    date = models.DateField(verbose_name="Date")
+    total_calories = models.FloatField(default=0, verbose_name="Total Calories")
+    entry_count = models.IntegerField(default=0, verbose_name="Entry Count")
+    breakfast_calories = models.FloatField(default=0, verbose_name="Breakfast Calories")
+    breakfast_count = models.IntegerField(default=0, verbose_name="Breakfast Entries")
+    lunch_calories = models.FloatField(default=0, verbose_name="Lunch Calories")
+    lunch_count = models.IntegerField(default=0, verbose_name="Lunch Entries")
+    dinner_calories = models.FloatField(default=0, verbose_name="Dinner Calories")
+    dinner_count = models.IntegerField(default=0, verbose_name="Dinner Entries")
+    snacks_calories = models.FloatField(default=0, verbose_name="Snacks Calories")
+    snacks_count = models.IntegerField(default=0, verbose_name="Snacks Entries")
+    fruits_calories = models.FloatField(default=0, verbose_name="Fruits Calories")
+    fruits_count = models.IntegerField(default=0, verbose_name="Fruits Entries")
+    nuts_calories = models.FloatField(default=0, verbose_name="Nuts Calories")
+    nuts_count = models.IntegerField(default=0, verbose_name="Nuts Entries")
+    milks_calories = models.FloatField(default=0, verbose_name="Milks Calories")
+    milks_count = models.IntegerField(default=0, verbose_name="Milks Entries")
+    other_calories = models.FloatField(default=0, verbose_name="Other Calories")
+    other_count = models.IntegerField(default=0, verbose_name="Other Entries")
+    
+    class Meta:
+        db_table = 'daily_nutrition_summary'
+        verbose_name = 'Daily Nutrition Summary'
+        verbose_name_plural = 'Daily Nutrition Summaries'
+        ordering = ['-date']
+        unique_together = ['user', 'date']
+    
+    def __str__(self):
+        return f"{self.user.name} - {self.date}: {self.total_calories:.0f} cal"
+    
+    @classmethod
+    def apply(cls, user_id, day, meal_type, calories, count):
+        """
+        Add (or, with negative values, remove) entries to a day's rollup.
+        Call inside the transaction that changes the FoodEntry rows.
+        """
+        summary, _ = cls.objects.select_for_update().get_or_create(user_id=user_id, date=day)
+        changes = {
+            'total_calories': models.F('total_calories') + calories,
+            'entry_count': models.F('entry_count') + count,
+        }
+        # Unknown meal types still count towards the day total, as in get_daily_total
+        if meal_type in cls.MEAL_TYPES:
+            changes[f'{meal_type}_calories'] = models.F(f'{meal_type}_calories') + calories
+            changes[f'{meal_type}_count'] = models.F(f'{meal_type}_count') + count
+        cls.objects.filter(pk=summary.pk).update(**changes)
+        if count < 0:
+            # Drop days whose last entry was removed so they leave the history
+            cls.objects.filter(pk=summary.pk, entry_count__lte=0).delete()
+    
+    @classmethod
+    def for_range(cls, user, start_date, end_date):
+        """Rollups for the days in [start_date, end_date] that have entries, newest first"""
+        return cls.objects.filter(
+            user=user,
+            date__gte=start_date,
+            date__lte=end_date,
+            entry_count__gt=0
+        ).order_by('-date')
+    
+    @classmethod
+    def rebuild(cls, user_ids=None, start_date=None, end_date=None):
+        """
+        Recompute rollups from FoodEntry for the given users/date range
+        (everything by default). Returns the number of rollup rows written.
+        """
+        entries = FoodEntry.objects.all()
+        summaries = cls.objects.all()
+        if user_ids:
+            entries = entries.filter(user_id__in=user_ids)
+            summaries = summaries.filter(user_id__in=user_ids)
+        if start_date:
+            entries = entries.filter(entry_date__gte=start_date)
+            summaries = summaries.filter(date__gte=start_date)
+        if end_date:
+            entries = entries.filter(entry_date__lte=end_date)
+            summaries = summaries.filter(date__lte=end_date)
+        
+        rebuilt = []
+        for (user_id, day), totals in entries.daily_breakdowns().items():
+            summary = cls(
+                user_id=user_id,
+                date=day,
+                total_calories=totals['total_calories'],
+                entry_count=totals['entry_count']
+            )
+            for meal_type, meal in totals['breakdown'].items():
+                setattr(summary, f'{meal_type}_calories', meal['total_calories'])
+                setattr(summary, f'{meal_type}_count', meal['entries'])
+            rebuilt.append(summary)
+        
+        with transaction.atomic():
+            summaries.delete()
+            cls.objects.bulk_create(rebuilt, batch_size=500)
+        return len(rebuilt)
+    
+    def get_breakdown(self):
+        """Calorie breakdown by meal type, in the shape of FoodEntry.get_daily_breakdown"""
+        return {
+            meal_type: {
+                'total_calories': getattr(self, f'{meal_type}_calories'),
+                'entries': getattr(self, f'{meal_type}_count')
+            }
+            for meal_type in self.MEAL_TYPES
+        }
+    
+    def get_meal_totals(self):
+        """Calories per meal type, only for meals that have entries"""
+        return {
+            meal_type: getattr(self, f'{meal_type}_calories')
+            for meal_type in self.MEAL_TYPES
+            if getattr(self, f'{meal_type}_count') > 0
+        }
+    
+    @classmethod
+    def empty_breakdown(cls):
+        """Breakdown for a day without any entries"""
+        return {meal_type: {'total_calories': 0, 'entries': 0} for meal_type in cls.MEAL_TYPES}
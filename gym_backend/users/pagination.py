@@ -0,0 +1,94 @@
+import base64
+import json
+from datetime import date, datetime
+
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor that cannot be decoded"""
+
+
+def encode_cursor(values):
+    """Encode the sort key of the last row on a page as an opaque cursor string"""
+    payload = [v.isoformat() if isinstance(v, (datetime, date)) else v for v in values]
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """Decode a cursor produced by encode_cursor into a list of `size` values"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursor('Invalid cursor')
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor('Invalid cursor')
+    return values
+
+
+def keyset_filter(field, value, pk, descending=True, pk_field='id'):
+    """
+    Build the WHERE clause that selects rows after (value, pk) in an
+    ORDER BY field, pk listing. The primary key breaks ties so pages never
+    overlap or skip rows that share the same sort value.
+    """
+    op = 'lt' if descending else 'gt'
+    return Q(**{f'{field}__{op}': value}) | Q(**{field: value, f'{pk_field}__{op}': pk})
+
+
+def parse_limit(value, default, maximum):
+    """Parse a page size from the query string, clamped to 1..maximum"""
+    if value in (None, ''):
+        return default
+    limit = int(value)
+    if limit < 1:
+        raise ValueError('limit must be a positive integer')
+    return min(limit, maximum)
+
+
+def parse_sort(params, sort_fields, default):
+    """
+    Return (sort_field, descending) from the ?sort= and ?order= params, where
+    sort_fields maps public sort names to ORDER BY fields and order defaults
+    to 'desc'. Raises ValueError for an unknown sort or order.
+    """
+    sort = params.get('sort') or default
+    if sort not in sort_fields:
+        raise ValueError(f"Invalid sort. Choose from: {', '.join(sort_fields)}")
+    order = params.get('order') or 'desc'
+    if order not in ('asc', 'desc'):
+        raise ValueError("Invalid order. Use 'asc' or 'desc'")
+    return sort_fields[sort], order == 'desc'
+
+
+def keyset_page(queryset, params, sort_field, descending):
+    """
+    Order queryset by (sort_field, id) and skip past the ?cursor= param.
+    Raises InvalidCursor for a malformed cursor.
+    """
+    cursor = params.get('cursor')
+    if cursor:
+        value, pk = decode_cursor(cursor, 2)
+        queryset = queryset.filter(keyset_filter(sort_field, value, pk, descending))
+    prefix = '-' if descending else ''
+    return queryset.order_by(f'{prefix}{sort_field}', f'{prefix}id')
+
+
+def finish_page(rows, sort_field, limit):
+    """Trim the extra row fetched past the page and build the next cursor"""
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, sort_field), last.id])
+    return rows, next_cursor
+
+
+def fetch_page(queryset, sort_field, limit):
+    """Return (rows, next_cursor); a limit of None returns every row"""
+    if limit is None:
+        return list(queryset), None
+    # Fetch one extra row to know whether another page exists
+    return finish_page(list(queryset[:limit + 1]), sort_field, limit)
@@ -0,0 +1,115 @@
+"""
+Login Passwords
+Password checks on a small bounded thread pool, so a burst of logins cannot
+take every worker's CPU, with fixed-window attempt limits per email and per
+client IP counted atomically in the shared default cache. Hashes made with a
+hasher or cost other than the preferred one (first in PASSWORD_HASHERS) are
+replaced on success.
+"""
+
+import asyncio
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.cache import cache
+
+# Scope -> (attempts allowed per window, window length in seconds)
+DEFAULT_THROTTLE_RATES = {'email': (5, 300), 'ip': (30, 60)}
+
+
+class HasherBusy(Exception):
+    """Every hashing worker and queue place is taken"""
+
+
+_executor = None
+_slots = None
+_lock = threading.Lock()
+
+
+def get_executor():
+    """(executor, slots) for this process: PASSWORD_HASH_WORKERS threads and room for PASSWORD_HASH_QUEUE waiting checks"""
+    global _executor, _slots
+    with _lock:
+        if _executor is None:
+            workers = getattr(settings, 'PASSWORD_HASH_WORKERS', 2)
+            _slots = threading.BoundedSemaphore(workers + getattr(settings, 'PASSWORD_HASH_QUEUE', 16))
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        return _executor, _slots
+
+
+def submit(func, *args):
+    """Run func on the hashing pool; raises HasherBusy instead of queueing without bound"""
+    executor, slots = get_executor()
+    if not slots.acquire(blocking=False):
+        raise HasherBusy()
+    try:
+        future = executor.submit(func, *args)
+    except BaseException:
+        slots.release()
+        raise
+    future.add_done_callback(lambda _: slots.release())
+    return future
+
+
+def verify(raw_password, encoded):
+    """
+    (matches, rehashed): rehashed is the password hashed with the preferred
+    hasher and cost when it matched an outdated hash, otherwise None
+    """
+    rehashed = []
+    matches = check_password(raw_password, encoded, setter=lambda raw: rehashed.append(make_password(raw)))
+    return matches, (rehashed[0] if rehashed else None)
+
+
+async def averify(raw_password, encoded):
+    """verify() on the hashing pool. Raises HasherBusy when the pool is full."""
+    return await asyncio.wrap_future(submit(verify, raw_password, encoded))
+
+
+def client_ip(request):
+    """The connecting address; a reverse proxy must set REMOTE_ADDR to the real client"""
+    return request.META.get('REMOTE_ADDR') or 'unknown'
+
+
+def window_key(scope, value, now):
+    """(cache key of value's current window in scope, seconds until the window ends)"""
+    period = getattr(settings, 'LOGIN_THROTTLE_RATES', DEFAULT_THROTTLE_RATES)[scope][1]
+    window = int(now // period)
+    digest = hashlib.sha256(value.lower().encode()).hexdigest()
+    return f'login_throttle:{scope}:{digest}:{window}', (window + 1) * period - now
+
+
+async def acount_attempt(scope, value):
+    """
+    Count an attempt in the scope's current window for value. Returns 0 when
+    it is within the limit, otherwise the seconds until the window ends.
+    add() and incr() are atomic on a shared cache, so concurrent attempts on
+    any worker cannot exceed the limit.
+    """
+    limit, period = getattr(settings, 'LOGIN_THROTTLE_RATES', DEFAULT_THROTTLE_RATES)[scope]
+    key, remaining = window_key(scope, value, time.time())
+    await cache.aadd(key, 0, period)
+    try:
+        attempts = await cache.aincr(key)
+    except ValueError:  # The window expired between add() and incr()
+        await cache.aadd(key, 1, period)
+        attempts = 1
+    return remaining if attempts > limit else 0
+
+
+async def athrottle_login(request, emailid):
+    """Seconds the caller must wait before another login attempt, or 0"""
+    for scope, value in (('ip', client_ip(request)), ('email', emailid)):
+        wait = await acount_attempt(scope, value)
+        if wait:
+            return wait
+    return 0
+
+
+async def areset_email_attempts(emailid):
+    """Forget an email's attempts in the current window after a successful login"""
+    await cache.adelete(window_key('email', emailid, time.time())[0])
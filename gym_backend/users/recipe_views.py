@@ -3,9 +3,11 @@ from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
 import json
 from .models import FoodRecipe, UserLogin, UserProfile
+from .identity import admin_required, identity_denied
 
 
 @csrf_exempt
+@admin_required
 def add_recipe(request):
     """Admin endpoint to add food recipes"""
     if request.method == 'POST':
@@ -72,6 +74,9 @@ def add_recipe(request):
 def get_recipes(request, user_id):
     """Get recipes filtered by user's diet preference"""
     if request.method == 'GET':
+        denied = identity_denied(request, user_id=user_id)
+        if denied:
+            return denied
         try:
             user = UserLogin.objects.get(id=user_id)
             profile = UserProfile.objects.get(user=user)
@@ -179,6 +184,7 @@ def get_all_recipes(request):
 
 
 @csrf_exempt
+@admin_required
 def update_recipe(request, recipe_id):
     """Update an existing recipe"""
     if request.method == 'PUT':
@@ -234,6 +240,7 @@ def update_recipe(request, recipe_id):
 
 
 @csrf_exempt
+@admin_required
 def delete_recipe(request, recipe_id):
     """Delete a recipe"""
     if request.method == 'DELETE':
@@ -0,0 +1,132 @@
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.db.models import DateTimeField, F, FilteredRelation, Q, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import UserProfile, current_streak_as_of
+from .pagination import fetch_page, finish_page, keyset_page, parse_limit, parse_sort
+
+# Trainer roster engine
+#
+# Builds the trainer home screen from a single annotated query: attendance
+# totals come from each member's AttendanceStats row through one LEFT JOIN,
+# so the cost stays constant as a roster and its attendance history grow.
+
+MAX_PAGE_SIZE = 200
+
+# Members without a subscription end date sort as if they expired long ago
+NO_SUBSCRIPTION = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+# Public sort name -> annotated/model field used for ORDER BY and the cursor
+SORT_FIELDS = {
+    'remaining_days': 'subscription_sort',
+    'attendance': 'total_attendance',
+    'created_at': 'created_at',
+}
+
+
+def roster_queryset(trainer):
+    """Paid members of a trainer annotated with their attendance counters"""
+    return UserProfile.objects.filter(
+        assigned_trainer=trainer,
+        payment_status=True  # Only show paid users
+    ).select_related('user').annotate(
+        stats=FilteredRelation('user__attendance_stats', condition=Q(user__attendance_stats__trainer=trainer)),
+        total_attendance=Coalesce('stats__accepted_count', 0),
+        pending_attendance=Coalesce('stats__pending_count', 0),
+        current_streak=Coalesce('stats__current_streak', 0),
+        longest_streak=Coalesce('stats__longest_streak', 0),
+        last_attended_date=F('stats__last_attended_date'),
+        subscription_sort=Coalesce(
+            'subscription_end_date', Value(NO_SUBSCRIPTION), output_field=DateTimeField()
+        ),
+    )
+
+
+def roster_page_query(trainer, params):
+    """
+    Return (queryset, sort_field, limit) for a page of a trainer's roster.
+
+    Supported query params:
+        goal          - only members with this goal
+        subscription  - 'active' or 'expired'
+        sort          - remaining_days, attendance or created_at (default)
+        order         - 'asc' or 'desc' (default)
+        limit         - page size, capped at MAX_PAGE_SIZE; omit for the full roster
+        cursor        - next_cursor from the previous page
+
+    Raises ValueError for unknown sort/filter values or a malformed cursor.
+    """
+    sort_field, descending = parse_sort(params, SORT_FIELDS, 'created_at')
+
+    queryset = roster_queryset(trainer)
+
+    goal = params.get('goal')
+    if goal:
+        queryset = queryset.filter(goal=goal)
+
+    subscription = params.get('subscription')
+    now = timezone.now()
+    if subscription == 'active':
+        queryset = queryset.filter(subscription_end_date__gt=now)
+    elif subscription == 'expired':
+        queryset = queryset.filter(Q(subscription_end_date__lte=now) | Q(subscription_end_date__isnull=True))
+    elif subscription:
+        raise ValueError("Invalid subscription filter. Use 'active' or 'expired'")
+
+    queryset = keyset_page(queryset, params, sort_field, descending)
+
+    limit = parse_limit(params.get('limit'), None, MAX_PAGE_SIZE)
+    return queryset, sort_field, limit
+
+
+def get_roster_page(trainer, params):
+    """
+    Return (profiles, next_cursor) for a trainer's roster; see roster_page_query.
+    Raises ValueError for unknown sort/filter values or a malformed cursor.
+    """
+    queryset, sort_field, limit = roster_page_query(trainer, params)
+    return fetch_page(queryset, sort_field, limit)
+
+
+async def aget_roster_page(trainer, params):
+    """Async version of get_roster_page for the ASGI views"""
+    queryset, sort_field, limit = roster_page_query(trainer, params)
+    if limit is None:
+        return [profile async for profile in queryset], None
+    return finish_page([profile async for profile in queryset[:limit + 1]], sort_field, limit)
+
+
+def serialize_roster_entry(profile):
+    """Roster payload for one member, as consumed by the trainer app"""
+    user = profile.user
+    return {
+        'id': user.id,
+        'name': user.name,
+        'email': user.emailid,
+        'mobile': profile.mobile_number,
+        'age': profile.age,
+        'gender': profile.gender,
+        'current_weight': profile.current_weight,
+        'current_height': profile.current_height,
+        'goal': profile.goal,
+        'target_weight': profile.target_weight,
+        'target_months': profile.target_months,
+        'remaining_days': profile.get_remaining_days(),
+        'subscription_start_date': profile.subscription_start_date.isoformat() if profile.subscription_start_date else None,
+        'subscription_end_date': profile.subscription_end_date.isoformat() if profile.subscription_end_date else None,
+        'subscription_status': 'active' if profile.is_subscription_active() else 'expired',
+        'payment_date': profile.payment_date.isoformat() if profile.payment_date else None,
+        'workout_time': profile.workout_time,
+        'diet_preference': profile.diet_preference,
+        'food_allergies': profile.food_allergies or '',
+        'health_conditions': profile.health_conditions or '',
+        'payment_amount': profile.payment_amount,
+        'total_attendance': profile.total_attendance,
+        'pending_attendance': profile.pending_attendance,
+        'current_streak': current_streak_as_of(profile.current_streak, profile.last_attended_date, date.today()),
+        'longest_streak': profile.longest_streak,
+        'last_attended_date': profile.last_attended_date.strftime('%Y-%m-%d') if profile.last_attended_date else None,
+        'created_at': profile.created_at.strftime('%Y-%m-%d')
+    }
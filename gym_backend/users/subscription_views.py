@@ -4,12 +4,16 @@ from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
 from datetime import timedelta
 from .models import UserLogin, UserProfile, SubscriptionRenewal
+from .identity import identity_denied
 
 
 @csrf_exempt
 def get_subscription_status(request, user_id):
     """Get subscription status for a user"""
     if request.method == 'GET':
+        denied = identity_denied(request, user_id=user_id)
+        if denied:
+            return denied
         try:
             user = UserLogin.objects.get(id=user_id)
             profile = UserProfile.objects.get(user=user)
@@ -78,6 +82,10 @@ def renew_subscription(request):
                     'message': 'User ID and renewal months are required'
                 }, status=400)
             
+            denied = identity_denied(request, user_id=user_id)
+            if denied:
+                return denied
+            
             user = UserLogin.objects.get(id=user_id)
             profile = UserProfile.objects.get(user=user)
             
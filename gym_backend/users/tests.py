@@ -1,3 +1,299 @@
-from django.test import TestCase
+import itertools
+from datetime import date, datetime, timedelta
+from unittest import skipIf
 
-# Create your tests here.
+from django.db.models import Q
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from . import calorie_targets, passwords
+from .diet_templates import GoalIndex
+from .meal_nutrition import parse_quantity
+from .media_views import parse_range
+from .models import (
+    Attendance, AttendanceStats, DailyNutritionSummary, FoodEntry, FoodItem, Trainer, UserLogin, UserProfile
+)
+from .pagination import InvalidCursor, decode_cursor, encode_cursor, keyset_filter, parse_limit
+
+
+class CalorieTargetTests(SimpleTestCase):
+    """The vectorised targets must match the plain-Python formula row for row"""
+
+    ROWS = [
+        (current, target, months, gender, goal)
+        for current, target in itertools.product((45.0, 70.5, 120.0, 180.0), (40.0, 70.5, 75.0, 100.0, 200.0))
+        for months, _ in UserProfile.MONTH_CHOICES
+        for gender, _ in UserProfile.GENDER_CHOICES
+        for goal, _ in UserProfile.GOAL_CHOICES
+    ]
+
+    @skipIf(calorie_targets.np is None, 'NumPy is not installed')
+    def test_batch_matches_single_rows(self):
+        expected = [calorie_targets.calculate_one(*row) for row in self.ROWS]
+        self.assertEqual(calorie_targets.calculate_batch(self.ROWS), expected)
+
+    def test_profile_uses_batch_formula(self):
+        row = (95.0, 70.0, 1, 'female', 'weight_loss')
+        profile = UserProfile(**dict(zip(UserProfile.TARGET_INPUT_FIELDS, row)))
+        targets = profile.calculate_target_calories()
+        self.assertEqual(targets, calorie_targets.calculate_one(*row))
+        self.assertEqual(targets['weekly_change'], calorie_targets.MAX_SAFE_LOSS)
+        self.assertFalse(targets['is_safe'])
+
+
+class CursorTests(SimpleTestCase):
+    """Cursors round-trip the sort key of a page's last row"""
+
+    def test_round_trip(self):
+        values = [datetime(2024, 3, 1, 12, 30), date(2024, 3, 1), 'Ann', 42, None]
+        cursor = encode_cursor(values)
+        self.assertNotIn('=', cursor)
+        self.assertEqual(
+            decode_cursor(cursor, len(values)),
+            ['2024-03-01T12:30:00', '2024-03-01', 'Ann', 42, None]
+        )
+
+    def test_rejects_bad_cursors(self):
+        for cursor, size in (('not a cursor!', 2), (encode_cursor([1, 2]), 3), (encode_cursor({'a': 1})[:-1], 1)):
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(InvalidCursor):
+                    decode_cursor(cursor, size)
+
+    def test_keyset_filter_breaks_ties_on_pk(self):
+        self.assertEqual(
+            keyset_filter('name', 'Ann', 7, descending=False),
+            Q(name__gt='Ann') | Q(name='Ann', id__gt=7)
+        )
+        self.assertEqual(keyset_filter('date', '2024-03-01', 7), Q(date__lt='2024-03-01') | Q(date='2024-03-01', id__lt=7))
+
+    def test_parse_limit(self):
+        self.assertEqual(parse_limit(None, 50, 200), 50)
+        self.assertEqual(parse_limit('', 50, 200), 50)
+        self.assertEqual(parse_limit('20', 50, 200), 20)
+        self.assertEqual(parse_limit('500', 50, 200), 200)
+        for value in ('0', '-3', 'ten'):
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    parse_limit(value, 50, 200)
+
+
+class RangeParsingTests(SimpleTestCase):
+    """parse_range serves one satisfiable byte range and ignores the rest"""
+
+    def test_ranges(self):
+        for header, expected in (
+            ('bytes=0-99', (0, 99)),
+            ('bytes=500-', (500, 999)),
+            ('bytes=900-5000', (900, 999)),
+            ('bytes=-100', (900, 999)),
+            ('bytes=-5000', (0, 999)),
+            (' bytes=999-999 ', (999, 999)),
+        ):
+            with self.subTest(header=header):
+                self.assertEqual(parse_range(header, 1000), expected)
+
+    def test_ignored_headers(self):
+        for header in ('bytes=0-1,5-6', 'bytes=-', 'items=0-9', 'bytes=a-b', ''):
+            with self.subTest(header=header):
+                self.assertIsNone(parse_range(header, 1000))
+
+    def test_unsatisfiable(self):
+        for header in ('bytes=1000-', 'bytes=50-10', 'bytes=-0'):
+            with self.subTest(header=header):
+                with self.assertRaises(ValueError):
+                    parse_range(header, 1000)
+
+
+class QuantityParsingTests(SimpleTestCase):
+    """Plan quantities are read into an amount and a known unit"""
+
+    def test_quantities(self):
+        for text, expected in (
+            ('60g', (60.0, 'g')),
+            ('1/2 cup', (0.5, 'cup')),
+            ('2 pieces', (2.0, 'piece')),
+            ('1 Medium', (1.0, 'medium')),
+            ('1.5 litre', (1.5, 'l')),
+            ('3', (3.0, 'piece')),
+            ('a pinch', None),
+            ('2 handfuls', None),
+            (None, None),
+        ):
+            with self.subTest(text=text):
+                self.assertEqual(parse_quantity(text), expected)
+
+
+class GoalIndexTests(SimpleTestCase):
+    """The interval index finds the same templates as a linear scan"""
+
+    TEMPLATES = [
+        {'id': 1, 'calorie_min': 1200, 'calorie_max': 1500},
+        {'id': 2, 'calorie_min': 1400, 'calorie_max': 1800},
+        {'id': 3, 'calorie_min': 1800, 'calorie_max': 2200},
+        {'id': 4, 'calorie_min': 2500, 'calorie_max': 3000},
+    ]
+
+    def test_matches_linear_scan(self):
+        index = GoalIndex(self.TEMPLATES)
+        for low, high in ((1000, 1100), (1200, 1200), (1450, 1450), (1500, 1800), (1801, 2499),
+                          (2200, 2200), (2201, 2499), (0, 5000), (3000, 3500), (3001, 4000)):
+            with self.subTest(low=low, high=high):
+                expected = {t['id'] for t in self.TEMPLATES if t['calorie_min'] <= high and low <= t['calorie_max']}
+                self.assertEqual({t['id'] for t in index.overlapping(low, high)}, expected)
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    LOGIN_THROTTLE_RATES={'email': (2, 60), 'ip': (100, 60)},
+)
+class LoginThrottleTests(SimpleTestCase):
+    """Attempts are counted per fixed window"""
+
+    def test_window_key(self):
+        key, remaining = passwords.window_key('email', 'Ann@Example.com', 125.0)
+        self.assertEqual(remaining, 55.0)
+        self.assertEqual(passwords.window_key('email', 'ann@example.com', 179.0)[0], key)
+        self.assertNotEqual(passwords.window_key('email', 'ann@example.com', 180.0)[0], key)
+        self.assertNotEqual(passwords.window_key('ip', 'ann@example.com', 125.0)[0], key)
+
+    async def test_limit_and_reset(self):
+        self.assertEqual(await passwords.acount_attempt('email', 'ann@example.com'), 0)
+        self.assertEqual(await passwords.acount_attempt('email', 'ann@example.com'), 0)
+        wait = await passwords.acount_attempt('email', 'ann@example.com')
+        self.assertGreater(wait, 0)
+        self.assertLessEqual(wait, 60)
+        self.assertEqual(await passwords.acount_attempt('email', 'bob@example.com'), 0)
+        await passwords.areset_email_attempts('ann@example.com')
+        self.assertEqual(await passwords.acount_attempt('email', 'ann@example.com'), 0)
+
+
+class AttendanceStatsTests(TestCase):
+    """Attendance writes keep AttendanceStats equal to a rebuild"""
+
+    def setUp(self):
+        login = UserLogin.objects.create(name='Trainer', emailid='trainer@example.com', password='x', role='trainer')
+        self.trainer = Trainer.objects.create(
+            user=login, mobile='9000000000', gender='male', experience=3, specialization='Strength',
+            joining_period='1 year'
+        )
+        self.member = UserLogin.objects.create(name='Member', emailid='member@example.com', password='x')
+        self.today = date(2024, 3, 10)
+
+    def attend(self, days_ago, status='pending'):
+        return Attendance.objects.create(
+            user=self.member, trainer=self.trainer, date=self.today - timedelta(days=days_ago), status=status
+        )
+
+    def stats(self):
+        row = AttendanceStats.objects.get(user=self.member, trainer=self.trainer)
+        return {
+            'accepted': row.accepted_count, 'pending': row.pending_count, 'rejected': row.rejected_count,
+            'current_streak': row.current_streak, 'longest_streak': row.longest_streak,
+            'last_attended_date': row.last_attended_date,
+        }
+
+    def assertMatchesRebuild(self):
+        maintained = self.stats()
+        AttendanceStats.rebuild([self.member.id])
+        self.assertEqual(self.stats(), maintained)
+
+    def test_create_and_status_change(self):
+        record = self.attend(0)
+        self.assertEqual(self.stats()['pending'], 1)
+        record.status = 'accepted'
+        record.save()
+        self.assertEqual(self.stats(), {
+            'accepted': 1, 'pending': 0, 'rejected': 0,
+            'current_streak': 1, 'longest_streak': 1, 'last_attended_date': self.today,
+        })
+        self.assertMatchesRebuild()
+
+    def test_earlier_day_recounts_streaks(self):
+        self.attend(0, 'accepted')
+        self.attend(2, 'accepted')
+        self.assertEqual(self.stats()['current_streak'], 1)
+        self.attend(1, 'accepted')
+        self.assertEqual(self.stats()['current_streak'], 3)
+        self.assertEqual(self.stats()['longest_streak'], 3)
+        self.assertMatchesRebuild()
+
+    def test_delete_and_unaccept(self):
+        latest = self.attend(0, 'accepted')
+        earlier = self.attend(1, 'accepted')
+        self.attend(3, 'rejected')
+        latest.delete()
+        self.assertEqual(self.stats()['last_attended_date'], self.today - timedelta(days=1))
+        self.assertEqual(self.stats()['accepted'], 1)
+        earlier.status = 'rejected'
+        earlier.save()
+        self.assertEqual(self.stats(), {
+            'accepted': 0, 'pending': 0, 'rejected': 2,
+            'current_streak': 0, 'longest_streak': 0, 'last_attended_date': None,
+        })
+        self.assertMatchesRebuild()
+
+    def test_review_pending(self):
+        first, second = self.attend(1), self.attend(0)
+        self.attend(2, 'accepted')
+        updated, skipped = Attendance.review_pending(self.trainer.id, 'accepted', [first.id, second.id, 999])
+        self.assertEqual(updated, [first.id, second.id])
+        self.assertEqual(skipped, [999])
+        self.assertEqual(self.stats()['accepted'], 3)
+        self.assertEqual(self.stats()['pending'], 0)
+        self.assertEqual(self.stats()['current_streak'], 3)
+        self.assertMatchesRebuild()
+
+        self.attend(5)
+        Attendance.review_pending(self.trainer.id, 'rejected', on_date=self.today - timedelta(days=5))
+        self.assertEqual(self.stats()['rejected'], 1)
+        self.assertEqual(self.stats()['pending'], 0)
+        self.assertMatchesRebuild()
+
+
+class NutritionRollupTests(TestCase):
+    """FoodEntry writes keep DailyNutritionSummary in step"""
+
+    def setUp(self):
+        self.user = UserLogin.objects.create(name='Member', emailid='member@example.com', password='x')
+        self.rice = FoodItem.objects.create(
+            name='Rice', food_category='grains', diet_type='vegan', calories=130, protein=2, carbs=28, fats=0
+        )
+        self.day = date(2024, 3, 10)
+
+    def eat(self, quantity, meal_type='lunch', day=None):
+        return FoodEntry.objects.create(
+            user=self.user, food_item=self.rice, quantity=quantity, quantity_unit='g',
+            meal_type=meal_type, entry_date=day or self.day
+        )
+
+    def summary(self, day=None):
+        return DailyNutritionSummary.objects.filter(user=self.user, date=day or self.day).first()
+
+    def test_save_update_and_delete(self):
+        lunch = self.eat(200)
+        dinner = self.eat(100, 'dinner')
+        summary = self.summary()
+        self.assertAlmostEqual(summary.total_calories, 390)
+        self.assertEqual(summary.entry_count, 2)
+        self.assertAlmostEqual(summary.lunch_calories, 260)
+        self.assertEqual(summary.dinner_count, 1)
+
+        lunch.quantity = 100
+        lunch.meal_type = 'breakfast'
+        lunch.save()
+        summary = self.summary()
+        self.assertAlmostEqual(summary.total_calories, 260)
+        self.assertEqual(summary.entry_count, 2)
+        self.assertEqual((summary.lunch_calories, summary.lunch_count), (0, 0))
+        self.assertAlmostEqual(summary.breakfast_calories, 130)
+
+        lunch.delete()
+        self.assertAlmostEqual(self.summary().total_calories, 130)
+        dinner.delete()
+        self.assertIsNone(self.summary())
+
+    def test_moving_an_entry_to_another_day(self):
+        entry = self.eat(100)
+        entry.entry_date = self.day + timedelta(days=1)
+        entry.save()
+        self.assertIsNone(self.summary())
+        self.assertAlmostEqual(self.summary(entry.entry_date).total_calories, 130)
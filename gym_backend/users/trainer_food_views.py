@@ -7,7 +7,9 @@ from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 import json
 from datetime import datetime, timedelta, date
-from .models import UserLogin, UserProfile, FoodItem, FoodEntry, Trainer
+from .models import UserLogin, UserProfile, FoodItem, FoodEntry, Trainer, DailyNutritionSummary
+from .db_routing import use_replica
+from .identity import identity_denied
 
 
 @csrf_exempt
@@ -28,6 +30,10 @@ def trainer_get_assigned_users_calories(request):
                     'message': 'trainer_id is required'
                 }, status=400)
             
+            denied = identity_denied(request, trainer_id=trainer_id)
+            if denied:
+                return denied
+            
             try:
                 target_date = datetime.strptime(target_date_str, '%Y-%m-%d').date()
             except ValueError:
@@ -45,28 +51,25 @@ def trainer_get_assigned_users_calories(request):
                     payment_status=True
                 ).select_related('user')
                 
+                # One rollup lookup for every assigned user on the target date
+                summaries = {
+                    summary.user_id: summary
+                    for summary in DailyNutritionSummary.objects.filter(
+                        user__in=[profile.user_id for profile in assigned_users],
+                        date=target_date,
+                        entry_count__gt=0
+                    )
+                }
+                
                 users_calories = []
                 for profile in assigned_users:
                     user = profile.user
-                    
-                    # Get all food entries for this user on the target date
-                    entries = FoodEntry.objects.filter(
-                        user=user,
-                        entry_date=target_date
-                    )
-                    
-                    total_calories = sum(entry.calculated_calories for entry in entries)
-                    
-                    # Get breakdown by meal type
-                    meal_breakdown = {}
-                    for entry in entries:
-                        meal_type = entry.meal_type
-                        if meal_type not in meal_breakdown:
-                            meal_breakdown[meal_type] = 0
-                        meal_breakdown[meal_type] += entry.calculated_calories
+                    summary = summaries.get(user.id)
+                    total_calories = summary.total_calories if summary else 0
+                    meal_breakdown = summary.get_meal_totals() if summary else {}
                     
                     # Get personalized calorie target
-                    calorie_target_info = profile.calculate_target_calories()
+                    calorie_target_info = profile.get_calorie_targets()
                     target_calories = calorie_target_info['target_calories']
                     
                     user_data = {
@@ -78,7 +81,7 @@ def trainer_get_assigned_users_calories(request):
                         'percentage': round((total_calories / target_calories * 100), 2) if target_calories > 0 else 0,
                         'remaining_calories': max(0, target_calories - total_calories),
                         'meal_breakdown': meal_breakdown,
-                        'entry_count': len(entries),
+                        'entry_count': summary.entry_count if summary else 0,
                         'date': target_date_str
                     }
                     users_calories.append(user_data)
@@ -135,6 +138,10 @@ def trainer_get_user_daily_calories(request):
                     'message': 'trainer_id and user_id are required'
                 }, status=400)
             
+            denied = identity_denied(request, user_id=user_id, trainer_id=trainer_id)
+            if denied:
+                return denied
+            
             try:
                 target_date = datetime.strptime(target_date_str, '%Y-%m-%d').date()
             except ValueError:
@@ -161,7 +168,7 @@ def trainer_get_user_daily_calories(request):
                     entries = FoodEntry.objects.filter(
                         user=user,
                         entry_date=target_date
-                    ).order_by('meal_type', '-created_at')
+                    ).select_related('food_item').order_by('meal_type', '-created_at')
                     print(f"DEBUG: Found {len(entries)} entries for user {user_id} on {target_date}")
                 except Exception as e:
                     print(f"ERROR fetching entries: {str(e)}")
@@ -185,19 +192,15 @@ def trainer_get_user_daily_calories(request):
                         print(f"Error processing entry {entry.id}: {str(e)}")
                         continue
                 
-                # Group by meal type
-                meal_breakdown = {}
-                for entry in entries:
-                    meal_type = entry.meal_type
-                    if meal_type not in meal_breakdown:
-                        meal_breakdown[meal_type] = 0.0
-                    meal_breakdown[meal_type] += entry.calculated_calories
+                # Group by meal type using the daily rollup
+                summary = DailyNutritionSummary.for_range(user, target_date, target_date).first()
+                meal_breakdown = summary.get_meal_totals() if summary else {}
                 
                 # Round meal breakdown values
                 meal_breakdown = {k: round(v, 2) for k, v in meal_breakdown.items()}
                 
-                total_calories = sum(entry.calculated_calories for entry in entries)
-                calorie_target_info = profile.calculate_target_calories()
+                total_calories = summary.total_calories if summary else 0
+                calorie_target_info = profile.get_calorie_targets()
                 target_calories = calorie_target_info['target_calories']
                 
                 return JsonResponse({
@@ -243,10 +246,11 @@ def trainer_get_user_daily_calories(request):
 
 
 @csrf_exempt
+@use_replica
 def trainer_get_user_calorie_history(request):
     """
     Get 30-day calorie history for a user assigned to a trainer
-    GET params: trainer_id, user_id
+    GET params: trainer_id, user_id, include_entries (default: true; 'false' returns daily totals only)
     Returns: Daily calorie data for last 30 days with statistics
     """
     if request.method == 'GET':
@@ -260,6 +264,10 @@ def trainer_get_user_calorie_history(request):
                     'message': 'trainer_id and user_id are required'
                 }, status=400)
             
+            denied = identity_denied(request, user_id=user_id, trainer_id=trainer_id)
+            if denied:
+                return denied
+            
             try:
                 trainer = Trainer.objects.get(id=trainer_id)
                 user = UserLogin.objects.get(id=user_id)
@@ -277,32 +285,34 @@ def trainer_get_user_calorie_history(request):
                 today = date.today()
                 start_date = today - timedelta(days=30)
                 
-                entries = FoodEntry.objects.filter(
-                    user=user,
-                    entry_date__gte=start_date,
-                    entry_date__lte=today
-                )
-                
-                # Aggregate by date
+                # Daily totals come from the rollup, newest first
                 history = {}
-                for entry in entries:
-                    date_str = entry.entry_date.strftime('%Y-%m-%d')
-                    if date_str not in history:
-                        history[date_str] = {
-                            'date': date_str,
-                            'total_calories': 0,
-                            'entries': []
-                        }
-                    history[date_str]['total_calories'] += entry.calculated_calories
-                    history[date_str]['entries'].append({
-                        'food_name': entry.food_item.name if entry.food_item else 'Custom Food',
-                        'meal_type': entry.meal_type,
-                        'calories': round(entry.calculated_calories, 2)
-                    })
+                for summary in DailyNutritionSummary.for_range(user, start_date, today):
+                    date_str = summary.date.strftime('%Y-%m-%d')
+                    history[date_str] = {
+                        'date': date_str,
+                        'total_calories': summary.total_calories,
+                        'entries': []
+                    }
+                
+                include_entries = request.GET.get('include_entries', 'true').lower() != 'false'
+                if include_entries and history:
+                    entries = FoodEntry.objects.filter(
+                        user=user,
+                        entry_date__gte=start_date,
+                        entry_date__lte=today
+                    ).select_related('food_item')
+                    for entry in entries:
+                        date_str = entry.entry_date.strftime('%Y-%m-%d')
+                        if date_str not in history:
+                            continue
+                        history[date_str]['entries'].append({
+                            'food_name': entry.food_item.name if entry.food_item else 'Custom Food',
+                            'meal_type': entry.meal_type,
+                            'calories': round(entry.calculated_calories, 2)
+                        })
                 
-                # Sort by date descending
-                sorted_history = sorted(history.items(), key=lambda x: x[0], reverse=True)
-                history_list = [item[1] for item in sorted_history]
+                history_list = list(history.values())
                 
                 # Calculate statistics
                 if history_list:
@@ -313,7 +323,7 @@ def trainer_get_user_calorie_history(request):
                 else:
                     avg_calories = max_calories = min_calories = 0
                 
-                calorie_target_info = profile.calculate_target_calories()
+                calorie_target_info = profile.get_calorie_targets()
                 target_calories = calorie_target_info['target_calories']
                 
                 return JsonResponse({
@@ -0,0 +1,138 @@
+"""
+Workout Video Catalog
+Cached, per-(goal, difficulty) ordered video lists and per-user recommendation
+maps. Lists are keyed by the VideoCatalogVersion row, so a write in any worker
+retires them everywhere, whichever cache backend holds them.
+"""
+
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import VideoCatalogVersion, VideoRecommendation, WorkoutVideo
+
+
+def catalog_version():
+    """Current catalog version; bumped whenever a WorkoutVideo changes"""
+    return VideoCatalogVersion.current()
+
+
+def invalidate_catalog():
+    """Drop every cached video list by moving to a new catalog version"""
+    VideoCatalogVersion.bump()
+
+
+def serialize_video(video):
+    """User-independent part of a video's payload"""
+    return {
+        'id': video.id,
+        'title': video.title,
+        'description': video.description,
+        'video_url': video.video_file.url if video.video_file else None,
+        'thumbnail_url': video.thumbnail.url if video.thumbnail else None,
+        'goal_type': video.goal_type,
+        'difficulty_level': video.difficulty_level,
+        'weight_range': f"{video.min_weight_difference}-{video.max_weight_difference}kg",
+        'duration': video.duration,
+        'day_number': video.day_number,
+        'created_at': video.created_at.strftime('%Y-%m-%d')
+    }
+
+
+def _cached_list(key, build):
+    key = f'workout_video_catalog:{catalog_version()}:{key}'
+    videos = cache.get(key)
+    if videos is None:
+        videos = [serialize_video(video) for video in build()]
+        cache.set(key, videos, getattr(settings, 'VIDEO_CATALOG_CACHE_TTL', 300))
+    return videos
+
+
+def get_progression_videos(goal, difficulty_levels):
+    """Day-progression (bulk) videos for a goal, ordered by day_number"""
+    difficulty_levels = sorted(difficulty_levels)
+    return _cached_list(
+        f"progression:{goal}:{','.join(difficulty_levels)}",
+        lambda: WorkoutVideo.objects.filter(
+            goal_type=goal,
+            difficulty_level__in=difficulty_levels,
+            is_active=True
+        ).exclude(
+            day_number__isnull=True  # Only videos with day numbers (bulk videos)
+        ).order_by('day_number')
+    )
+
+
+def get_web_videos(goal, difficulty_levels, trainer_id=None):
+    """Web-uploaded videos for a goal, newest first, optionally from one trainer only"""
+    difficulty_levels = sorted(difficulty_levels)
+
+    def build():
+        videos = WorkoutVideo.objects.filter(
+            goal_type=goal,
+            difficulty_level__in=difficulty_levels,
+            is_active=True,
+            uploaded_via='web',
+            day_number__isnull=True
+        )
+        if trainer_id:
+            videos = videos.filter(uploaded_by_id=trainer_id)
+        return videos.order_by('-created_at')
+
+    return _cached_list(f"web:{goal}:{','.join(difficulty_levels)}:{trainer_id or ''}", build)
+
+
+def recommendations_for(user_profile):
+    return VideoRecommendation.objects.filter(
+        user=user_profile
+    ).select_related('recommended_by__user')
+
+
+def serialize_recommendation(rec):
+    return {
+        'note': rec.note,
+        'recommended_by': rec.recommended_by.user.name,
+        'recommended_at': rec.created_at.strftime('%Y-%m-%d')
+    }
+
+
+def get_recommendation_map(user_profile):
+    """Map video id -> recommendation payload for a user, in one query"""
+    return {rec.video_id: serialize_recommendation(rec) for rec in recommendations_for(user_profile)}
+
+
+async def aget_recommendation_map(user_profile):
+    """Async version of get_recommendation_map"""
+    return {rec.video_id: serialize_recommendation(rec) async for rec in recommendations_for(user_profile)}
+
+
+def get_difficulty_levels(user_profile):
+    """Difficulty levels a user may watch, based on the weight they want to change"""
+    if user_profile.goal == 'others':
+        return ['beginner']  # General fitness, show beginner videos
+    weight_difference = abs(user_profile.target_weight - user_profile.current_weight)
+    # 0-10kg: beginner videos; more than 10kg: all videos
+    return ['beginner'] if weight_difference <= 10 else ['beginner', 'advanced']
+
+
+def get_days_enrolled(user_profile):
+    """Days since enrollment, starting from day 1"""
+    return (date.today() - user_profile.created_at.date()).days + 1
+
+
+def can_watch(user_profile, video):
+    """
+    Apply the get_user_videos visibility and day-progression unlock rules
+    to a single video, so the file itself can be protected.
+    """
+    if not video.is_active or video.goal_type != user_profile.goal:
+        return False
+    if video.difficulty_level not in get_difficulty_levels(user_profile):
+        return False
+    if video.day_number is not None:
+        return video.day_number <= get_days_enrolled(user_profile)
+    if video.uploaded_via != 'web':
+        return False
+    # Web uploads are limited to the assigned trainer's videos when there is one
+    return not user_profile.assigned_trainer_id or video.uploaded_by_id == user_profile.assigned_trainer_id
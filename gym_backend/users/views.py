@@ -1,12 +1,26 @@
 from django.shortcuts import render
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
 from django.utils import timezone
+from django.db import transaction
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 import json
+import math
 from datetime import datetime, timedelta, date
-from .models import UserLogin, Trainer, UserProfile, Attendance, Review, FoodItem, DietPlanTemplate, UserDietPlan, WorkoutVideo, VideoRecommendation, ChatMessage, FoodEntry, SubscriptionRenewal
+from .models import UserLogin, Trainer, UserProfile, Attendance, AttendanceStats, Review, FoodItem, DietPlanTemplate, UserDietPlan, WorkoutVideo, VideoRecommendation, ChatMessage, ChatConversation, FoodEntry, SubscriptionRenewal
+from .pagination import decode_cursor, encode_cursor, keyset_filter, parse_limit
+from .roster import aget_roster_page, serialize_roster_entry
+from .async_utils import alist, async_csrf_exempt, gather, run_sync
+from .db_routing import use_replica
+from .identity import admin_denied, admin_required, aidentity_denied, forbidden, identity_denied, issue_token, sign_stream, token_max_age
+from . import passwords, video_catalog
+from .attendance_calendar import get_calendar, history_list, lifetime_totals, parse_window, window_records
+from .diet_templates import maintenance_range, resolve_templates
+from .food_catalog import FORMATS as CATALOG_FORMATS, build_columnar, catalog_queryset, catalog_validators, stream_full
 
 # Create your views here.
 
@@ -46,7 +60,9 @@ def create_user(request):
                     'id': user.id,
                     'name': user.name,
                     'emailid': user.emailid
-                }
+                },
+                'token': issue_token(user.id, user.role),
+                'token_expires_in': token_max_age()
             }, status=201)
             
         except json.JSONDecodeError:
@@ -66,8 +82,12 @@ def create_user(request):
     }, status=405)
 
 
-@csrf_exempt
-def login_user(request):
+@async_csrf_exempt
+async def login_user(request):
+    """
+    Log in with emailid and password. Attempts are throttled per email and
+    per client IP, and the password check runs on the bounded hashing pool.
+    """
     if request.method == 'POST':
         try:
             data = json.loads(request.body)
@@ -82,9 +102,19 @@ def login_user(request):
                     'message': 'Email and password are required'
                 }, status=400)
             
+            # Throttle before any hashing so refused attempts cost no CPU
+            wait = await passwords.athrottle_login(request, emailid)
+            if wait:
+                response = JsonResponse({
+                    'success': False,
+                    'message': 'Too many login attempts. Please try again later.'
+                }, status=429)
+                response['Retry-After'] = str(math.ceil(wait))
+                return response
+            
             # Find user by emailid
             try:
-                user = UserLogin.objects.get(emailid=emailid)
+                user = await UserLogin.objects.aget(emailid=emailid)
                 print(f"[USER FOUND] Name: {user.name}, Email: {user.emailid}")  # Debug log
             except UserLogin.DoesNotExist:
                 print(f"[USER NOT FOUND] Email: {emailid} - REJECTED")  # Debug log
@@ -102,8 +132,22 @@ def login_user(request):
                 }, status=401)
             
             # Check password
-            if user.check_password(password):
+            try:
+                matches, rehashed = await passwords.averify(password, user.password)
+            except passwords.HasherBusy:
+                response = JsonResponse({
+                    'success': False,
+                    'message': 'Server busy. Please try again shortly.'
+                }, status=503)
+                response['Retry-After'] = '1'
+                return response
+            
+            if matches:
                 print(f"[LOGIN SUCCESS] Email: {emailid} - Role: {user.role}")  # Debug log
+                await passwords.areset_email_attempts(emailid)
+                if rehashed:
+                    # Upgrade a legacy hash; update() skips save() and its write tracking
+                    await UserLogin.objects.filter(pk=user.pk, password=user.password).aupdate(password=rehashed)
                 
                 user_data = {
                     'id': user.id,
@@ -114,16 +158,17 @@ def login_user(request):
                 
                 # If user is a trainer, include trainer_id
                 if user.role == 'trainer':
-                    try:
-                        trainer = Trainer.objects.get(user=user)
-                        user_data['trainer_id'] = trainer.id
-                    except Trainer.DoesNotExist:
-                        pass
+                    trainer_id = await Trainer.objects.filter(user=user).values_list('id', flat=True).afirst()
+                    if trainer_id is not None:
+                        user_data['trainer_id'] = trainer_id
                 
                 return JsonResponse({
                     'success': True,
                     'message': 'Login successful',
-                    'user': user_data
+                    'user': user_data,
+                    # Send as 'Authorization: Bearer <token>' on later calls
+                    'token': issue_token(user.id, user.role, user_data.get('trainer_id')),
+                    'token_expires_in': token_max_age()
                 }, status=200)
             else:
                 print(f"[WRONG PASSWORD] Email: {emailid} - REJECTED")  # Debug log
@@ -150,6 +195,7 @@ def login_user(request):
 
 
 @csrf_exempt
+@admin_required
 def create_trainer(request):
     if request.method == 'POST':
         try:
@@ -196,6 +242,10 @@ def create_profile(request):
                     'message': 'User ID is required'
                 }, status=400)
             
+            denied = identity_denied(request, user_id=user_id)
+            if denied:
+                return denied
+            
             # Check if user exists
             try:
                 user = UserLogin.objects.get(id=user_id)
@@ -325,15 +375,23 @@ def create_profile(request):
     }, status=405)
 
 
-@csrf_exempt
-def get_profile(request, user_id):
+@async_csrf_exempt
+async def get_profile(request, user_id):
     """Get user profile by user_id"""
     if request.method == 'GET':
+        denied = await aidentity_denied(request, user_id=user_id)
+        if denied:
+            return denied
         try:
             print(f"Getting profile for user_id: {user_id}")
-            user = UserLogin.objects.get(id=user_id)
+            # The login and the profile (with its trainer) are fetched together
+            user, profile = await gather(
+                UserLogin.objects.aget(id=user_id),
+                UserProfile.objects.select_related('assigned_trainer__user').filter(user_id=user_id).afirst()
+            )
             try:
-                profile = UserProfile.objects.get(user=user)
+                if profile is None:
+                    raise UserProfile.DoesNotExist
                 print(f"Profile found: {profile.id}, payment_status: {profile.payment_status}")
                 
                 # Get trainer info if assigned
@@ -417,6 +475,10 @@ def update_payment_status(request):
                     'message': 'User ID is required'
                 }, status=400)
             
+            denied = identity_denied(request, user_id=user_id)
+            if denied:
+                return denied
+            
             payment_method = data.get('payment_method', '')
             
             user = UserLogin.objects.get(id=user_id)
@@ -479,69 +541,30 @@ def update_payment_status(request):
     }, status=405)
 
 
-@csrf_exempt
-def get_trainer_users(request, trainer_id):
+@async_csrf_exempt
+async def get_trainer_users(request, trainer_id):
     """Get all users assigned to a specific trainer (only paid users)"""
     if request.method == 'GET':
+        denied = await aidentity_denied(request, trainer_id=trainer_id)
+        if denied:
+            return denied
         try:
-            trainer = Trainer.objects.get(id=trainer_id)
-            profiles = UserProfile.objects.filter(
-                assigned_trainer=trainer,
-                payment_status=True  # Only show paid users
-            ).select_related('user').order_by('-created_at')
-            
-            user_list = []
-            for profile in profiles:
-                user = profile.user
-                
-                # Calculate remaining days
-                remaining_days = profile.get_remaining_days()
-                
-                # Get attendance stats
-                total_attendance = Attendance.objects.filter(
-                    user=user,
-                    trainer=trainer,
-                    status='accepted'
-                ).count()
-                
-                pending_attendance = Attendance.objects.filter(
-                    user=user,
-                    trainer=trainer,
-                    status='pending'
-                ).count()
-                
-                user_data = {
-                    'id': user.id,
-                    'name': user.name,
-                    'email': user.emailid,
-                    'mobile': profile.mobile_number,
-                    'age': profile.age,
-                    'gender': profile.gender,
-                    'current_weight': profile.current_weight,
-                    'current_height': profile.current_height,
-                    'goal': profile.goal,
-                    'target_weight': profile.target_weight,
-                    'target_months': profile.target_months,
-                    'remaining_days': remaining_days,
-                    'subscription_start_date': profile.subscription_start_date.isoformat() if profile.subscription_start_date else None,
-                    'subscription_end_date': profile.subscription_end_date.isoformat() if profile.subscription_end_date else None,
-                    'subscription_status': 'active' if profile.is_subscription_active() else 'expired',
-                    'payment_date': profile.payment_date.isoformat() if profile.payment_date else None,
-                    'workout_time': profile.workout_time,
-                    'diet_preference': profile.diet_preference,
-                    'food_allergies': profile.food_allergies or '',
-                    'health_conditions': profile.health_conditions or '',
-                    'payment_amount': profile.payment_amount,
-                    'total_attendance': total_attendance,
-                    'pending_attendance': pending_attendance,
-                    'created_at': profile.created_at.strftime('%Y-%m-%d')
-                }
-                user_list.append(user_data)
+            trainer = await Trainer.objects.aget(id=trainer_id)
+            try:
+                profiles, next_cursor = await aget_roster_page(trainer, request.GET)
+            except ValueError as e:
+                return JsonResponse({
+                    'success': False,
+                    'message': str(e)
+                }, status=400)
+            
+            user_list = [serialize_roster_entry(profile) for profile in profiles]
             
             return JsonResponse({
                 'success': True,
                 'users': user_list,
-                'total': len(user_list)
+                'total': len(user_list),
+                'next_cursor': next_cursor
             }, status=200)
             
         except Trainer.DoesNotExist:
@@ -567,18 +590,24 @@ def request_attendance(request):
     if request.method == 'POST':
         try:
             data = json.loads(request.body)
-            user_id = data.get('user_id')
+            identity = request.identity
+            user_id = data.get('user_id') or (identity.user_id if identity else None)
             
             if not user_id:
                 return JsonResponse({
                     'success': False,
                     'message': 'User ID is required'
                 }, status=400)
+            denied = identity_denied(request, user_id=user_id)
+            if denied:
+                return denied
             
-            user = UserLogin.objects.get(id=user_id)
-            profile = UserProfile.objects.get(user=user)
+            # A verified token already vouches for the user
+            if identity is None:
+                UserLogin.objects.get(id=user_id)
+            profile = UserProfile.objects.get(user_id=user_id)
             
-            if not profile.assigned_trainer:
+            if not profile.assigned_trainer_id:
                 return JsonResponse({
                     'success': False,
                     'message': 'No trainer assigned to this user'
@@ -586,7 +615,7 @@ def request_attendance(request):
             
             # Check if attendance already requested for today
             today = datetime.now().date()
-            if Attendance.objects.filter(user=user, date=today).exists():
+            if Attendance.objects.filter(user_id=user_id, date=today).exists():
                 return JsonResponse({
                     'success': False,
                     'message': 'Attendance already requested for today'
@@ -594,8 +623,8 @@ def request_attendance(request):
             
             # Create attendance request
             attendance = Attendance.objects.create(
-                user=user,
-                trainer=profile.assigned_trainer,
+                user_id=user_id,
+                trainer_id=profile.assigned_trainer_id,
                 date=today,
                 status='pending'
             )
@@ -633,89 +662,97 @@ def request_attendance(request):
 
 
 @csrf_exempt
+@use_replica
 def get_user_attendance(request, user_id):
-    """Get attendance history for a specific user including absent days"""
+    """
+    Attendance history of a user including absent days, in the list form
+    older app versions read. Bounded to the window of
+    get_user_attendance_calendar (?month=YYYY-MM, default this month); the
+    totals cover the whole membership. New clients use the calendar endpoint.
+    """
     if request.method == 'GET':
+        denied = identity_denied(request, user_id=user_id)
+        if denied:
+            return denied
         try:
-            user = UserLogin.objects.get(id=user_id)
-            profile = UserProfile.objects.get(user=user)
-            
-            # Get all attendance records
-            attendances = Attendance.objects.filter(user=user).order_by('-date')
-            
-            # Get start date (when user created profile)
-            start_date = profile.created_at.date()
+            profile = UserProfile.objects.get(user_id=user_id)
             today = date.today()
-            
-            # Create a dictionary of dates with attendance
-            attendance_dict = {}
-            for att in attendances:
-                attendance_dict[att.date] = {
-                    'id': att.id,
-                    'date': att.date.strftime('%Y-%m-%d'),
-                    'status': att.status,
-                    'request_date': att.request_date.strftime('%Y-%m-%d %H:%M'),
-                    'accepted_date': att.accepted_date.strftime('%Y-%m-%d %H:%M') if att.accepted_date else None,
-                    'is_absent': False
-                }
-            
-            # Generate full attendance list including absent days (but not today)
-            attendance_list = []
-            current_date = start_date
-            yesterday = today - timedelta(days=1)
-            
-            while current_date <= today:
-                if current_date in attendance_dict:
-                    # Attendance record exists
-                    attendance_list.append(attendance_dict[current_date])
-                elif current_date < today:
-                    # Past date with no attendance record - mark as absent
-                    attendance_list.append({
-                        'id': None,
-                        'date': current_date.strftime('%Y-%m-%d'),
-                        'status': 'absent',
-                        'request_date': None,
-                        'accepted_date': None,
-                        'is_absent': True
-                    })
-                # If current_date == today and no record, don't add anything (user can still request)
-                current_date += timedelta(days=1)
-            
-            # Sort by date descending (newest first)
-            attendance_list.sort(key=lambda x: x['date'], reverse=True)
-            
-            # Calculate statistics (only count past days as absent, not today)
-            total_accepted = attendances.filter(status='accepted').count()
-            total_pending = attendances.filter(status='pending').count()
-            total_past_days = (yesterday - start_date).days + 1 if yesterday >= start_date else 0
-            total_absent = max(0, total_past_days - attendances.filter(date__lt=today).count())
-            total_days = (today - start_date).days + 1
+            start, end = parse_window(request.GET, today)
+            records = window_records(profile.user_id, start, end)
+            totals = lifetime_totals(profile, today)
             
             return JsonResponse({
                 'success': True,
-                'attendances': attendance_list,
-                'total_accepted': total_accepted,
-                'total_pending': total_pending,
-                'total_absent': total_absent,
-                'total_days': total_days
+                'start': start.strftime('%Y-%m-%d'),
+                'end': end.strftime('%Y-%m-%d'),
+                'attendances': history_list(records, start, end, profile.created_at.date(), today),
+                'total_accepted': totals['accepted'],
+                'total_pending': totals['pending'],
+                'total_absent': totals['absent'],
+                'total_days': totals['days'],
+                'current_streak': totals['current_streak'],
+                'longest_streak': totals['longest_streak']
             }, status=200)
             
-        except UserLogin.DoesNotExist:
+        except UserProfile.DoesNotExist:
             return JsonResponse({
                 'success': False,
-                'message': 'User not found'
+                'message': 'User profile not found'
             }, status=404)
+        except ValueError as e:
+            return JsonResponse({
+                'success': False,
+                'message': str(e)
+            }, status=400)
+        except Exception as e:
+            return JsonResponse({
+                'success': False,
+                'message': str(e)
+            }, status=500)
+    
+    return JsonResponse({
+        'success': False,
+        'message': 'Only GET method is allowed'
+    }, status=405)
+
+
+@csrf_exempt
+@use_replica
+def get_user_attendance_calendar(request, user_id):
+    """
+    Attendance of a user over one window: ?month=YYYY-MM (default: this month)
+    or ?start=YYYY-MM-DD&end=YYYY-MM-DD. Returns the window as a per-day
+    status string, its statistics and the records inside it.
+    """
+    if request.method == 'GET':
+        denied = identity_denied(request, user_id=user_id)
+        if denied:
+            return denied
+        try:
+            profile = UserProfile.objects.get(user_id=user_id)
+            payload = get_calendar(profile, request.GET)
+            return JsonResponse({
+                'success': True,
+                'user_id': user_id,
+                **payload
+            }, status=200)
+
         except UserProfile.DoesNotExist:
             return JsonResponse({
                 'success': False,
                 'message': 'User profile not found'
             }, status=404)
+        except ValueError as e:
+            return JsonResponse({
+                'success': False,
+                'message': str(e)
+            }, status=400)
         except Exception as e:
             return JsonResponse({
                 'success': False,
                 'message': str(e)
             }, status=500)
-    
+
     return JsonResponse({
         'success': False,
         'message': 'Only GET method is allowed'
@@ -737,7 +774,10 @@ def accept_attendance(request):
                     'message': 'Attendance ID is required'
                 }, status=400)
             
-            attendance = Attendance.objects.get(id=attendance_id)
+            attendance = Attendance.objects.select_related('user').get(id=attendance_id)
+            denied = identity_denied(request, trainer_id=attendance.trainer_id)
+            if denied:
+                return denied
             attendance.status = status
             if status == 'accepted':
                 attendance.accepted_date = datetime.now()
@@ -771,14 +811,111 @@ def accept_attendance(request):
     }, status=405)
 
 
+MAX_BULK_ATTENDANCE_IDS = 500
+
+
+@csrf_exempt
+def bulk_review_attendance(request, trainer_id):
+    """
+    Trainer accepts or rejects many pending requests at once:
+    {"status": "accepted" | "rejected", "attendance_ids": [...]} or
+    {"status": ..., "date": "YYYY-MM-DD"} for every pending request of that
+    day. Requests of other trainers or no longer pending are skipped.
+    """
+    if request.method == 'POST':
+        try:
+            data = json.loads(request.body)
+            status = data.get('status', 'accepted')
+            attendance_ids = data.get('attendance_ids')
+            on_date = data.get('date')
+
+            if status not in ('accepted', 'rejected'):
+                return JsonResponse({
+                    'success': False,
+                    'message': 'Status must be accepted or rejected'
+                }, status=400)
+            if attendance_ids is None and not on_date:
+                return JsonResponse({
+                    'success': False,
+                    'message': 'attendance_ids or date is required'
+                }, status=400)
+            if attendance_ids is not None:
+                if (not isinstance(attendance_ids, list)
+                        or not all(isinstance(i, int) and not isinstance(i, bool) for i in attendance_ids)):
+                    return JsonResponse({
+                        'success': False,
+                        'message': 'attendance_ids must be a list of integers'
+                    }, status=400)
+                if len(attendance_ids) > MAX_BULK_ATTENDANCE_IDS:
+                    return JsonResponse({
+                        'success': False,
+                        'message': f'At most {MAX_BULK_ATTENDANCE_IDS} attendance_ids per request'
+                    }, status=400)
+            if on_date:
+                try:
+                    on_date = datetime.strptime(on_date, '%Y-%m-%d').date()
+                except (TypeError, ValueError):
+                    return JsonResponse({
+                        'success': False,
+                        'message': 'date must be YYYY-MM-DD'
+                    }, status=400)
+
+            denied = identity_denied(request, trainer_id=trainer_id)
+            if denied:
+                return denied
+            # A trainer's own token already vouches for the trainer
+            identity = request.identity
+            verified = identity is not None and identity.trainer_id == trainer_id
+            if not verified and not Trainer.objects.filter(id=trainer_id).exists():
+                return JsonResponse({
+                    'success': False,
+                    'message': 'Trainer not found'
+                }, status=404)
+
+            updated, skipped = Attendance.review_pending(trainer_id, status, attendance_ids, on_date or None)
+            pending_remaining = Attendance.objects.filter(trainer_id=trainer_id, status='pending').count()
+
+            return JsonResponse({
+                'success': True,
+                'message': f'{len(updated)} attendance request(s) {status}',
+                'status': status,
+                'updated': len(updated),
+                'updated_ids': updated,
+                'skipped_ids': skipped,
+                'pending_remaining': pending_remaining
+            }, status=200)
+
+        except json.JSONDecodeError:
+            return JsonResponse({
+                'success': False,
+                'message': 'Invalid JSON'
+            }, status=400)
+        except Exception as e:
+            return JsonResponse({
+                'success': False,
+                'message': str(e)
+            }, status=500)
+
+    return JsonResponse({
+        'success': False,
+        'message': 'Only POST method is allowed'
+    }, status=405)
+
+
 @csrf_exempt
 def get_pending_attendance_requests(request, trainer_id):
     """Get all pending attendance requests for a trainer"""
     if request.method == 'GET':
+        denied = identity_denied(request, trainer_id=trainer_id)
+        if denied:
+            return denied
         try:
-            trainer = Trainer.objects.get(id=trainer_id)
+            # A trainer's own token already vouches for the trainer
+            identity = request.identity
+            if identity is None or identity.trainer_id != trainer_id:
+                Trainer.objects.get(id=trainer_id)
             pending_requests = Attendance.objects.filter(
-                trainer=trainer,
+                trainer_id=trainer_id,
                 status='pending'
             ).select_related('user').order_by('-date')
             
@@ -837,6 +974,10 @@ def create_review(request):
                     'message': 'Rating must be between 1 and 5'
                 }, status=400)
             
+            denied = identity_denied(request, user_id=user_id)
+            if denied:
+                return denied
+            
             user = UserLogin.objects.get(id=user_id)
             profile = UserProfile.objects.get(user=user)
             
@@ -951,6 +1092,7 @@ def get_trainer_reviews(request, trainer_id):
 
 
 @csrf_exempt
+@admin_required
 def get_all_reviews(request):
     """Get all reviews from all users (for admin)"""
     if request.method == 'GET':
@@ -991,73 +1133,37 @@ def get_all_reviews(request):
 
 @csrf_exempt
 def get_food_items(request):
-    """Get all food items, optionally filtered by user allergies"""
+    """
+    Get all food items, optionally filtered by user allergies
+    GET params: user_id, exclude_allergies (true/false),
+    format ('full', default, or 'columnar' for parallel arrays)
+    Supports If-None-Match / If-Modified-Since: an unchanged catalog returns 304
+    """
     if request.method == 'GET':
         try:
-            user_id = request.GET.get('user_id')
+            fmt = request.GET.get('format', 'full')
+            if fmt not in CATALOG_FORMATS:
+                return JsonResponse({
+                    'success': False,
+                    'message': f"Invalid format. Choose from: {', '.join(CATALOG_FORMATS)}"
+                }, status=400)
             exclude_allergies = request.GET.get('exclude_allergies', 'false').lower() == 'true'
-            
-            foods = FoodItem.objects.all()
-            
-            # Filter by user's diet preference and allergies
-            if user_id and exclude_allergies:
-                try:
-                    user = UserLogin.objects.get(id=user_id)
-                    profile = UserProfile.objects.get(user=user)
-                    
-                    # Filter by diet preference
-                    # vegan: only vegan foods
-                    # vegetarian: vegan + vegetarian foods (no meat/seafood)
-                    # non_veg: all foods
-                    if profile.diet_preference == 'vegan':
-                        foods = foods.filter(diet_type='vegan')
-                    elif profile.diet_preference == 'vegetarian':
-                        foods = foods.filter(diet_type__in=['vegan', 'vegetarian'])
-                    # non_veg gets all foods (no filter needed)
-                    
-                    # Filter out allergic foods
-                    if profile.food_allergies:
-                        allergies = [a.strip().lower() for a in profile.food_allergies.split(',')]
-                        # Map common allergy terms to food categories
-                        allergy_category_map = {
-                            'milk': 'dairy',
-                            'dairy': 'dairy',
-                            'seafood': 'seafood',
-                            'fish': 'seafood',
-                            'nuts': 'nuts',
-                            'eggs': 'eggs',
-                            'egg': 'eggs'
-                        }
-                        
-                        excluded_categories = []
-                        for allergy in allergies:
-                            if allergy in allergy_category_map:
-                                excluded_categories.append(allergy_category_map[allergy])
-                        
-                        if excluded_categories:
-                            foods = foods.exclude(food_category__in=excluded_categories)
-                except:
-                    pass  # If user not found, return all foods
-            
-            food_list = []
-            for food in foods:
-                food_list.append({
-                    'id': food.id,
-                    'name': food.name,
-                    'category': food.food_category,
-                    'diet_type': food.diet_type,
-                    'calories': float(food.calories),
-                    'protein': float(food.protein),
-                    'carbs': float(food.carbs),
-                    'fats': float(food.fats),
-                    'serving_size': food.serving_size
-                })
-            
-            return JsonResponse({
-                'success': True,
-                'foods': food_list,
-                'total': len(food_list)
-            }, status=200)
+            foods = catalog_queryset(request.GET.get('user_id'), exclude_allergies)
+            
+            etag, last_modified = catalog_validators(foods, fmt)
+            last_modified = int(last_modified.timestamp()) if last_modified else None  # HTTP dates are whole seconds
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                if fmt == 'columnar':
+                    response = HttpResponse(build_columnar(foods), content_type='application/json')
+                else:
+                    response = StreamingHttpResponse(stream_full(foods), content_type='application/json')
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+            # Per-user filters; clients keep their copy but revalidate it
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
             
         except Exception as e:
             return JsonResponse({
@@ -1073,45 +1179,31 @@ def get_food_items(request):
 
 @csrf_exempt
 def get_diet_templates(request):
-    """Get diet plan templates filtered by goal and calorie range"""
+    """
+    Get diet plan templates for a goal, best fit for the calorie target first
+    GET params: goal, target_calories, user_weight (for the 'others' goal),
+    diet_preference (vegan, vegetarian or non_veg), expand=meals to include meals_data and nutrition_totals
+    """
     if request.method == 'GET':
         try:
             goal = request.GET.get('goal')  # weight_loss, weight_gain, muscle_building, others
             target_calories = request.GET.get('target_calories')
             user_weight = request.GET.get('user_weight')  # For 'others' goal weight-based filtering
             
-            templates = DietPlanTemplate.objects.all()
-            
-            if goal:
-                templates = templates.filter(goal_type=goal)
-            
-            # For 'others' goal, filter by user weight to get appropriate calorie range
+            calories = calorie_range = None
+            # For 'others' goal, the user's weight picks the maintenance calorie range
             if goal == 'others' and user_weight:
-                weight = float(user_weight)
-                # Weight-based calorie ranges for maintenance
-                if weight <= 40:
-                    templates = templates.filter(calorie_min__lte=1500, calorie_max__gte=1200)
-                elif weight <= 50:
-                    templates = templates.filter(calorie_min__lte=1800, calorie_max__gte=1500)
-                elif weight <= 60:
-                    templates = templates.filter(calorie_min__lte=2100, calorie_max__gte=1800)
-                else:  # 61-70kg
-                    templates = templates.filter(calorie_min__lte=2400, calorie_max__gte=2100)
+                calorie_range = maintenance_range(float(user_weight))
             elif target_calories:
-                cal = int(target_calories)
-                templates = templates.filter(calorie_min__lte=cal, calorie_max__gte=cal)
-            
-            template_list = []
-            for template in templates:
-                template_list.append({
-                    'id': template.id,
-                    'name': template.name,
-                    'goal_type': template.goal_type,
-                    'calorie_min': template.calorie_min,
-                    'calorie_max': template.calorie_max,
-                    'description': template.description,
-                    'meals_data': template.meals_data
-                })
+                calories = int(target_calories)
+            
+            template_list = resolve_templates(
+                goal=goal,
+                calories=calories,
+                calorie_range=calorie_range,
+                diet_preference=request.GET.get('diet_preference'),
+                expand=request.GET.get('expand') == 'meals'
+            )
             
             return JsonResponse({
                 'success': True,
@@ -1119,6 +1211,11 @@ def get_diet_templates(request):
                 'total': len(template_list)
             }, status=200)
             
+        except ValueError:
+            return JsonResponse({
+                'success': False,
+                'message': 'target_calories and user_weight must be numbers'
+            }, status=400)
         except Exception as e:
             return JsonResponse({
                 'success': False,
@@ -1135,6 +1232,9 @@ def get_diet_templates(request):
 def calculate_target_calories(request, user_id):
     """Calculate personalized daily calories based on user's goals and timeline"""
     if request.method == 'GET':
+        denied = identity_denied(request, user_id=user_id)
+        if denied:
+            return denied
         try:
             user = UserLogin.objects.get(id=user_id)
             profile = UserProfile.objects.get(user=user)
@@ -1157,7 +1257,7 @@ def calculate_target_calories(request, user_id):
                 }, status=200)
             
             # Use new personalized calculation method
-            calc_result = profile.calculate_target_calories()
+            calc_result = profile.get_calorie_targets()
             
             return JsonResponse({
                 'success': True,
@@ -1214,15 +1314,23 @@ def create_user_diet_plan(request):
             notes = data.get('notes', '')
             start_date = data.get('start_date')
             
+            template = DietPlanTemplate.objects.get(id=template_id) if template_id else None
+            # Template listings only carry meals_data with expand=meals; use the stored meals
+            if not meals_data and template:
+                meals_data = template.meals_data
+            
             if not all([user_id, trainer_id, plan_name, target_calories, meals_data]):
                 return JsonResponse({
                     'success': False,
                     'message': 'Missing required fields'
                 }, status=400)
             
+            denied = identity_denied(request, user_id=user_id, trainer_id=trainer_id)
+            if denied:
+                return denied
+            
             user = UserLogin.objects.get(id=user_id)
             trainer = Trainer.objects.get(id=trainer_id)
-            template = DietPlanTemplate.objects.get(id=template_id) if template_id else None
             
             # Convert start_date string to date object if provided
             if start_date:
@@ -1271,6 +1379,11 @@ def create_user_diet_plan(request):
                 'success': False,
                 'message': 'Trainer not found'
             }, status=404)
+        except DietPlanTemplate.DoesNotExist:
+            return JsonResponse({
+                'success': False,
+                'message': 'Diet template not found'
+            }, status=404)
         except Exception as e:
             return JsonResponse({
                 'success': False,
@@ -1287,6 +1400,9 @@ def create_user_diet_plan(request):
 def get_user_diet_plan(request, user_id):
     """Get active diet plan for a user"""
     if request.method == 'GET':
+        denied = identity_denied(request, user_id=user_id)
+        if denied:
+            return denied
         try:
             user = UserLogin.objects.get(id=user_id)
             diet_plan = UserDietPlan.objects.filter(user=user, is_active=True).first()
@@ -1306,6 +1422,7 @@ def get_user_diet_plan(request, user_id):
                     'plan_name': diet_plan.plan_name,
                     'target_calories': diet_plan.target_calories,
                     'meals_data': diet_plan.meals_data,
+                    'nutrition_totals': diet_plan.nutrition_totals,
                     'notes': diet_plan.notes,
                     'start_date': diet_plan.start_date.strftime('%Y-%m-%d'),
                     'trainer_name': diet_plan.trainer.user.name,
@@ -1334,6 +1451,9 @@ def get_user_diet_plan(request, user_id):
 def get_trainer_diet_plans(request, trainer_id):
     """Get all diet plans created by a trainer"""
     if request.method == 'GET':
+        denied = identity_denied(request, trainer_id=trainer_id)
+        if denied:
+            return denied
         try:
             trainer = Trainer.objects.get(id=trainer_id)
             diet_plans = UserDietPlan.objects.filter(trainer=trainer).select_related('user').order_by('-created_at')
@@ -1398,6 +1518,10 @@ def upload_video(request):
                     'message': 'All required fields must be provided'
                 }, status=400)
             
+            denied = identity_denied(request, trainer_id=trainer_id)
+            if denied:
+                return denied
+            
             # Get trainer
             try:
                 trainer = Trainer.objects.get(id=trainer_id)
@@ -1459,17 +1583,25 @@ def list_trainer_videos(request, trainer_id):
     List all videos uploaded by a specific trainer (web uploads only, not bulk)
     """
     if request.method == 'GET':
+        denied = identity_denied(request, trainer_id=trainer_id)
+        if denied:
+            return denied
         try:
             trainer = Trainer.objects.get(id=trainer_id)
             videos = WorkoutVideo.objects.filter(uploaded_by=trainer, uploaded_via='web', is_active=True).order_by('-created_at')
             
             video_list = []
             for video in videos:
+                playback_url = stream_url(
+                    {'id': video.id, 'video_url': video.video_file.name}, trainer.user_id, 'trainer'
+                )
                 video_list.append({
                     'id': video.id,
                     'title': video.title,
                     'description': video.description,
-                    'video_url': video.video_file.url if video.video_file else None,
+                    # Workout videos are only served through the signed stream URL
+                    'video_url': playback_url,
+                    'stream_url': playback_url,
                     'thumbnail_url': video.thumbnail.url if video.thumbnail else None,
                     'goal_type': video.goal_type,
                     'difficulty_level': video.difficulty_level,
@@ -1501,15 +1633,28 @@ def list_trainer_videos(request, trainer_id):
     }, status=405)
 
 
-@csrf_exempt
-def get_user_videos(request, user_id):
+def stream_url(video, user_id, role='user'):
+    """
+    Signed, expiring, range-capable URL for playing a video as user_id (see
+    media_views.stream_workout_video); the file itself is not publicly served
+    """
+    if not video['video_url']:
+        return None
+    return f"{reverse('stream_workout_video', args=[video['id']])}?token={sign_stream(video['id'], user_id, role)}"
+
+
+@async_csrf_exempt
+async def get_user_videos(request, user_id):
     """
     Get filtered videos for a specific user based on their goal and weight difference
     Daily progression: Show one video per day based on user's enrollment date
     """
     if request.method == 'GET':
+        denied = await aidentity_denied(request, user_id=user_id)
+        if denied:
+            return denied
         try:
-            user_profile = UserProfile.objects.get(user_id=user_id)
+            user_profile = await UserProfile.objects.select_related('assigned_trainer__user').aget(user_id=user_id)
             
             # Calculate weight difference
             if user_profile.goal == 'others':
@@ -1518,108 +1663,55 @@ def get_user_videos(request, user_id):
                 weight_difference = abs(user_profile.target_weight - user_profile.current_weight)
             
             # Calculate days since enrollment (starting from day 1)
-            days_enrolled = (date.today() - user_profile.created_at.date()).days + 1
+            days_enrolled = video_catalog.get_days_enrolled(user_profile)
             
             # Video filtering based on weight difference
-            if weight_difference <= 10:
-                # User needs to lose/gain 0-10kg: Show beginner videos
-                difficulty_filter = ['beginner']
-            else:
-                # User needs to lose/gain more than 10kg: Show all videos
-                difficulty_filter = ['beginner', 'advanced']
-            
-            # Get all videos for the user's goal and difficulty level, ordered by day_number
-            all_videos = WorkoutVideo.objects.filter(
-                goal_type=user_profile.goal,
-                difficulty_level__in=difficulty_filter,
-                is_active=True
-            ).exclude(
-                day_number__isnull=True  # Only videos with day numbers (bulk videos)
-            ).order_by('day_number')
-            
-            # Get web-uploaded videos (no day restriction) - only from assigned trainer
-            web_videos_query = WorkoutVideo.objects.filter(
-                goal_type=user_profile.goal,
-                difficulty_level__in=difficulty_filter,
-                is_active=True,
-                uploaded_via='web',
-                day_number__isnull=True
+            difficulty_filter = video_catalog.get_difficulty_levels(user_profile)
+            
+            # Cached catalog lists for the user's goal and difficulty level, web-uploaded
+            # videos (no day restriction, only from the assigned trainer if the user has
+            # one) and trainer recommendations are independent, so fetch them together
+            all_videos, web_videos, recommendations = await gather(
+                run_sync(video_catalog.get_progression_videos)(user_profile.goal, difficulty_filter),
+                run_sync(video_catalog.get_web_videos)(
+                    user_profile.goal,
+                    difficulty_filter,
+                    user_profile.assigned_trainer_id
+                ),
+                video_catalog.aget_recommendation_map(user_profile)
             )
             
-            # Filter by assigned trainer if user has one
-            if user_profile.assigned_trainer:
-                web_videos_query = web_videos_query.filter(uploaded_by=user_profile.assigned_trainer)
-            
-            web_videos = web_videos_query.order_by('-created_at')
-            
-            # Get trainer-recommended videos
-            recommended_video_ids = VideoRecommendation.objects.filter(
-                user=user_profile
-            ).values_list('video_id', flat=True)
-            
             video_list = []
             
             # Add daily progression videos (unlock based on days enrolled)
             for video in all_videos:
-                is_unlocked = video.day_number <= days_enrolled
-                is_recommended = video.id in recommended_video_ids
-                recommendation = None
-                
-                if is_recommended:
-                    rec = VideoRecommendation.objects.get(video=video, user=user_profile)
-                    recommendation = {
-                        'note': rec.note,
-                        'recommended_by': rec.recommended_by.user.name,
-                        'recommended_at': rec.created_at.strftime('%Y-%m-%d')
-                    }
-                
+                is_unlocked = video['day_number'] <= days_enrolled
+                recommendation = recommendations.get(video['id'])
+                playback_url = stream_url(video, user_id) if is_unlocked else None
                 video_list.append({
-                    'id': video.id,
-                    'title': video.title,
-                    'description': video.description,
-                    'video_url': video.video_file.url if (video.video_file and is_unlocked) else None,
-                    'thumbnail_url': video.thumbnail.url if video.thumbnail else None,
-                    'goal_type': video.goal_type,
-                    'difficulty_level': video.difficulty_level,
-                    'weight_range': f"{video.min_weight_difference}-{video.max_weight_difference}kg",
-                    'duration': video.duration,
-                    'is_recommended': is_recommended,
+                    **video,
+                    # Media paths are not served publicly; older clients play video_url
+                    'video_url': playback_url,
+                    'stream_url': playback_url,
+                    'is_recommended': recommendation is not None,
                     'recommendation': recommendation,
-                    'day_number': video.day_number,
                     'is_unlocked': is_unlocked,
-                    'unlock_day': video.day_number,
-                    'created_at': video.created_at.strftime('%Y-%m-%d')
+                    'unlock_day': video['day_number']
                 })
             
             # Add web-uploaded videos (always available)
             for video in web_videos:
-                is_recommended = video.id in recommended_video_ids
-                recommendation = None
-                
-                if is_recommended:
-                    rec = VideoRecommendation.objects.get(video=video, user=user_profile)
-                    recommendation = {
-                        'note': rec.note,
-                        'recommended_by': rec.recommended_by.user.name,
-                        'recommended_at': rec.created_at.strftime('%Y-%m-%d')
-                    }
-                
+                recommendation = recommendations.get(video['id'])
+                playback_url = stream_url(video, user_id)
                 video_list.append({
-                    'id': video.id,
-                    'title': video.title,
-                    'description': video.description,
-                    'video_url': video.video_file.url if video.video_file else None,
-                    'thumbnail_url': video.thumbnail.url if video.thumbnail else None,
-                    'goal_type': video.goal_type,
-                    'difficulty_level': video.difficulty_level,
-                    'weight_range': f"{video.min_weight_difference}-{video.max_weight_difference}kg",
-                    'duration': video.duration,
-                    'is_recommended': is_recommended,
+                    **video,
+                    'video_url': playback_url,
+                    'stream_url': playback_url,
+                    'is_recommended': recommendation is not None,
                     'recommendation': recommendation,
                     'day_number': None,
                     'is_unlocked': True,  # Web videos always unlocked
-                    'unlock_day': None,
-                    'created_at': video.created_at.strftime('%Y-%m-%d')
+                    'unlock_day': None
                 })
             
             return JsonResponse({
@@ -1661,6 +1753,13 @@ def delete_video(request, video_id):
     if request.method == 'DELETE':
         try:
             video = WorkoutVideo.objects.get(id=video_id)
+            if video.uploaded_by_id is None:
+                # Library videos nobody uploaded through the app are the gym's
+                denied = admin_denied(request)
+            else:
+                denied = identity_denied(request, trainer_id=video.uploaded_by_id)
+            if denied:
+                return denied
             video.is_active = False
             video.save()
             
@@ -1705,6 +1804,10 @@ def recommend_video_to_user(request):
                     'message': 'video_id, user_id, and trainer_id are required'
                 }, status=400)
             
+            denied = identity_denied(request, user_id=user_id, trainer_id=trainer_id)
+            if denied:
+                return denied
+            
             video = WorkoutVideo.objects.get(id=video_id)
             user_profile = UserProfile.objects.get(user_id=user_id)
             trainer = Trainer.objects.get(id=trainer_id)
@@ -1809,6 +1912,40 @@ def get_trainer_details(request, trainer_id):
 
 # ===== CHAT SYSTEM API ENDPOINTS =====
 
+MAX_CHAT_PAGE_SIZE = 100
+DEFAULT_CHAT_HISTORY_PAGE_SIZE = 50
+
+
+def paginate_conversations(conversations, params):
+    """
+    Order conversations by last activity and apply the optional
+    limit/cursor query params. Returns (conversations, next_cursor).
+    """
+    conversations = conversations.exclude(last_message_at__isnull=True)
+    cursor = params.get('cursor')
+    if cursor:
+        last_message_at, pk = decode_cursor(cursor, 2)
+        conversations = conversations.filter(keyset_filter('last_message_at', last_message_at, pk))
+    conversations = conversations.order_by('-last_message_at', '-id')
+    
+    limit = parse_limit(params.get('limit'), None, MAX_CHAT_PAGE_SIZE)
+    if limit is None:
+        return list(conversations), None
+    
+    page = list(conversations[:limit + 1])
+    if len(page) <= limit:
+        return page, None
+    page = page[:limit]
+    return page, encode_cursor([page[-1].last_message_at, page[-1].id])
+
+
+def format_conversation_time(conversation):
+    """Convert UTC to local timezone for display"""
+    if not conversation.last_message_at:
+        return ''
+    return timezone.localtime(conversation.last_message_at).strftime('%Y-%m-%d %H:%M:%S')
+
+
 @csrf_exempt
 def send_chat_message(request):
     """
@@ -1828,17 +1965,27 @@ def send_chat_message(request):
                     'message': 'user_id, trainer_id, message, and sender_type are required'
                 }, status=400)
             
+            denied = identity_denied(request, user_id=user_id, trainer_id=trainer_id)
+            if denied:
+                return denied
+            # Members and trainers may only send as themselves
+            identity = request.identity
+            if identity is not None and identity.role != 'admin' and sender_type != identity.role:
+                return forbidden(sender_type)
+            
             user_profile = UserProfile.objects.get(user_id=user_id)
             trainer = Trainer.objects.get(id=trainer_id)
             
-            # Create chat message
-            chat_message = ChatMessage.objects.create(
-                user=user_profile,
-                trainer=trainer,
-                message=message,
-                sender_type=sender_type,
-                is_read=False
-            )
+            # Create chat message and fold it into the conversation summary
+            with transaction.atomic():
+                chat_message = ChatMessage.objects.create(
+                    user=user_profile,
+                    trainer=trainer,
+                    message=message,
+                    sender_type=sender_type,
+                    is_read=False
+                )
+                ChatConversation.record_message(chat_message)
             
             return JsonResponse({
                 'success': True,
@@ -1874,23 +2021,62 @@ def send_chat_message(request):
     }, status=405)
 
 
-@csrf_exempt
-def get_chat_messages(request, user_id, trainer_id):
+def mark_chat_read(user_profile, trainer, reader_type):
+    """Reset the reader's unread counter and flag the messages read, atomically"""
+    with transaction.atomic():
+        ChatConversation.mark_read(user_profile, trainer, reader_type)
+
+
+@async_csrf_exempt
+async def get_chat_messages(request, user_id, trainer_id):
     """
-    Get all chat messages between a user and trainer
+    Get a window of chat messages between a user and trainer.
+    
+    Without a cursor the newest page is returned. Pass before_id (the oldest
+    id already loaded) to scroll back, or after_id (the newest id) to poll for
+    new messages. Messages are always returned oldest first.
     """
     if request.method == 'GET':
+        denied = await aidentity_denied(request, user_id=user_id, trainer_id=trainer_id)
+        if denied:
+            return denied
         try:
-            user_profile = UserProfile.objects.get(user_id=user_id)
-            trainer = Trainer.objects.get(id=trainer_id)
+            user_profile, trainer = await gather(
+                UserProfile.objects.select_related('user').aget(user_id=user_id),
+                Trainer.objects.select_related('user').aget(id=trainer_id)
+            )
+            
+            try:
+                before_id = request.GET.get('before_id')
+                after_id = request.GET.get('after_id')
+                before_id = int(before_id) if before_id else None
+                after_id = int(after_id) if after_id else None
+                limit = parse_limit(request.GET.get('limit'), DEFAULT_CHAT_HISTORY_PAGE_SIZE, MAX_CHAT_PAGE_SIZE)
+            except ValueError:
+                return JsonResponse({
+                    'success': False,
+                    'message': 'limit, before_id and after_id must be integers'
+                }, status=400)
             
             messages = ChatMessage.objects.filter(
                 user=user_profile,
                 trainer=trainer
-            ).order_by('created_at')
+            )
+            
+            # Fetch one extra row to know whether the window has more beyond it
+            if after_id is not None:
+                window = await alist(messages.filter(id__gt=after_id).order_by('id')[:limit + 1])
+                has_more = len(window) > limit
+                window = window[:limit]
+            else:
+                if before_id is not None:
+                    messages = messages.filter(id__lt=before_id)
+                window = await alist(messages.order_by('-id')[:limit + 1])
+                has_more = len(window) > limit
+                window = window[:limit][::-1]
             
             messages_list = []
-            for msg in messages:
+            for msg in window:
                 messages_list.append({
                     'id': msg.id,
                     'message': msg.message,
@@ -1901,13 +2087,16 @@ def get_chat_messages(request, user_id, trainer_id):
                 })
             
             # Mark all trainer messages as read by user (or vice versa)
-            unread_messages = messages.exclude(sender_type=request.GET.get('reader_type', 'user'))
-            unread_messages.update(is_read=True)
+            reader_type = request.GET.get('reader_type', 'user')
+            await run_sync(mark_chat_read)(user_profile, trainer, reader_type)
             
             return JsonResponse({
                 'success': True,
                 'messages': messages_list,
-                'total_messages': len(messages_list)
+                'total_messages': len(messages_list),
+                'has_more': has_more,
+                'oldest_id': messages_list[0]['id'] if messages_list else None,
+                'newest_id': messages_list[-1]['id'] if messages_list else None
             }, status=200)
             
         except UserProfile.DoesNotExist:
@@ -1935,47 +2124,43 @@ def get_chat_messages(request, user_id, trainer_id):
 @csrf_exempt  
 def get_trainer_chats(request, trainer_id):
     """
-    Get all users who have chatted with this trainer
+    Get all users who have chatted with this trainer, most recent chat first
     """
     if request.method == 'GET':
+        denied = identity_denied(request, trainer_id=trainer_id)
+        if denied:
+            return denied
         try:
             trainer = Trainer.objects.get(id=trainer_id)
             
-            # Get distinct users who have chatted with this trainer
-            user_ids = ChatMessage.objects.filter(trainer=trainer).values_list('user_id', flat=True).distinct()
+            conversations = ChatConversation.objects.filter(
+                trainer=trainer
+            ).select_related('user__user')
+            try:
+                conversations, next_cursor = paginate_conversations(conversations, request.GET)
+            except ValueError as e:
+                return JsonResponse({
+                    'success': False,
+                    'message': str(e)
+                }, status=400)
             
             chats_list = []
-            for user_profile in UserProfile.objects.filter(id__in=user_ids):
-                # Get last message
-                last_message = ChatMessage.objects.filter(
-                    user=user_profile,
-                    trainer=trainer
-                ).order_by('-created_at').first()
-                
-                # Count unread messages from user
-                unread_count = ChatMessage.objects.filter(
-                    user=user_profile,
-                    trainer=trainer,
-                    sender_type='user',
-                    is_read=False
-                ).count()
-                
-                # Convert UTC to local timezone for display
-                last_message_time = timezone.localtime(last_message.created_at).strftime('%Y-%m-%d %H:%M:%S') if last_message else ''
-                
+            for conversation in conversations:
+                user = conversation.user.user
                 chats_list.append({
-                    'user_id': user_profile.user.id,
-                    'user_name': user_profile.user.name,
-                    'user_email': user_profile.user.emailid,
-                    'last_message': last_message.message if last_message else '',
-                    'last_message_time': last_message_time,
-                    'unread_count': unread_count
+                    'user_id': user.id,
+                    'user_name': user.name,
+                    'user_email': user.emailid,
+                    'last_message': conversation.last_message,
+                    'last_message_time': format_conversation_time(conversation),
+                    'unread_count': conversation.trainer_unread_count
                 })
             
             return JsonResponse({
                 'success': True,
                 'chats': chats_list,
-                'total_chats': len(chats_list)
+                'total_chats': len(chats_list),
+                'next_cursor': next_cursor
             }, status=200)
             
         except Trainer.DoesNotExist:
@@ -1996,67 +2181,45 @@ def get_trainer_chats(request, trainer_id):
 
 
 @csrf_exempt
+@admin_required
+@use_replica
 def get_all_chats_admin(request):
     """
-    Get all chat conversations for admin
+    Get all chat conversations for admin, most recent chat first
     """
     if request.method == 'GET':
         try:
-            # Get all distinct user-trainer pairs with proper distinct on both fields
-            from django.db.models import Max
-            
-            # Get unique user-trainer pairs by grouping
-            unique_pairs = ChatMessage.objects.values('user_id', 'trainer_id').annotate(
-                last_message_time=Max('created_at')
-            ).order_by('-last_message_time')
+            conversations = ChatConversation.objects.select_related('user__user', 'trainer__user')
+            try:
+                conversations, next_cursor = paginate_conversations(conversations, request.GET)
+            except ValueError as e:
+                return JsonResponse({
+                    'success': False,
+                    'message': str(e)
+                }, status=400)
             
             chats_list = []
-            seen_pairs = set()
-            
-            for pair in unique_pairs:
-                pair_key = (pair['user_id'], pair['trainer_id'])
-                
-                # Skip if we've already seen this pair
-                if pair_key in seen_pairs:
-                    continue
-                    
-                seen_pairs.add(pair_key)
-                
-                user_profile = UserProfile.objects.get(id=pair['user_id'])
-                trainer = Trainer.objects.get(id=pair['trainer_id'])
-                
-                # Get last message
-                last_message = ChatMessage.objects.filter(
-                    user_id=pair['user_id'],
-                    trainer_id=pair['trainer_id']
-                ).order_by('-created_at').first()
-                
-                # Get total message count
-                message_count = ChatMessage.objects.filter(
-                    user_id=pair['user_id'],
-                    trainer_id=pair['trainer_id']
-                ).count()
-                
-                # Convert UTC to local timezone for display
-                last_message_time = timezone.localtime(last_message.created_at).strftime('%Y-%m-%d %H:%M:%S') if last_message else ''
-                
+            for conversation in conversations:
+                user = conversation.user.user
+                trainer = conversation.trainer
                 chats_list.append({
-                    'user_id': user_profile.user.id,
-                    'user_name': user_profile.user.name,
-                    'user_email': user_profile.user.emailid,
+                    'user_id': user.id,
+                    'user_name': user.name,
+                    'user_email': user.emailid,
                     'trainer_id': trainer.id,
                     'trainer_name': trainer.user.name,
                     'trainer_specialization': trainer.specialization,
-                    'last_message': last_message.message if last_message else '',
-                    'last_message_sender': last_message.sender_type if last_message else '',
-                    'last_message_time': last_message_time,
-                    'total_messages': message_count
+                    'last_message': conversation.last_message,
+                    'last_message_sender': conversation.last_sender_type,
+                    'last_message_time': format_conversation_time(conversation),
+                    'total_messages': conversation.total_messages
                 })
             
             return JsonResponse({
                 'success': True,
                 'chats': chats_list,
-                'total_conversations': len(chats_list)
+                'total_conversations': len(chats_list),
+                'next_cursor': next_cursor
             }, status=200)
             
         except Exception as e:
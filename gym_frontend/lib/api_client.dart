@@ -0,0 +1,60 @@
+import 'package:http/http.dart' as http;
+import 'package:shared_preferences/shared_preferences.dart';
+
+export 'package:http/http.dart'
+    show BaseRequest, MultipartFile, MultipartRequest, Response, StreamedResponse;
+
+// Drop-in for package:http (import this file `as http`) that sends the login
+// token on every API call as 'Authorization: Bearer <token>'
+class ApiSession {
+  static const String _tokenKey = 'api_token';
+  static String? token;
+
+  // Load the token of the last login, so a reloaded app stays signed in
+  static Future<void> restore() async {
+    final prefs = await SharedPreferences.getInstance();
+    token = prefs.getString(_tokenKey);
+  }
+
+  static Future<void> signIn(String? newToken) async {
+    token = newToken;
+    final prefs = await SharedPreferences.getInstance();
+    if (newToken == null) {
+      await prefs.remove(_tokenKey);
+    } else {
+      await prefs.setString(_tokenKey, newToken);
+    }
+  }
+
+  static Future<void> signOut() => signIn(null);
+}
+
+class _AuthClient extends http.BaseClient {
+  final http.Client _inner = http.Client();
+
+  @override
+  Future<http.StreamedResponse> send(http.BaseRequest request) {
+    final token = ApiSession.token;
+    if (token != null) {
+      request.headers['Authorization'] = 'Bearer $token';
+    }
+    return _inner.send(request);
+  }
+}
+
+final _AuthClient _client = _AuthClient();
+
+Future<http.Response> get(Uri url, {Map<String, String>? headers}) =>
+    _client.get(url, headers: headers);
+
+Future<http.Response> post(Uri url, {Map<String, String>? headers, Object? body}) =>
+    _client.post(url, headers: headers, body: body);
+
+Future<http.Response> put(Uri url, {Map<String, String>? headers, Object? body}) =>
+    _client.put(url, headers: headers, body: body);
+
+Future<http.Response> delete(Uri url, {Map<String, String>? headers, Object? body}) =>
+    _client.delete(url, headers: headers, body: body);
+
+// For multipart uploads, in place of request.send()
+Future<http.StreamedResponse> send(http.BaseRequest request) => _client.send(request);
@@ -1,7 +1,10 @@
 import 'package:flutter/material.dart';
+import 'api_client.dart' show ApiSession;
 import 'routes.dart';
 
-void main() {
+Future<void> main() async {
+  WidgetsFlutterBinding.ensureInitialized();
+  await ApiSession.restore();
   runApp(const MyApp());
 }
 
@@ -1,5 +1,5 @@
 import 'package:flutter/material.dart';
-import 'package:http/http.dart' as http;
+import '../api_client.dart' as http;
 import 'dart:convert';
 
 class AddRecipeScreen extends StatefulWidget {
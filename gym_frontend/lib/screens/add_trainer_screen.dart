@@ -1,6 +1,6 @@
 import 'package:flutter/material.dart';
 import 'package:flutter/services.dart';
-import 'package:http/http.dart' as http;
+import '../api_client.dart' as http;
 import 'dart:convert';
 import 'dart:math';
 
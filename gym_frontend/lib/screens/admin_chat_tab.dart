@@ -1,6 +1,7 @@
 import 'package:flutter/material.dart';
-import 'package:http/http.dart' as http;
+import '../api_client.dart' as http;
 import 'dart:convert';
+import 'chat_history.dart';
 
 class AdminChatTab extends StatefulWidget {
   const AdminChatTab({Key? key}) : super(key: key);
@@ -262,8 +263,14 @@ class AdminChatMessagesScreen extends StatefulWidget {
 }
 
 class _AdminChatMessagesScreenState extends State<AdminChatMessagesScreen> {
-  List<dynamic> _messages = [];
+  late final ChatHistory _history = ChatHistory(
+    userId: widget.userId,
+    trainerId: widget.trainerId,
+  );
   bool _isLoading = true;
+  bool _loadingOlder = false;
+
+  List<dynamic> get _messages => _history.messages;
 
   @override
   void initState() {
@@ -277,22 +284,10 @@ class _AdminChatMessagesScreenState extends State<AdminChatMessagesScreen> {
     });
 
     try {
-      final response = await http.get(
-        Uri.parse(
-            'http://localhost:8000/api/chat/messages/${widget.userId}/${widget.trainerId}/'),
-      );
-
-      if (response.statusCode == 200) {
-        final data = json.decode(response.body);
-        setState(() {
-          _messages = data['messages'] ?? [];
-          _isLoading = false;
-        });
-      } else {
-        setState(() {
-          _isLoading = false;
-        });
-      }
+      await _history.loadLatest();
+      setState(() {
+        _isLoading = false;
+      });
     } catch (e) {
       setState(() {
         _isLoading = false;
@@ -300,6 +295,24 @@ class _AdminChatMessagesScreenState extends State<AdminChatMessagesScreen> {
     }
   }
 
+  // Pull to refresh fetches only the messages after the newest one shown
+  Future<void> _loadNewMessages() async {
+    try {
+      await _history.loadNewer();
+      setState(() {});
+    } catch (e) {
+    }
+  }
+
+  Future<void> _loadOlderMessages() async {
+    setState(() => _loadingOlder = true);
+    try {
+      await _history.loadOlder();
+    } catch (e) {
+    }
+    setState(() => _loadingOlder = false);
+  }
+
   String _formatTime(String timestamp) {
     try {
       final dateTime = DateTime.parse(timestamp);
@@ -346,11 +359,20 @@ class _AdminChatMessagesScreenState extends State<AdminChatMessagesScreen> {
                   ),
                 )
               : RefreshIndicator(
-                  onRefresh: _loadMessages,
+                  onRefresh: _loadNewMessages,
                   child: ListView.builder(
                     padding: const EdgeInsets.all(16),
-                    itemCount: _messages.length,
+                    itemCount: _messages.length + (_history.hasOlder ? 1 : 0),
                     itemBuilder: (context, index) {
+                      if (_history.hasOlder) {
+                        if (index == 0) {
+                          return LoadOlderMessagesButton(
+                            loading: _loadingOlder,
+                            onPressed: _loadOlderMessages,
+                          );
+                        }
+                        index -= 1;
+                      }
                       final message = _messages[index];
                       final isUser = message['sender_type'] == 'user';
 
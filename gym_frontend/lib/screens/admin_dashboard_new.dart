@@ -1,5 +1,5 @@
 import 'package:flutter/material.dart';
-import 'package:http/http.dart' as http;
+import '../api_client.dart' as http;
 import 'dart:convert';
 import 'trainer_management_tab.dart';
 import 'admin_chat_tab.dart';
@@ -159,6 +159,7 @@ class _AdminDashboardNewState extends State<AdminDashboardNew> with SingleTicker
           IconButton(
             icon: const Icon(Icons.logout, color: Colors.white),
             onPressed: () {
+              http.ApiSession.signOut();
               Navigator.pushReplacementNamed(context, '/login');
             },
           ),
@@ -0,0 +1,239 @@
+import 'package:flutter/material.dart';
+import '../api_client.dart' as http;
+import 'dart:convert';
+
+const List<String> _monthNames = [
+  'January',
+  'February',
+  'March',
+  'April',
+  'May',
+  'June',
+  'July',
+  'August',
+  'September',
+  'October',
+  'November',
+  'December',
+];
+
+String _ymd(DateTime day) =>
+    '${day.year}-${day.month.toString().padLeft(2, '0')}-${day.day.toString().padLeft(2, '0')}';
+
+// YYYY-MM for the calendar endpoint's month parameter
+String monthParam(DateTime month) =>
+    '${month.year}-${month.month.toString().padLeft(2, '0')}';
+
+// Calendar payload as list entries: the records plus the absent days ('X' in
+// the per-day string), newest first
+List<Map<String, dynamic>> calendarEntries(Map<String, dynamic> data) {
+  final entries = List<Map<String, dynamic>>.from(data['records']);
+  final recorded = entries.map((entry) => entry['date']).toSet();
+  final start = DateTime.parse(data['start']);
+  final String days = data['days'];
+  for (var i = 0; i < days.length; i++) {
+    if (days[i] != 'X') continue;
+    final date = _ymd(DateTime(start.year, start.month, start.day + i));
+    if (!recorded.contains(date)) {
+      entries.add({'date': date, 'status': 'absent', 'accepted_date': null});
+    }
+  }
+  entries.sort((a, b) => (b['date'] as String).compareTo(a['date']));
+  return entries;
+}
+
+// One member's attendance a month at a time; the counters cover the whole
+// membership
+class AttendanceCalendarDialog extends StatefulWidget {
+  final int userId;
+  final String title;
+  final bool showAcceptedDate;
+
+  const AttendanceCalendarDialog({
+    Key? key,
+    required this.userId,
+    required this.title,
+    this.showAcceptedDate = false,
+  }) : super(key: key);
+
+  @override
+  State<AttendanceCalendarDialog> createState() =>
+      _AttendanceCalendarDialogState();
+}
+
+class _AttendanceCalendarDialogState extends State<AttendanceCalendarDialog> {
+  final DateTime _thisMonth = DateTime(
+    DateTime.now().year,
+    DateTime.now().month,
+  );
+  late DateTime _month = _thisMonth;
+  bool _isLoading = true;
+  String? _error;
+  Map<String, dynamic> _totals = {};
+  List<Map<String, dynamic>> _entries = [];
+
+  @override
+  void initState() {
+    super.initState();
+    _loadMonth();
+  }
+
+  Future<void> _loadMonth() async {
+    setState(() {
+      _isLoading = true;
+      _error = null;
+    });
+    try {
+      final response = await http.get(
+        Uri.parse(
+          'http://127.0.0.1:8000/api/attendance/user/${widget.userId}/calendar/?month=${monthParam(_month)}',
+        ),
+      );
+      final data = json.decode(response.body);
+      if (!mounted) return;
+      if (response.statusCode == 200 && data['success'] == true) {
+        setState(() {
+          _totals = Map<String, dynamic>.from(data['totals']);
+          _entries = calendarEntries(data);
+          _isLoading = false;
+        });
+      } else {
+        setState(() {
+          _error = data['message'] ?? 'Failed to load attendance';
+          _isLoading = false;
+        });
+      }
+    } catch (e) {
+      if (!mounted) return;
+      setState(() {
+        _error = 'Error: $e';
+        _isLoading = false;
+      });
+    }
+  }
+
+  void _changeMonth(int delta) {
+    setState(() => _month = DateTime(_month.year, _month.month + delta));
+    _loadMonth();
+  }
+
+  Widget _counter(String label, Object? value, Color color) {
+    return Column(
+      children: [
+        Text(
+          '${value ?? 0}',
+          style: TextStyle(
+            fontSize: 24,
+            fontWeight: FontWeight.bold,
+            color: color,
+          ),
+        ),
+        Text(label),
+      ],
+    );
+  }
+
+  Widget _buildList() {
+    if (_isLoading) {
+      return const Center(child: CircularProgressIndicator());
+    }
+    if (_error != null) {
+      return Center(child: Text(_error!));
+    }
+    if (_entries.isEmpty) {
+      return const Center(child: Text('No attendance records this month'));
+    }
+    return ListView.builder(
+      itemCount: _entries.length,
+      itemBuilder: (context, index) {
+        final att = _entries[index];
+        final status = att['status'];
+        return ListTile(
+          leading: Icon(
+            status == 'accepted'
+                ? Icons.check_circle
+                : status == 'pending'
+                ? Icons.pending
+                : status == 'absent'
+                ? Icons.event_busy
+                : Icons.cancel,
+            color: status == 'accepted'
+                ? Colors.green
+                : status == 'pending'
+                ? Colors.orange
+                : status == 'absent'
+                ? Colors.red
+                : Colors.grey,
+          ),
+          title: Text(att['date']),
+          subtitle: Text('Status: ${status.toUpperCase()}'),
+          trailing: widget.showAcceptedDate && att['accepted_date'] != null
+              ? Text(
+                  'Accepted: ${att['accepted_date']}',
+                  style: const TextStyle(fontSize: 10),
+                )
+              : null,
+        );
+      },
+    );
+  }
+
+  @override
+  Widget build(BuildContext context) {
+    return AlertDialog(
+      title: Text(widget.title),
+      content: SizedBox(
+        width: double.maxFinite,
+        height: 440,
+        child: Column(
+          children: [
+            Card(
+              color: const Color(0xFF7B4EFF).withOpacity(0.1),
+              child: Padding(
+                padding: const EdgeInsets.all(16.0),
+                child: Row(
+                  mainAxisAlignment: MainAxisAlignment.spaceAround,
+                  children: [
+                    _counter(
+                      'Accepted',
+                      _totals['accepted'],
+                      const Color(0xFF7B4EFF),
+                    ),
+                    _counter('Pending', _totals['pending'], Colors.orange),
+                    _counter('Absent', _totals['absent'], Colors.red),
+                  ],
+                ),
+              ),
+            ),
+            Row(
+              mainAxisAlignment: MainAxisAlignment.spaceBetween,
+              children: [
+                IconButton(
+                  icon: const Icon(Icons.chevron_left),
+                  onPressed: _isLoading ? null : () => _changeMonth(-1),
+                ),
+                Text(
+                  '${_monthNames[_month.month - 1]} ${_month.year}',
+                  style: const TextStyle(fontWeight: FontWeight.bold),
+                ),
+                IconButton(
+                  icon: const Icon(Icons.chevron_right),
+                  onPressed: _isLoading || !_month.isBefore(_thisMonth)
+                      ? null
+                      : () => _changeMonth(1),
+                ),
+              ],
+            ),
+            Expanded(child: _buildList()),
+          ],
+        ),
+      ),
+      actions: [
+        TextButton(
+          onPressed: () => Navigator.pop(context),
+          child: const Text('Close'),
+        ),
+      ],
+    );
+  }
+}
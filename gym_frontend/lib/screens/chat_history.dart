@@ -0,0 +1,90 @@
+import 'package:flutter/material.dart';
+import '../api_client.dart' as http;
+import 'dart:convert';
+
+// Pages through a user-trainer conversation: the newest page first, older
+// pages on request (before_id) and only the messages after the newest loaded
+// one on refresh (after_id), so no call sends the whole history
+class ChatHistory {
+  static const int pageSize = 50;
+
+  final int userId;
+  final int trainerId;
+  final String? readerType;
+  List<dynamic> messages = [];
+  bool hasOlder = false;
+
+  ChatHistory({required this.userId, required this.trainerId, this.readerType});
+
+  Future<Map<String, dynamic>> _fetch(Map<String, String> params) async {
+    final uri = Uri.parse(
+      'http://localhost:8000/api/chat/messages/$userId/$trainerId/',
+    ).replace(
+      queryParameters: {
+        if (readerType != null) 'reader_type': readerType!,
+        'limit': '$pageSize',
+        ...params,
+      },
+    );
+    final response = await http.get(uri);
+    if (response.statusCode != 200) {
+      throw Exception('Failed to load messages');
+    }
+    return json.decode(response.body);
+  }
+
+  Future<void> loadLatest() async {
+    final data = await _fetch({});
+    messages = data['messages'] ?? [];
+    hasOlder = data['has_more'] == true;
+  }
+
+  Future<void> loadOlder() async {
+    if (messages.isEmpty) return loadLatest();
+    final data = await _fetch({'before_id': '${messages.first['id']}'});
+    messages = [...(data['messages'] ?? []), ...messages];
+    hasOlder = data['has_more'] == true;
+  }
+
+  Future<void> loadNewer() async {
+    if (messages.isEmpty) return loadLatest();
+    var more = true;
+    while (more) {
+      final data = await _fetch({'after_id': '${messages.last['id']}'});
+      final List<dynamic> newer = data['messages'] ?? [];
+      messages = [...messages, ...newer];
+      more = data['has_more'] == true && newer.isNotEmpty;
+    }
+  }
+}
+
+class LoadOlderMessagesButton extends StatelessWidget {
+  final bool loading;
+  final VoidCallback onPressed;
+
+  const LoadOlderMessagesButton({
+    Key? key,
+    required this.loading,
+    required this.onPressed,
+  }) : super(key: key);
+
+  @override
+  Widget build(BuildContext context) {
+    return Center(
+      child: loading
+          ? const Padding(
+              padding: EdgeInsets.all(8),
+              child: SizedBox(
+                width: 20,
+                height: 20,
+                child: CircularProgressIndicator(strokeWidth: 2),
+              ),
+            )
+          : TextButton.icon(
+              onPressed: onPressed,
+              icon: const Icon(Icons.history),
+              label: const Text('Load older messages'),
+            ),
+    );
+  }
+}
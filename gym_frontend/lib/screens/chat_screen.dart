@@ -1,6 +1,7 @@
 import 'package:flutter/material.dart';
-import 'package:http/http.dart' as http;
+import '../api_client.dart' as http;
 import 'dart:convert';
+import 'chat_history.dart';
 
 class ChatScreen extends StatefulWidget {
   final int userId;
@@ -23,8 +24,15 @@ class ChatScreen extends StatefulWidget {
 class _ChatScreenState extends State<ChatScreen> {
   final TextEditingController _messageController = TextEditingController();
   final ScrollController _scrollController = ScrollController();
-  List<dynamic> _messages = [];
+  late final ChatHistory _history = ChatHistory(
+    userId: widget.userId,
+    trainerId: widget.trainerId,
+    readerType: widget.senderType,
+  );
   bool _isLoading = true;
+  bool _loadingOlder = false;
+
+  List<dynamic> get _messages => _history.messages;
 
   @override
   void initState() {
@@ -34,24 +42,11 @@ class _ChatScreenState extends State<ChatScreen> {
 
   Future<void> _loadMessages() async {
     try {
-      final response = await http.get(
-        Uri.parse(
-            'http://localhost:8000/api/chat/messages/${widget.userId}/${widget.trainerId}/?reader_type=${widget.senderType}'),
-      );
-
-      if (response.statusCode == 200) {
-        final data = json.decode(response.body);
-        setState(() {
-          _messages = data['messages'] ?? [];
-          _isLoading = false;
-        });
-        _scrollToBottom();
-      } else {
-        setState(() {
-          _isLoading = false;
-        });
-        _showError('Failed to load messages');
-      }
+      await _history.loadLatest();
+      setState(() {
+        _isLoading = false;
+      });
+      _scrollToBottom();
     } catch (e) {
       setState(() {
         _isLoading = false;
@@ -60,6 +55,27 @@ class _ChatScreenState extends State<ChatScreen> {
     }
   }
 
+  // Only the messages after the newest one shown
+  Future<void> _loadNewMessages() async {
+    try {
+      await _history.loadNewer();
+      setState(() {});
+      _scrollToBottom();
+    } catch (e) {
+      _showError('Error: $e');
+    }
+  }
+
+  Future<void> _loadOlderMessages() async {
+    setState(() => _loadingOlder = true);
+    try {
+      await _history.loadOlder();
+    } catch (e) {
+      _showError('Error: $e');
+    }
+    setState(() => _loadingOlder = false);
+  }
+
   Future<void> _sendMessage() async {
     if (_messageController.text.trim().isEmpty) return;
 
@@ -79,7 +95,7 @@ class _ChatScreenState extends State<ChatScreen> {
       );
 
       if (response.statusCode == 201) {
-        _loadMessages(); // Reload messages to show the new one
+        _loadNewMessages(); // Fetch the new one and any replies
       } else {
         _showError('Failed to send message');
       }
@@ -274,9 +290,19 @@ class _ChatScreenState extends State<ChatScreen> {
                       )
                     : ListView.builder(
                         controller: _scrollController,
-                        itemCount: _messages.length,
+                        itemCount:
+                            _messages.length + (_history.hasOlder ? 1 : 0),
                         padding: const EdgeInsets.symmetric(vertical: 16),
                         itemBuilder: (context, index) {
+                          if (_history.hasOlder) {
+                            if (index == 0) {
+                              return LoadOlderMessagesButton(
+                                loading: _loadingOlder,
+                                onPressed: _loadOlderMessages,
+                              );
+                            }
+                            index -= 1;
+                          }
                           return _buildMessageBubble(_messages[index]);
                         },
                       ),
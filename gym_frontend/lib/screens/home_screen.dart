@@ -1,11 +1,12 @@
 import 'package:flutter/material.dart';
-import 'package:http/http.dart' as http;
+import '../api_client.dart' as http;
 import 'dart:convert';
 import 'workout_videos_screen.dart';
 import 'chat_screen.dart';
 import 'food_calorie_calculator_screen.dart';
 import 'subscription_renewal_screen.dart';
 import 'food_recipes_screen.dart';
+import 'attendance_calendar_dialog.dart';
 
 class HomeScreen extends StatefulWidget {
   final int userId;
@@ -22,7 +23,6 @@ class _HomeScreenState extends State<HomeScreen> {
   bool _isLoading = true;
   Map<String, dynamic>? _userProfile;
   String? _error;
-  List<Map<String, dynamic>> _attendanceHistory = [];
   int _totalAttendance = 0;
   int _pendingAttendance = 0;
   int _totalAbsent = 0;
@@ -76,28 +76,25 @@ class _HomeScreenState extends State<HomeScreen> {
 
   Future<void> _loadAttendance() async {
     try {
+      // This month's window carries today's record and the lifetime totals
       final response = await http.get(
         Uri.parse(
-          'http://127.0.0.1:8000/api/attendance/user/${widget.userId}/',
+          'http://127.0.0.1:8000/api/attendance/user/${widget.userId}/calendar/?month=${monthParam(DateTime.now())}',
         ),
       );
 
       if (response.statusCode == 200) {
         final data = json.decode(response.body);
         if (data['success'] == true) {
+          final records = List<Map<String, dynamic>>.from(data['records']);
           setState(() {
-            _attendanceHistory = List<Map<String, dynamic>>.from(
-              data['attendances'],
-            );
-            _totalAttendance = data['total_accepted'];
-            _pendingAttendance = data['total_pending'];
-            _totalAbsent = data['total_absent'] ?? 0;
+            _totalAttendance = data['totals']['accepted'];
+            _pendingAttendance = data['totals']['pending'];
+            _totalAbsent = data['totals']['absent'] ?? 0;
 
             // Check if already requested today
             final today = DateTime.now().toIso8601String().split('T')[0];
-            _canRequestToday = !_attendanceHistory.any(
-              (att) => att['date'] == today,
-            );
+            _canRequestToday = !records.any((att) => att['date'] == today);
           });
         }
       }
@@ -184,104 +181,9 @@ class _HomeScreenState extends State<HomeScreen> {
   void _showAttendanceHistory() {
     showDialog(
       context: context,
-      builder: (context) => AlertDialog(
-        title: const Text('My Attendance History'),
-        content: SizedBox(
-          width: double.maxFinite,
-          height: 400,
-          child: Column(
-            children: [
-              Card(
-                color: const Color(0xFF7B4EFF).withOpacity(0.1),
-                child: Padding(
-                  padding: const EdgeInsets.all(16.0),
-                  child: Row(
-                    mainAxisAlignment: MainAxisAlignment.spaceAround,
-                    children: [
-                      Column(
-                        children: [
-                          Text(
-                            '$_totalAttendance',
-                            style: const TextStyle(
-                              fontSize: 24,
-                              fontWeight: FontWeight.bold,
-                              color: Color(0xFF7B4EFF),
-                            ),
-                          ),
-                          const Text('Accepted'),
-                        ],
-                      ),
-                      Column(
-                        children: [
-                          Text(
-                            '$_pendingAttendance',
-                            style: const TextStyle(
-                              fontSize: 24,
-                              fontWeight: FontWeight.bold,
-                              color: Colors.orange,
-                            ),
-                          ),
-                          const Text('Pending'),
-                        ],
-                      ),
-                      Column(
-                        children: [
-                          Text(
-                            '$_totalAbsent',
-                            style: const TextStyle(
-                              fontSize: 24,
-                              fontWeight: FontWeight.bold,
-                              color: Colors.red,
-                            ),
-                          ),
-                          const Text('Absent'),
-                        ],
-                      ),
-                    ],
-                  ),
-                ),
-              ),
-              const SizedBox(height: 16),
-              Expanded(
-                child: _attendanceHistory.isEmpty
-                    ? const Center(child: Text('No attendance records yet'))
-                    : ListView.builder(
-                        itemCount: _attendanceHistory.length,
-                        itemBuilder: (context, index) {
-                          final att = _attendanceHistory[index];
-                          final status = att['status'];
-                          return ListTile(
-                            leading: Icon(
-                              status == 'accepted'
-                                  ? Icons.check_circle
-                                  : status == 'pending'
-                                  ? Icons.pending
-                                  : status == 'absent'
-                                  ? Icons.event_busy
-                                  : Icons.cancel,
-                              color: status == 'accepted'
-                                  ? Colors.green
-                                  : status == 'pending'
-                                  ? Colors.orange
-                                  : status == 'absent'
-                                  ? Colors.red
-                                  : Colors.grey,
-                            ),
-                            title: Text(att['date']),
-                            subtitle: Text('Status: ${status.toUpperCase()}'),
-                          );
-                        },
-                      ),
-              ),
-            ],
-          ),
-        ),
-        actions: [
-          TextButton(
-            onPressed: () => Navigator.pop(context),
-            child: const Text('Close'),
-          ),
-        ],
+      builder: (context) => AttendanceCalendarDialog(
+        userId: widget.userId,
+        title: 'My Attendance History',
       ),
     );
   }
@@ -516,6 +418,7 @@ class _HomeScreenState extends State<HomeScreen> {
           IconButton(
             icon: const Icon(Icons.logout),
             onPressed: () {
+              http.ApiSession.signOut();
               Navigator.pushReplacementNamed(context, '/');
             },
             tooltip: 'Logout',
@@ -1,6 +1,6 @@
 import 'package:flutter/material.dart';
 import 'package:font_awesome_flutter/font_awesome_flutter.dart';
-import 'package:http/http.dart' as http;
+import '../api_client.dart' as http;
 import 'dart:convert';
 
 class LoginScreen extends StatefulWidget {
@@ -58,6 +58,8 @@ class _LoginScreenState extends State<LoginScreen> {
       final data = json.decode(response.body);
 
       if (response.statusCode == 200 && data['success'] == true) {
+        // Sent as the bearer token on every later API call
+        await http.ApiSession.signIn(data['token']);
         if (mounted) {
           ScaffoldMessenger.of(context).showSnackBar(
             SnackBar(
@@ -1,5 +1,5 @@
 import 'package:flutter/material.dart';
-import 'package:http/http.dart' as http;
+import '../api_client.dart' as http;
 import 'dart:convert';
 
 class PaymentScreen extends StatefulWidget {
@@ -166,6 +166,7 @@ class _PaymentScreenState extends State<PaymentScreen> {
           IconButton(
             icon: const Icon(Icons.logout),
             onPressed: () {
+              http.ApiSession.signOut();
               Navigator.pushNamedAndRemoveUntil(
                 context,
                 '/login',
@@ -1,10 +1,11 @@
 import 'package:flutter/material.dart';
 import 'dart:convert';
-import 'package:http/http.dart' as http;
+import '../api_client.dart' as http;
 import 'video_upload_screen.dart';
 import 'manage_videos_screen.dart';
 import 'trainer_chat_list_screen.dart';
 import 'trainer_food_monitoring_screen.dart';
+import 'attendance_calendar_dialog.dart';
 
 class TrainerDashboard extends StatefulWidget {
   final int trainerId;
@@ -23,6 +24,7 @@ class TrainerDashboard extends StatefulWidget {
 class _TrainerDashboardState extends State<TrainerDashboard> {
   List<Map<String, dynamic>> _assignedUsers = [];
   List<Map<String, dynamic>> _pendingAttendance = [];
+  final Set<int> _selectedAttendance = {};
   List<Map<String, dynamic>> _reviews = [];
   double _averageRating = 0.0;
   bool _isLoading = true;
@@ -96,6 +98,9 @@ class _TrainerDashboardState extends State<TrainerDashboard> {
             _pendingAttendance = List<Map<String, dynamic>>.from(
               data['requests'],
             );
+            // Drop selections of requests that are no longer pending
+            final pendingIds = _pendingAttendance.map((r) => r['id']).toSet();
+            _selectedAttendance.retainWhere(pendingIds.contains);
           });
         }
       }
@@ -145,178 +150,73 @@ class _TrainerDashboardState extends State<TrainerDashboard> {
     }
   }
 
-  Future<void> _acceptAttendance(int attendanceId, String userName) async {
+  // Accept or reject many pending requests in one call to the bulk endpoint,
+  // either by id or every pending request of one day
+  Future<void> _reviewAttendance(Map<String, dynamic> body) async {
     try {
       final response = await http.post(
-        Uri.parse('http://127.0.0.1:8000/api/attendance/accept/'),
+        Uri.parse(
+          'http://127.0.0.1:8000/api/trainer/${widget.trainerId}/attendance/bulk/',
+        ),
         headers: {'Content-Type': 'application/json'},
-        body: json.encode({
-          'attendance_id': attendanceId,
-          'status': 'accepted',
-        }),
+        body: json.encode(body),
       );
 
-      if (response.statusCode == 200) {
-        final data = json.decode(response.body);
-        if (data['success']) {
-          ScaffoldMessenger.of(context).showSnackBar(
-            SnackBar(
-              content: Text('Attendance accepted for $userName'),
-              backgroundColor: Colors.green,
-            ),
-          );
-          _loadData();
-        }
+      final data = json.decode(response.body);
+      if (response.statusCode == 200 && data['success']) {
+        ScaffoldMessenger.of(context).showSnackBar(
+          SnackBar(
+            content: Text(data['message']),
+            backgroundColor: Colors.green,
+          ),
+        );
+        setState(() => _selectedAttendance.clear());
+        _loadData();
+      } else {
+        ScaffoldMessenger.of(context).showSnackBar(
+          SnackBar(
+            content: Text(data['message'] ?? 'Failed to review attendance'),
+            backgroundColor: Colors.red,
+          ),
+        );
       }
     } catch (e) {
       ScaffoldMessenger.of(context).showSnackBar(
         SnackBar(
-          content: Text('Error accepting attendance: $e'),
+          content: Text('Error reviewing attendance: $e'),
           backgroundColor: Colors.red,
         ),
       );
     }
   }
 
-  Future<void> _viewUserAttendance(int userId, String userName) async {
-    try {
-      final response = await http.get(
-        Uri.parse('http://127.0.0.1:8000/api/attendance/user/$userId/'),
-      );
+  Future<void> _acceptAttendance(int attendanceId) {
+    return _reviewAttendance({
+      'status': 'accepted',
+      'attendance_ids': [attendanceId],
+    });
+  }
 
-      if (response.statusCode == 200) {
-        final data = json.decode(response.body);
-        if (data['success']) {
-          _showAttendanceDialog(
-            userName,
-            List<Map<String, dynamic>>.from(data['attendances']),
-            data['total_accepted'],
-            data['total_pending'],
-            data['total_absent'] ?? 0,
-          );
-        }
-      }
-    } catch (e) {
-      ScaffoldMessenger.of(context).showSnackBar(
-        SnackBar(
-          content: Text('Error loading attendance: $e'),
-          backgroundColor: Colors.red,
-        ),
-      );
-    }
+  Future<void> _reviewSelected(String status) {
+    return _reviewAttendance({
+      'status': status,
+      'attendance_ids': _selectedAttendance.toList(),
+    });
+  }
+
+  Future<void> _acceptAllToday() {
+    return _reviewAttendance({'status': 'accepted', 'date': _today()});
   }
 
-  void _showAttendanceDialog(
-    String userName,
-    List<Map<String, dynamic>> attendances,
-    int totalAccepted,
-    int totalPending,
-    int totalAbsent,
-  ) {
+  String _today() => DateTime.now().toIso8601String().split('T')[0];
+
+  void _viewUserAttendance(int userId, String userName) {
     showDialog(
       context: context,
-      builder: (context) => AlertDialog(
-        title: Text('$userName - Attendance'),
-        content: SizedBox(
-          width: double.maxFinite,
-          height: 400,
-          child: Column(
-            children: [
-              Card(
-                color: const Color(0xFF7B4EFF).withOpacity(0.1),
-                child: Padding(
-                  padding: const EdgeInsets.all(16.0),
-                  child: Row(
-                    mainAxisAlignment: MainAxisAlignment.spaceAround,
-                    children: [
-                      Column(
-                        children: [
-                          Text(
-                            '$totalAccepted',
-                            style: const TextStyle(
-                              fontSize: 24,
-                              fontWeight: FontWeight.bold,
-                              color: Color(0xFF7B4EFF),
-                            ),
-                          ),
-                          const Text('Accepted'),
-                        ],
-                      ),
-                      Column(
-                        children: [
-                          Text(
-                            '$totalPending',
-                            style: const TextStyle(
-                              fontSize: 24,
-                              fontWeight: FontWeight.bold,
-                              color: Colors.orange,
-                            ),
-                          ),
-                          const Text('Pending'),
-                        ],
-                      ),
-                      Column(
-                        children: [
-                          Text(
-                            '$totalAbsent',
-                            style: const TextStyle(
-                              fontSize: 24,
-                              fontWeight: FontWeight.bold,
-                              color: Colors.red,
-                            ),
-                          ),
-                          const Text('Absent'),
-                        ],
-                      ),
-                    ],
-                  ),
-                ),
-              ),
-              const SizedBox(height: 16),
-              Expanded(
-                child: ListView.builder(
-                  itemCount: attendances.length,
-                  itemBuilder: (context, index) {
-                    final att = attendances[index];
-                    final status = att['status'];
-                    return ListTile(
-                      leading: Icon(
-                        status == 'accepted'
-                            ? Icons.check_circle
-                            : status == 'pending'
-                            ? Icons.pending
-                            : status == 'absent'
-                            ? Icons.event_busy
-                            : Icons.cancel,
-                        color: status == 'accepted'
-                            ? Colors.green
-                            : status == 'pending'
-                            ? Colors.orange
-                            : status == 'absent'
-                            ? Colors.red
-                            : Colors.grey,
-                      ),
-                      title: Text(att['date']),
-                      subtitle: Text('Status: ${status.toUpperCase()}'),
-                      trailing: att['accepted_date'] != null
-                          ? Text(
-                              'Accepted: ${att['accepted_date']}',
-                              style: const TextStyle(fontSize: 10),
-                            )
-                          : null,
-                    );
-                  },
-                ),
-              ),
-            ],
-          ),
-        ),
-        actions: [
-          TextButton(
-            onPressed: () => Navigator.pop(context),
-            child: const Text('Close'),
-          ),
-        ],
+      builder: (context) => AttendanceCalendarDialog(
+        userId: userId,
+        title: '$userName - Attendance',
+        showAcceptedDate: true,
       ),
     );
   }
@@ -385,7 +285,8 @@ class _TrainerDashboardState extends State<TrainerDashboard> {
     final currentWeight = calcData['current_weight'];
 
     // Get diet templates
-    String templatesUrl = 'http://127.0.0.1:8000/api/diet/templates/?goal=$goal';
+    // expand=meals returns meals_data for the preview and for saving the plan
+    String templatesUrl = 'http://127.0.0.1:8000/api/diet/templates/?goal=$goal&expand=meals';
     
     // For 'others' goal, pass user weight instead of target calories
     if (goal == 'others') {
@@ -614,6 +515,7 @@ class _TrainerDashboardState extends State<TrainerDashboard> {
           IconButton(
             icon: const Icon(Icons.logout),
             onPressed: () {
+              http.ApiSession.signOut();
               Navigator.pushReplacementNamed(context, '/login');
             },
           ),
@@ -652,24 +554,72 @@ class _TrainerDashboardState extends State<TrainerDashboard> {
                               ],
                             ),
                             const SizedBox(height: 12),
+                            Wrap(
+                              spacing: 8,
+                              runSpacing: 8,
+                              children: [
+                                ElevatedButton.icon(
+                                  onPressed: _pendingAttendance.any(
+                                    (r) => r['date'] == _today(),
+                                  )
+                                      ? _acceptAllToday
+                                      : null,
+                                  icon: const Icon(Icons.done_all),
+                                  label: Text(
+                                    'Accept All Today (${_pendingAttendance.where((r) => r['date'] == _today()).length})',
+                                  ),
+                                  style: ElevatedButton.styleFrom(
+                                    backgroundColor: Colors.green,
+                                    foregroundColor: Colors.white,
+                                  ),
+                                ),
+                                OutlinedButton.icon(
+                                  onPressed: _selectedAttendance.isEmpty
+                                      ? null
+                                      : () => _reviewSelected('accepted'),
+                                  icon: const Icon(Icons.check),
+                                  label: Text(
+                                    'Accept Selected (${_selectedAttendance.length})',
+                                  ),
+                                ),
+                                OutlinedButton.icon(
+                                  onPressed: _selectedAttendance.isEmpty
+                                      ? null
+                                      : () => _reviewSelected('rejected'),
+                                  icon: const Icon(Icons.close),
+                                  label: Text(
+                                    'Reject Selected (${_selectedAttendance.length})',
+                                  ),
+                                  style: OutlinedButton.styleFrom(
+                                    foregroundColor: Colors.red,
+                                  ),
+                                ),
+                              ],
+                            ),
+                            const SizedBox(height: 12),
                             ListView.builder(
                               shrinkWrap: true,
                               physics: const NeverScrollableScrollPhysics(),
                               itemCount: _pendingAttendance.length,
                               itemBuilder: (context, index) {
                                 final request = _pendingAttendance[index];
+                                final int id = request['id'];
                                 return Card(
                                   child: ListTile(
-                                    leading: const CircleAvatar(
-                                      child: Icon(Icons.person),
+                                    leading: Checkbox(
+                                      value: _selectedAttendance.contains(id),
+                                      onChanged: (checked) => setState(() {
+                                        if (checked == true) {
+                                          _selectedAttendance.add(id);
+                                        } else {
+                                          _selectedAttendance.remove(id);
+                                        }
+                                      }),
                                     ),
                                     title: Text(request['user_name']),
                                     subtitle: Text('Date: ${request['date']}'),
                                     trailing: ElevatedButton.icon(
-                                      onPressed: () => _acceptAttendance(
-                                        request['id'],
-                                        request['user_name'],
-                                      ),
+                                      onPressed: () => _acceptAttendance(id),
                                       icon: const Icon(Icons.check),
                                       label: const Text('Accept'),
                                       style: ElevatedButton.styleFrom(
@@ -1,6 +1,6 @@
 import 'package:flutter/material.dart';
 import 'dart:convert';
-import 'package:http/http.dart' as http;
+import '../api_client.dart' as http;
 import 'package:intl/intl.dart';
 
 class TrainerFoodMonitoringScreen extends StatefulWidget {
@@ -1,5 +1,5 @@
 import 'package:flutter/material.dart';
-import 'package:http/http.dart' as http;
+import '../api_client.dart' as http;
 import 'dart:convert';
 import 'package:file_picker/file_picker.dart';
 import 'dart:typed_data';
@@ -168,7 +168,7 @@ class _VideoUploadScreenState extends State<VideoUploadScreen> {
       request.files.add(videoFile);
 
       // Send request
-      var streamedResponse = await request.send();
+      var streamedResponse = await http.send(request);
       var response = await http.Response.fromStream(streamedResponse);
 
       if (response.statusCode == 201) {
@@ -1,6 +1,6 @@
 import 'package:flutter/material.dart';
 import 'dart:convert';
-import 'package:http/http.dart' as http;
+import '../api_client.dart' as http;
 import 'dart:html' as html;
 
 class WorkoutVideosScreen extends StatefulWidget {
@@ -631,7 +631,7 @@ class _WorkoutVideosScreenState extends State<WorkoutVideosScreen> {
   }
 
   void _playVideo(Map<String, dynamic> video) {
-    final videoUrl = 'http://127.0.0.1:8000${video['video_url']}';
+    final videoUrl = 'http://127.0.0.1:8000${video['stream_url'] ?? video['video_url']}';
     
     // Open video in new tab for Flutter web
     html.window.open(videoUrl, '_blank');